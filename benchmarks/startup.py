@@ -0,0 +1,87 @@
+"""Cold-start benchmark for the dashboard.
+
+Each run starts a fresh interpreter, imports Streamlit's test harness and
+then times the first full script run of ``dashboard.py`` (time to first
+render, including model loading).  It also reports which heavy optional
+modules that first render pulled in, so an eager import sneaking back onto
+the Manual Input path shows up here.
+
+    python benchmarks/startup.py                 # Manual Input, 5 runs
+    python benchmarks/startup.py --page batch -n 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = {
+    'manual': "📝  Manual Input",
+    'batch': "📁  Batch CSV Upload",
+    'performance': "📊  Model Performance",
+}
+HEAVY_MODULES = ('pandas', 'plotly', 'sklearn', 'joblib', 'pyarrow', 'scipy')
+
+# Runs in the child interpreter
+_CHILD = r"""
+import json, sys, time, warnings
+warnings.filterwarnings('ignore')
+t0 = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+preloaded = set(sys.modules)
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+if sys.argv[2] != PAGES['manual']:
+    at.run()
+    t1 = time.perf_counter()
+    preloaded = set(sys.modules)
+    at.sidebar.radio[0].set_value(sys.argv[2])
+at.run()
+t2 = time.perf_counter()
+print(json.dumps({
+    'harness_import_s': t1 - t0 if sys.argv[2] == PAGES['manual'] else None,
+    'first_render_s': t2 - t1,
+    'errors': [e.value for e in at.exception],
+    'loaded': sorted({m.split('.')[0] for m in set(sys.modules) - preloaded} & set(HEAVY)),
+}))
+"""
+
+
+def run_once(page):
+    code = f"PAGES = {PAGES!r}\nHEAVY = {HEAVY_MODULES!r}\n" + _CHILD
+    out = subprocess.run([sys.executable, '-c', code, os.path.join(ROOT, 'dashboard.py'), PAGES[page]],
+                         cwd=ROOT, env={**os.environ, 'PYTHONPATH': ROOT},
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--page', choices=PAGES, default='manual',
+                        help="page rendered first (default: %(default)s); for other pages the "
+                             "time covers switching to it after the landing page")
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = [run_once(args.page) for _ in range(args.runs)]
+    renders = [r['first_render_s'] for r in results]
+    print(f"page: {args.page}  runs: {args.runs}")
+    print(f"first render  median {statistics.median(renders):.3f}s  "
+          f"min {min(renders):.3f}s  max {max(renders):.3f}s")
+    if results[0]['harness_import_s'] is not None:
+        imports = [r['harness_import_s'] for r in results]
+        print(f"streamlit import  median {statistics.median(imports):.3f}s")
+    print(f"heavy modules loaded by the render: {', '.join(results[-1]['loaded']) or 'none'}")
+    errors = [e for r in results for e in r['errors']]
+    if errors:
+        print(f"errors: {errors[0]}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
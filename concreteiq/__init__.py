@@ -0,0 +1,10 @@
+"""ConcreteIQ — headless scoring for the concrete strength predictor."""
+from .engine import (CURVE_AGES, FEATURE_NAMES, INPUT_COLUMNS, MODEL_PATH, N_FEATURES,
+                     StrengthEngine, engineer_features, feature_buffer,
+                     features_from_columns, file_fingerprint, fill_engineered,
+                     load_engine, load_model, model_fingerprint, wc_ratio)
+
+__all__ = ['CURVE_AGES', 'FEATURE_NAMES', 'INPUT_COLUMNS', 'MODEL_PATH', 'N_FEATURES',
+           'StrengthEngine', 'engineer_features', 'feature_buffer',
+           'features_from_columns', 'file_fingerprint', 'fill_engineered',
+           'load_engine', 'load_model', 'model_fingerprint', 'wc_ratio']
@@ -0,0 +1,376 @@
+"""Asyncio HTTP prediction service.
+
+A small HTTP/1.1 server on ``asyncio.start_server`` (no web framework), so
+plant systems can score mixes without going through the dashboard:
+
+``GET  /health``
+    ``{"status": "ok", "model": <fingerprint>}``
+``POST /predict``
+    One mix as a JSON object keyed by input name (``{"Cement": 540, ...}``)
+    or ``{"features": [8 numbers]}``.  Returns ``{"strength", "grade",
+    "flags", "out_of_range", "errors", "warnings"}``.  A missing or
+    non-finite value (``NaN``, ``Infinity``) is answered with ``400`` and the
+    same ``flags``/``errors``/``warnings``.
+``POST /predict/batch``
+    JSON ``{"mixes": [{...}, ...]}`` or ``{"features": [[8 numbers], ...]}``
+    returns ``{"strength": [...], "grade": [...], "flags": [...],
+    "out_of_range": [...]}``; rows that cannot be scored get ``null``
+    strength and grade.  A ``text/csv`` body is read like a dashboard
+    upload (``formats.read_frame``: the same header aliases, only the 8
+    inputs kept) and answered with the result CSV, validation columns
+    included.
+
+Every mix is checked by ``validation.validate`` and still scored; ``flags``
+is the per-row rule bitmask, as in batch output.
+
+``GET  /metrics``
+    Micro-batching counters (queue depth, batch sizes, added wait).
+
+Every scoring endpoint takes an optional ``?scheme=`` grade scheme.
+Connections are kept alive between requests.  Batch scoring runs on a
+bounded thread pool so the event loop only parses and serialises;
+concurrent ``/predict`` calls go through a ``MicroBatcher`` and are scored
+together.
+"""
+import asyncio
+import io
+import json
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .batch import add_result_columns, add_validation_columns, table_features
+from .batching import MAX_ROWS, MAX_WAIT_US, MicroBatcher
+from .columns import missing_columns, resolve_columns
+from .engine import INPUT_COLUMNS, engineer_features
+from .formats import frame_bytes, input_columns, read_frame, read_schema
+from .grades import get_scheme
+from .validation import ERROR, WARNING, flag_messages, training_bounds, validate
+
+API_HOST = '127.0.0.1'
+API_PORT = 8502
+
+MAX_BODY_BYTES = 256 * 1024 * 1024
+MAX_HEADER_BYTES = 64 * 1024
+KEEPALIVE_TIMEOUT = 15.0
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+def _mix_vector(obj):
+    """The 8 inputs of one JSON mix, in ``INPUT_COLUMNS`` order."""
+    if not isinstance(obj, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+    if 'features' in obj:
+        values = obj['features']
+        if not isinstance(values, list) or len(values) != len(INPUT_COLUMNS):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"'features' must hold {len(INPUT_COLUMNS)} numbers")
+        return values
+    rename = resolve_columns(obj)
+    obj = {rename.get(k, k): v for k, v in obj.items()}
+    missing = missing_columns(obj)
+    if missing:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing columns: {', '.join(missing)}")
+    return [obj[c] for c in INPUT_COLUMNS]
+
+
+def _batch_matrix(payload):
+    """(n, 8) float array from a JSON batch payload."""
+    if isinstance(payload, dict) and 'features' in payload:
+        X = np.asarray(payload['features'], dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(INPUT_COLUMNS):
+            raise ValueError(f"'features' must be a list of {len(INPUT_COLUMNS)}-number rows")
+        return X
+    mixes = payload.get('mixes') if isinstance(payload, dict) else payload
+    if not isinstance(mixes, list):
+        raise ValueError("Expected {'mixes': [...]} or {'features': [[...], ...]}")
+    if not mixes:
+        return np.empty((0, len(INPUT_COLUMNS)))
+    return np.asarray([_mix_vector(m) for m in mixes], dtype=np.float64)
+
+
+class PredictionServer:
+    """HTTP front end for a ``StrengthEngine`` or a hot-reloaded ``ModelSlot``.
+
+    With a slot, every request (or batch) scores with the version that was
+    current when it started.
+
+    ``workers`` bounds the scoring threads and ``max_pending`` the number of
+    scoring jobs admitted at once; further requests get ``503``.  Single
+    mixes go through ``batcher`` (a shared ``MicroBatcher``), or a private
+    one built from ``max_batch`` and ``max_wait_us``.
+    """
+
+    def __init__(self, engine, host=API_HOST, port=API_PORT, workers=None,
+                 max_pending=1024, max_batch=MAX_ROWS, max_wait_us=MAX_WAIT_US, batcher=None):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.max_wait_us = max_wait_us
+        self.batcher = batcher
+        self._own_batcher = batcher is None
+        self._server = None
+        self._executor = None
+
+    # --------------------------------------------------------
+    #  Lifecycle
+    # --------------------------------------------------------
+    async def start(self):
+        """Bind and start serving; returns the bound port (useful with ``port=0``)."""
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='concreteiq-api')
+        self._slots = asyncio.Semaphore(self.max_pending)
+        if self.batcher is None:
+            self.batcher = MicroBatcher(lambda X: self._engine().predict(X), self.max_batch, self.max_wait_us)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._own_batcher and self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    # --------------------------------------------------------
+    #  HTTP/1.1 connection handling
+    # --------------------------------------------------------
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                        *_json_body({'error': "Header too large"}), keep_alive=False)
+                    return
+
+                try:
+                    method, target, version, headers = _parse_head(head)
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST,
+                                        *_json_body({'error': "Malformed request"}), keep_alive=False)
+                    return
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                try:
+                    body = await self._read_body(reader, headers)
+                    status, content_type, payload = await self._dispatch(method, target, headers, body)
+                except HTTPError as e:
+                    status, (content_type, payload) = e.status, _json_body({'error': str(e)})
+                    if e.status in (HTTPStatus.REQUEST_ENTITY_TOO_LARGE, HTTPStatus.LENGTH_REQUIRED):
+                        keep_alive = False
+                except asyncio.IncompleteReadError:
+                    return
+                except Exception as e:
+                    status, (content_type, payload) = HTTPStatus.INTERNAL_SERVER_ERROR, _json_body({'error': str(e)})
+
+                await self._respond(writer, status, content_type, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_body(self, reader, headers):
+        if headers.get('transfer-encoding', 'identity').lower() != 'identity':
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Chunked request bodies are not supported")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        return await reader.readexactly(length) if length else b''
+
+    @staticmethod
+    async def _respond(writer, status, content_type, payload, keep_alive=True):
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+    # --------------------------------------------------------
+    #  Routes
+    # --------------------------------------------------------
+    async def _dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        routes = {
+            '/health':        ('GET', self._health),
+            '/metrics':       ('GET', self._metrics),
+            '/predict':       ('POST', self._predict),
+            '/predict/batch': ('POST', self._predict_batch),
+        }
+        if url.path not in routes:
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        allowed, handler = routes[url.path]
+        if method != allowed:
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+        try:
+            scheme = get_scheme(query['scheme'][0] if 'scheme' in query else None)
+        except KeyError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown grade scheme {query['scheme'][0]!r}") from None
+        return await handler(headers, body, scheme)
+
+    def _engine(self):
+        slot_version = getattr(self.engine, 'current', None)
+        return slot_version.engine if slot_version is not None else self.engine
+
+    async def _health(self, headers, body, scheme):
+        return (HTTPStatus.OK, *_json_body({'status': 'ok', 'model': self._engine().fingerprint}))
+
+    async def _metrics(self, headers, body, scheme):
+        return (HTTPStatus.OK, *_json_body(self.batcher.metrics.snapshot()))
+
+    async def _predict(self, headers, body, scheme):
+        features = _mix_vector(_load_json(body))
+        try:
+            features = [float(v) for v in features]
+        except (TypeError, ValueError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Mix values must be numbers") from None
+        report = validate(engineer_features(features), training_bounds(self._engine()))
+        flags = report.flags[0]
+        checks = {'flags': int(flags), 'out_of_range': bool(report.out_of_range[0]),
+                  'errors': flag_messages(flags, ERROR), 'warnings': flag_messages(flags, WARNING)}
+        if not all(map(math.isfinite, features)):
+            return (HTTPStatus.BAD_REQUEST,
+                    *_json_body({'error': "Mix values must be finite numbers", **checks}))
+        async with self._admit():
+            pred = await asyncio.wrap_future(self.batcher.submit(features))
+        return (HTTPStatus.OK, *_json_body({'strength': pred, 'grade': scheme.grade(pred)[0], **checks}))
+
+    async def _predict_batch(self, headers, body, scheme):
+        content_type = headers.get('content-type', 'application/json').split(';')[0].strip().lower()
+        if content_type == 'text/csv':
+            work = self._score_csv
+        elif content_type == 'application/json':
+            work = self._score_json
+        else:
+            raise HTTPError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
+        async with self._admit():
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, work, body, scheme)
+            except ValueError as e:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, str(e)) from None
+
+    def _admit(self):
+        if self._slots.locked():
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Server busy, retry later")
+        return self._slots
+
+    # Batch work runs on the executor: parsing large bodies is CPU-bound too
+    def _score_json(self, body, scheme):
+        engine = self._engine()
+        F = engineer_features(_batch_matrix(_load_json(body)))
+        report = validate(F, training_bounds(engine))
+        preds = engine.predict_features(F)
+        scored = np.isfinite(preds)
+        return (HTTPStatus.OK, *_json_body({'strength': np.where(scored, preds, None).tolist(),
+                                            'grade': np.where(scored, scheme.classify(preds).code, None).tolist(),
+                                            'flags': report.flags.tolist(),
+                                            'out_of_range': report.out_of_range.tolist()}))
+
+    def _score_csv(self, body, scheme):
+        engine = self._engine()
+        src = io.BytesIO(body)
+        try:
+            names = read_schema(src, 'csv')
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Unreadable CSV: {e}") from None
+        # Missing inputs and unparseable values raise ValueError (ArrowInvalid is one)
+        df = read_frame(src, 'csv', input_columns(names))
+        F = table_features(df)
+        report = validate(F, training_bounds(engine))
+        add_result_columns(df, engine.predict_features(F), scheme)
+        add_validation_columns(df, report)
+        return HTTPStatus.OK, 'text/csv; charset=utf-8', frame_bytes(df, 'csv')
+
+
+def _parse_head(head):
+    lines = head.decode('latin-1').split('\r\n')
+    method, target, version = lines[0].split(' ')
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _load_json(body):
+    try:
+        return json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}") from None
+
+
+def _json_body(obj):
+    # NaN/Infinity are not JSON; a non-finite value reaching here is a bug
+    return 'application/json', json.dumps(obj, allow_nan=False).encode('utf-8')
+
+
+def serve(engine, host=API_HOST, port=API_PORT, **kwargs):
+    """Run the API in the current thread until interrupted."""
+    asyncio.run(PredictionServer(engine, host, port, **kwargs).serve_forever())
+
+
+def serve_in_thread(engine, host=API_HOST, port=API_PORT, **kwargs):
+    """Start the API on a daemon thread with its own event loop.
+
+    Returns the ``PredictionServer`` once it is listening.
+    """
+    server = PredictionServer(engine, host, port, **kwargs)
+    ready = threading.Event()
+    failure = []
+
+    def run():
+        async def main():
+            try:
+                await server.start()
+            except OSError as e:
+                failure.append(e)
+                return
+            finally:
+                ready.set()
+            await server.serve_forever()
+        asyncio.run(main())
+
+    threading.Thread(target=run, name='concreteiq-api', daemon=True).start()
+    ready.wait()
+    if failure:
+        raise failure[0]
+    return server
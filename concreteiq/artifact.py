@@ -0,0 +1,198 @@
+"""Versioned binary model artifact (``.ciq``), loaded without pickle.
+
+Layout (all integers little-endian)::
+
+    b'CIQMODEL'                 8-byte magic
+    uint32  format version
+    uint32  header length H
+    H bytes JSON header         space-padded so the data section is 8-byte aligned
+    data section                raw '<f8' arrays at the offsets listed in the header
+
+The header holds the model type, feature names, target name, training
+metrics, intercept, the ``arrays`` table (``{name: {offset, shape}}``,
+offsets relative to the data section) and ``content_hash``: the SHA-256 of
+the canonical header without the hash, followed by the data section.  The
+hash doubles as the model fingerprint, so telling versions apart only needs
+the header.
+
+Arrays are opened with ``np.memmap`` (read-only), so processes loading the
+same artifact share its pages.  Only linear models (coefficients + optional
+standard scaler) are representable; ``convert_pickle`` turns the existing
+joblib file into an artifact.
+"""
+import hashlib
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'CIQMODEL'
+FORMAT_VERSION = 1
+ARTIFACT_SUFFIX = '.ciq'
+
+_PREAMBLE = struct.Struct('<8sII')
+_DTYPE = np.dtype('<f8')
+
+
+class LinearModel:
+    """Coefficients of a linear regression, in ``feature_names`` order."""
+
+    def __init__(self, coef, intercept, name='LinearRegression'):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.name = name
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+class StandardScalerParams:
+    """``mean_``/``scale_`` of a fitted standard scaler."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+def is_artifact(path):
+    with open(path, 'rb') as fh:
+        return fh.read(len(MAGIC)) == MAGIC
+
+
+def _content_hash(header, data):
+    meta = {k: v for k, v in header.items() if k != 'content_hash'}
+    h = hashlib.sha256(json.dumps(meta, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    h.update(data)
+    return h.hexdigest()
+
+
+def _to_builtin(value):
+    """JSON-safe copy of metric values (NumPy scalars become floats)."""
+    if isinstance(value, dict):
+        return {str(k): _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def write_artifact(path, coef, intercept, feature_names, scaler_mean=None, scaler_scale=None,
+                   metrics=None, target_name=None, model_type='LinearRegression'):
+    """Write a linear model to ``path``; returns its content hash."""
+    arrays = {'coef': coef}
+    if scaler_mean is not None:
+        arrays['scaler_mean'] = scaler_mean
+    if scaler_scale is not None:
+        arrays['scaler_scale'] = scaler_scale
+
+    table, chunks, offset = {}, [], 0
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values, dtype=_DTYPE)
+        if values.shape != (len(feature_names),):
+            raise ValueError(f"{name!r} has shape {values.shape}, expected ({len(feature_names)},)")
+        table[name] = {'offset': offset, 'shape': list(values.shape)}
+        chunks.append(values.tobytes())
+        offset += values.nbytes
+    data = b''.join(chunks)
+
+    header = {
+        'format': FORMAT_VERSION,
+        'model_type': model_type,
+        'feature_names': list(feature_names),
+        'target_name': target_name,
+        'metrics': _to_builtin(metrics or {}),
+        'intercept': float(intercept),
+        'arrays': table,
+    }
+    header['content_hash'] = _content_hash(header, data)
+
+    blob = json.dumps(header, indent=1).encode('utf-8')
+    blob += b' ' * (-(_PREAMBLE.size + len(blob)) % _DTYPE.itemsize)
+    with open(path, 'wb') as fh:
+        fh.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(blob)))
+        fh.write(blob)
+        fh.write(data)
+    return header['content_hash']
+
+
+def read_header(path):
+    """``(header, data_offset)`` of an artifact, reading only the header."""
+    with open(path, 'rb') as fh:
+        preamble = fh.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{path}: truncated model artifact")
+        magic, version, length = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a model artifact")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{path}: artifact format {version} is newer than supported ({FORMAT_VERSION})")
+        header = json.loads(fh.read(length))
+    return header, _PREAMBLE.size + length
+
+
+def artifact_fingerprint(path):
+    """The embedded content hash; no data is read."""
+    return read_header(path)[0]['content_hash']
+
+
+def load_artifact(path, verify=True):
+    """Load an artifact into the ``model_data`` dict shape the app uses.
+
+    Arrays are read-only memory maps.  With ``verify`` the data section is
+    re-hashed and a mismatch raises ``ValueError``.
+    """
+    header, data_offset = read_header(path)
+    table = header['arrays']
+    size = sum(int(np.prod(spec['shape'])) for spec in table.values()) * _DTYPE.itemsize
+    if verify:
+        with open(path, 'rb') as fh:
+            fh.seek(data_offset)
+            data = fh.read(size)
+        if len(data) != size or _content_hash(header, data) != header['content_hash']:
+            raise ValueError(f"{path}: model artifact content hash mismatch")
+
+    arrays = {name: np.memmap(path, dtype=_DTYPE, mode='r', offset=data_offset + spec['offset'],
+                              shape=tuple(spec['shape']))
+              for name, spec in table.items()}
+    scaler = None
+    if 'scaler_mean' in arrays or 'scaler_scale' in arrays:
+        n = len(header['feature_names'])
+        scaler = StandardScalerParams(arrays.get('scaler_mean', np.zeros(n)),
+                                      arrays.get('scaler_scale', np.ones(n)))
+    return {
+        'model': LinearModel(arrays['coef'], header['intercept'], header.get('model_type', 'LinearRegression')),
+        'scaler': scaler,
+        'feature_names': header['feature_names'],
+        'target_name': header.get('target_name'),
+        'metrics': header.get('metrics', {}),
+        'model_type': header.get('model_type'),
+        'content_hash': header['content_hash'],
+        'format': header['format'],
+    }
+
+
+def convert_pickle(src, dst):
+    """Convert a joblib ``model_data`` file to an artifact; returns the content hash.
+
+    Raises ``ValueError`` for models that are not linear.
+    """
+    from .engine import FEATURE_NAMES, load_model
+
+    model_data = load_model(src)
+    model = model_data.get('model')
+    coef = getattr(model, 'coef_', None)
+    if coef is None or getattr(model, 'intercept_', None) is None:
+        raise ValueError(f"{src}: only linear models can be converted "
+                         f"(got {type(model).__name__})")
+    coef = np.ravel(coef)
+    feature_names = list(model_data.get('feature_names') or FEATURE_NAMES)
+    scaler = model_data.get('scaler')
+    return write_artifact(
+        dst, coef, float(np.ravel(model.intercept_)[0]), feature_names,
+        scaler_mean=getattr(scaler, 'mean_', None), scaler_scale=getattr(scaler, 'scale_', None),
+        metrics=model_data.get('metrics'), target_name=model_data.get('target_name'),
+        model_type=type(model).__name__)
@@ -0,0 +1,260 @@
+"""Batch scoring helpers, including a bounded-memory streaming scorer."""
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .engine import INPUT_COLUMNS, features_from_columns, wc_ratio
+from .grades import classify, get_scheme, scheme_keys
+from .validation import ValidationSummary, training_bounds, validate
+
+PRED_COL = 'Predicted Strength (MPa)'
+GRADE_COL = 'Grade'
+WC_COL = 'W/C Ratio'
+FLAGS_COL = 'Validation Flags'
+OOD_COL = 'Outside Training Range'
+
+# Side-by-side scoring: per-row spread across the compared models
+SPREAD_COLS = ('Model Mean (MPa)', 'Model Std (MPa)', 'Model Range (MPa)')
+
+CHUNK_ROWS = 100_000
+
+# Fixed strength bins so the streamed histogram never needs the raw values
+HIST_EDGES = np.arange(0.0, 152.5, 2.5)
+
+
+def add_result_columns(df, preds, scheme=None):
+    """Append prediction, grade and W/C ratio columns to ``df`` in place.
+
+    Rows without a finite prediction (missing inputs) get no grade.
+    """
+    df[PRED_COL] = preds
+    grades = classify(preds, scheme).categorical()
+    grades[~np.isfinite(preds)] = np.nan
+    df[GRADE_COL] = grades
+    df[WC_COL] = wc_ratio(df['Water'], df['Cement'])
+    return df
+
+
+def add_validation_columns(df, report):
+    """Append the per-row flag bitmask and out-of-training-range indicator."""
+    df[FLAGS_COL] = report.flags
+    df[OOD_COL] = report.out_of_range
+    return df
+
+
+def model_column(name):
+    """Output column holding the predictions of model ``name``."""
+    return f"Strength [{name}] (MPa)"
+
+
+def curve_column(age):
+    """Wide-format output column holding the predictions at ``age`` days."""
+    return f"Strength @ {age:g}d (MPa)"
+
+
+def add_curve_columns(df, curve, ages):
+    """Append one ``curve_column`` per age from an ``(n, len(ages))`` array."""
+    for j, age in enumerate(ages):
+        df[curve_column(age)] = curve[:, j]
+    return df
+
+
+def table_features(table, columns=INPUT_COLUMNS):
+    """Engineered feature matrix for a column mapping holding the 8 inputs."""
+    cols = [np.asarray(table[c], dtype=np.float64) for c in columns]
+    return features_from_columns(cols, len(cols[0]))
+
+
+def score_models(engines, table, columns=INPUT_COLUMNS):
+    """``{name: predictions}`` for each engine in ``engines`` (``{name: engine}``).
+
+    The engineered feature matrix is built once from ``table`` and shared by
+    every model.
+    """
+    F = table_features(table, columns)
+    return {name: engine.predict_features(F) for name, engine in engines.items()}
+
+
+def add_model_columns(df, preds_by_model):
+    """Append one column per model plus ``SPREAD_COLS`` to ``df`` in place."""
+    P = np.column_stack(list(preds_by_model.values()))
+    for name, preds in preds_by_model.items():
+        df[model_column(name)] = preds
+    mean_col, std_col, range_col = SPREAD_COLS
+    df[mean_col] = P.mean(axis=1)
+    df[std_col] = P.std(axis=1, ddof=1) if P.shape[1] > 1 else 0.0
+    df[range_col] = np.ptp(P, axis=1)
+    return df
+
+
+class RunningStats:
+    """Count, mean, std, min and max over a stream of chunks.
+
+    Chunks are merged with Chan et al.'s pairwise update, which stays
+    numerically stable where a running sum of squares would not.
+    ``std`` uses ``ddof=1`` to match ``pandas.Series.std``.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if x.size == 0:
+            return self
+        mean_b = float(x.mean())
+        return self._combine(x.size, mean_b, float(np.square(x - mean_b).sum()),
+                             float(x.min()), float(x.max()))
+
+    def merge(self, other):
+        """Fold in statistics computed elsewhere (another chunk or worker)."""
+        if other.count == 0:
+            return self
+        return self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, n, mean_b, m2_b, min_b, max_b):
+        total = self.count + n
+        delta = mean_b - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2_b + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, min_b)
+        self.max = max(self.max, max_b)
+        return self
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+    def to_dict(self):
+        if not self.count:
+            return {'count': 0}
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, d):
+        stats = cls()
+        if d.get('count'):
+            stats._combine(d['count'], d['mean'], d['m2'], d['min'], d['max'])
+        return stats
+
+
+@dataclass
+class BatchSummary:
+    """Everything the batch page shows that does not need the raw rows.
+
+    Grade counts are kept for every registered scheme, so switching schemes
+    after a streamed run needs neither the rows nor the model.
+    """
+    stats: RunningStats = field(default_factory=RunningStats)
+    grade_bins: dict = field(default_factory=dict)
+    hist_counts: np.ndarray = field(default_factory=lambda: np.zeros(len(HIST_EDGES) - 1, dtype=np.int64))
+    validation: ValidationSummary = field(default_factory=ValidationSummary)
+
+    @property
+    def rows(self):
+        return self.stats.count
+
+    def update(self, preds, report=None):
+        """Fold in a chunk's predictions and, if given, its ``ValidationReport``."""
+        if report is not None:
+            self.validation.merge(report.summary)
+        self.stats.update(preds)
+        for key in scheme_keys():
+            scheme = get_scheme(key)
+            counts = np.bincount(scheme.grade_index(preds), minlength=len(scheme.grades))
+            if key in self.grade_bins:
+                self.grade_bins[key] += counts
+            else:
+                self.grade_bins[key] = counts
+        # Out-of-range values land in the first/last bin
+        clipped = np.clip(preds, HIST_EDGES[0], np.nextafter(HIST_EDGES[-1], 0))
+        self.hist_counts += np.histogram(clipped, bins=HIST_EDGES)[0]
+        return self
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        for key, counts in other.grade_bins.items():
+            if key in self.grade_bins:
+                self.grade_bins[key] += counts
+            else:
+                self.grade_bins[key] = counts.copy()
+        self.hist_counts += other.hist_counts
+        self.validation.merge(other.validation)
+        return self
+
+    def grade_counts(self, scheme=None):
+        """``{code: count}`` under ``scheme`` for the grades that occur."""
+        scheme = get_scheme(scheme)
+        counts = self.grade_bins.get(scheme.key, ())
+        return {code: int(c) for code, c in zip(scheme.codes, counts) if c}
+
+    def to_dict(self):
+        """JSON-safe form, e.g. to keep next to a persisted result file."""
+        return {'stats': self.stats.to_dict(),
+                'grade_bins': {k: v.tolist() for k, v in self.grade_bins.items()},
+                'hist_counts': self.hist_counts.tolist(),
+                'validation': self.validation.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(RunningStats.from_dict(d['stats']),
+                   {k: np.asarray(v, dtype=np.int64) for k, v in d['grade_bins'].items()},
+                   np.asarray(d['hist_counts'], dtype=np.int64),
+                   ValidationSummary.from_dict(d['validation']))
+
+
+def score_chunks(engine, src, dst, summary, in_fmt='csv', out_fmt='csv', chunksize=CHUNK_ROWS,
+                 scheme=None, compare=None, curve_ages=None):
+    """Generator behind ``stream_score``: scores one chunk per step, folds it
+    into ``summary`` and yields the rows done so far.
+
+    Closing the generator early closes ``dst`` with the chunks written so far.
+    """
+    from .formats import FrameWriter, input_columns, iter_frames, read_schema
+
+    selected = input_columns(read_schema(src, in_fmt))
+    bounds = training_bounds(engine)
+    with FrameWriter(dst, out_fmt) as writer:
+        for chunk in iter_frames(src, in_fmt, chunksize, selected):
+            F = table_features(chunk)
+            report = validate(F, bounds)
+            preds = engine.predict_features(F)
+            add_result_columns(chunk, preds, scheme)
+            add_validation_columns(chunk, report)
+            if compare:
+                add_model_columns(chunk, {name: preds if other is engine else other.predict_features(F)
+                                          for name, other in compare.items()})
+            if curve_ages:
+                add_curve_columns(chunk, engine.predict_curve_features(F, curve_ages), curve_ages)
+            summary.update(preds, report)
+            writer.write(chunk)
+            yield summary.rows
+
+
+def stream_score(engine, src, dst, in_fmt='csv', out_fmt='csv', chunksize=CHUNK_ROWS,
+                 progress=None, scheme=None, compare=None, curve_ages=None):
+    """Score ``src`` chunk by chunk, appending results to ``dst``.
+
+    ``src`` and ``dst`` are paths or binary buffers in the ``formats``
+    formats ``in_fmt``/``out_fmt``; only the 8 input columns are read.
+    Only one chunk is held in memory at a time.  ``progress(rows_done)`` is
+    called after each chunk.  The written ``Grade`` column uses ``scheme``.
+    ``compare`` (``{name: engine}``, which may include ``engine`` itself)
+    adds side-by-side columns per model, scored from the same feature
+    matrix; the summary always describes ``engine``.  ``curve_ages`` adds
+    one ``curve_column`` per age (wide-format strength-gain curves).  Each
+    chunk is also checked by ``validation.validate`` and gets the flag
+    columns.  Raises ``ValueError`` if required columns are missing.
+    """
+    summary = BatchSummary()
+    for rows in score_chunks(engine, src, dst, summary, in_fmt, out_fmt, chunksize, scheme, compare,
+                             curve_ages):
+        if progress is not None:
+            progress(rows)
+    return summary
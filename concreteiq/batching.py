@@ -0,0 +1,159 @@
+"""Micro-batching of concurrent single-mix predictions.
+
+Scoring one row at a time pays the fixed per-call cost (array setup, the
+feature kernel, the dot product) for every request.  ``MicroBatcher``
+queues rows submitted from any thread (dashboard sessions, API handlers)
+and a single worker scores them together: a batch is dispatched when
+``max_rows`` rows are waiting or the oldest has waited ``max_wait_us``
+microseconds.  Each caller gets its result through a
+``concurrent.futures.Future``.
+
+``BatchMetrics`` records queue depth, a batch-size histogram and the wait
+each row spent in the queue, for tuning the latency/throughput trade-off.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from .engine import INPUT_COLUMNS
+
+MAX_ROWS = 256
+MAX_WAIT_US = 200
+
+# Upper bucket edges of the added-wait histogram, in microseconds
+WAIT_EDGES_US = (50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, np.inf)
+
+
+class BatchMetrics:
+    """Counters for a ``MicroBatcher``; read them through ``snapshot``."""
+
+    def __init__(self, max_rows):
+        # Batch sizes bucketed by powers of two: 1, 2, 3-4, 5-8, ...
+        self.size_edges = tuple(1 << k for k in range(max(max_rows - 1, 1).bit_length() + 1))
+        self.size_hist = np.zeros(len(self.size_edges), dtype=np.int64)
+        self.wait_hist = np.zeros(len(WAIT_EDGES_US), dtype=np.int64)
+        self.batches = 0
+        self.rows = 0
+        self.wait_total_us = 0.0
+        self.wait_max_us = 0.0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def _record(self, waits_us):
+        n = len(waits_us)
+        self.batches += 1
+        self.rows += n
+        self.size_hist[np.searchsorted(self.size_edges, n)] += 1
+        self.wait_hist += np.bincount(np.searchsorted(WAIT_EDGES_US, waits_us),
+                                      minlength=len(WAIT_EDGES_US))
+        self.wait_total_us += float(waits_us.sum())
+        self.wait_max_us = max(self.wait_max_us, float(waits_us.max()))
+
+    def snapshot(self):
+        """Plain-dict copy of the counters (JSON-serialisable)."""
+        return {
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+            'batch_size_hist': {f"<={e}": int(c) for e, c in zip(self.size_edges, self.size_hist)},
+            'mean_wait_us': self.wait_total_us / self.rows if self.rows else 0.0,
+            'max_wait_us': self.wait_max_us,
+            'wait_us_hist': {(f"<={e:g}" if np.isfinite(e) else f">{WAIT_EDGES_US[-2]:g}"): int(c)
+                             for e, c in zip(WAIT_EDGES_US, self.wait_hist)},
+        }
+
+
+class MicroBatcher:
+    """Coalesces single-mix requests into batched calls of ``predict``.
+
+    ``predict`` scores an (n, 8) float array, e.g. ``engine.predict``.
+    """
+
+    def __init__(self, predict, max_rows=MAX_ROWS, max_wait_us=MAX_WAIT_US):
+        if max_rows < 1:
+            raise ValueError("max_rows must be at least 1")
+        self._predict = predict
+        self.max_rows = max_rows
+        self.max_wait_us = max_wait_us
+        self.metrics = BatchMetrics(max_rows)
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='concreteiq-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, features):
+        """Queue one 8-value mix; returns a ``Future`` for its prediction."""
+        row = np.asarray(features, dtype=np.float64).reshape(len(INPUT_COLUMNS))
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.append((row, future, time.perf_counter()))
+            depth = len(self._queue)
+            self.metrics.queue_depth = depth
+            self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, depth)
+            # Wake the worker for the first row (to start the timer) or a full batch
+            if depth == 1 or depth >= self.max_rows:
+                self._cond.notify()
+        return future
+
+    def predict_one(self, features, timeout=None):
+        return self.submit(features).result(timeout)
+
+    def predict(self, X, timeout=None):
+        """Score the rows of an (n, 8) array through the queue."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(INPUT_COLUMNS))
+        futures = [self.submit(row) for row in X]
+        return np.array([f.result(timeout) for f in futures], dtype=np.float64)
+
+    def _take(self):
+        """Block until a batch is due; returns it, or ``None`` once closed."""
+        with self._cond:
+            while not self._queue:
+                if self._closed:
+                    return None
+                self._cond.wait()
+            deadline = self._queue[0][2] + self.max_wait_us / 1e6
+            while len(self._queue) < self.max_rows and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            n = min(len(self._queue), self.max_rows)
+            batch = [self._queue.popleft() for _ in range(n)]
+            self.metrics.queue_depth = len(self._queue)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            now = time.perf_counter()
+            waits_us = np.array([(now - t) * 1e6 for _, _, t in batch])
+            live = [(row, f) for row, f, _ in batch if f.set_running_or_notify_cancel()]
+            with self._cond:
+                self.metrics._record(waits_us)
+            if not live:
+                continue
+            try:
+                preds = self._predict(np.stack([row for row, _ in live]))
+            except Exception as e:
+                for _, f in live:
+                    f.set_exception(e)
+                continue
+            for (_, f), pred in zip(live, preds.tolist()):
+                f.set_result(pred)
+
+    def close(self):
+        """Stop accepting rows; queued rows are still scored."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join()
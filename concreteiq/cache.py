@@ -0,0 +1,226 @@
+"""Persistent prediction cache keyed by canonicalised mix.
+
+Each mix is rounded to ``decimals`` places and hashed to a 64-bit key with a
+vectorized FNV-style hash over its eight float64 words.  Lookups go through
+an in-memory LRU tier first and a SQLite table second; only the misses are
+sent to the model.  Every stored row keeps its canonical mix bytes, so a
+hash collision is detected and treated as a miss rather than returning the
+wrong prediction.
+
+The SQLite tier holds at most ``disk_capacity`` rows.  Each row records when
+it was last stored or read from disk; once the table grows past the cap the
+least recently used rows are evicted.  Hits served from memory do not touch
+the disk, so recency there is approximate.
+
+The cache is bound to a model fingerprint.  Opening it with a different
+fingerprint (i.e. after the model file changed) drops every stored entry.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .engine import INPUT_COLUMNS
+
+CACHE_PATH = '.concreteiq_cache.sqlite'
+DECIMALS = 3
+MEMORY_CAPACITY = 100_000
+DISK_CAPACITY = 1_000_000
+
+# SQLite's default bound-parameter limit is 999 on older builds
+_SQL_CHUNK = 900
+
+_SEED = np.uint64(0xCBF29CE484222325)
+_PRIME = np.uint64(0x100000001B3)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def canonical_mixes(X, decimals=DECIMALS):
+    """Round an (n, 8) mix array to the cache's key precision."""
+    X = np.asarray(X, dtype=np.float64).reshape(-1, len(INPUT_COLUMNS))
+    # ``+ 0.0`` folds -0.0 into 0.0 so both hash alike
+    return np.ascontiguousarray(np.round(X, decimals) + 0.0)
+
+
+def mix_keys(Q):
+    """Signed 64-bit keys for the rows of a canonical mix array."""
+    words = Q.view(np.uint64)
+    h = np.full(len(Q), _SEED, dtype=np.uint64)
+    for j in range(words.shape[1]):
+        h ^= words[:, j]
+        h *= _PRIME
+    # splitmix64 finaliser spreads the low-entropy float bits over the key
+    h ^= h >> np.uint64(30)
+    h *= _MIX1
+    h ^= h >> np.uint64(27)
+    h *= _MIX2
+    h ^= h >> np.uint64(31)
+    return h.view(np.int64)
+
+
+class PredictionCache:
+    """Two-tier (LRU memory + SQLite) cache of predictions per mix.
+
+    Safe to share between threads (Streamlit sessions).  ``hits_memory``,
+    ``hits_disk`` and ``misses`` count rows, not distinct mixes.
+    """
+
+    def __init__(self, path=CACHE_PATH, fingerprint='', capacity=MEMORY_CAPACITY,
+                 decimals=DECIMALS, disk_capacity=DISK_CAPACITY):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.capacity = capacity
+        self.disk_capacity = disk_capacity
+        self.decimals = decimals
+        self.hits_memory = self.hits_disk = self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self):
+        db = self._db
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        columns = [row[1] for row in db.execute("PRAGMA table_info(preds)")]
+        if columns and 'used' not in columns:
+            # Table from before the disk tier was bounded; it is only a cache
+            db.execute("DROP TABLE preds")
+        db.execute("CREATE TABLE IF NOT EXISTS preds (key INTEGER PRIMARY KEY, "
+                   "mix BLOB NOT NULL, pred REAL NOT NULL, used REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS preds_used ON preds (used)")
+        self._bind(self.fingerprint)
+        self._rows = db.execute("SELECT COUNT(*) FROM preds").fetchone()[0]
+
+    def _bind(self, fingerprint):
+        # Entries from another model (or rounding) are unusable: drop them
+        wanted = {'fingerprint': fingerprint, 'decimals': str(self.decimals)}
+        meta = dict(self._db.execute("SELECT name, value FROM meta"))
+        if any(meta.get(k) != v for k, v in wanted.items()):
+            self._memory.clear()
+            self._db.execute("DELETE FROM preds")
+            self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", wanted.items())
+            self._rows = 0
+        self._db.commit()
+        self.fingerprint = fingerprint
+
+    def rebind(self, fingerprint):
+        """Switch to another model fingerprint, invalidating the cache if it changed."""
+        with self._lock:
+            if fingerprint != self.fingerprint:
+                self._bind(fingerprint)
+
+    @property
+    def hits(self):
+        return self.hits_memory + self.hits_disk
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM preds").fetchone()[0]
+
+    def predict(self, X, compute, fingerprint=None):
+        """Predictions for the (n, 8) mixes ``X``.
+
+        ``compute`` scores an (m, 8) array of canonical mixes that were not
+        cached (typically ``engine.predict``).  ``fingerprint`` names the
+        model behind ``compute``; if the cache is bound to another model the
+        call bypasses the cache entirely.
+        """
+        if fingerprint is not None and fingerprint != self.fingerprint:
+            return np.asarray(compute(np.asarray(X, dtype=np.float64).reshape(-1, len(INPUT_COLUMNS))),
+                              dtype=np.float64)
+        fingerprint = self.fingerprint
+        Q = canonical_mixes(X, self.decimals)
+        keys = mix_keys(Q)
+        uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        preds = np.empty(len(uniq))
+        found = np.zeros(len(uniq), dtype=bool)
+        mixes = [Q[i].tobytes() for i in first]
+        key_list = uniq.tolist()
+
+        with self._lock:
+            memory = self._memory
+            for i, k in enumerate(key_list):
+                entry = memory.get(k)
+                if entry is not None and entry[0] == mixes[i]:
+                    memory.move_to_end(k)
+                    preds[i] = entry[1]
+                    found[i] = True
+            in_memory = found.copy()
+
+            todo = np.flatnonzero(~found)
+            pos = {key_list[i]: i for i in todo}
+            read = []
+            for s in range(0, len(todo), _SQL_CHUNK):
+                chunk = [key_list[i] for i in todo[s:s + _SQL_CHUNK]]
+                sql = f"SELECT key, mix, pred FROM preds WHERE key IN ({','.join('?' * len(chunk))})"
+                for k, mix, pred in self._db.execute(sql, chunk):
+                    i = pos[k]
+                    if mix == mixes[i]:
+                        preds[i] = pred
+                        found[i] = True
+                        read.append(k)
+                        self._remember(k, mix, pred)
+            if read:
+                now = time.time()
+                self._db.executemany("UPDATE preds SET used = ? WHERE key = ?",
+                                     [(now, k) for k in read])
+                self._db.commit()
+
+            row_counts = np.bincount(inverse.ravel(), minlength=len(uniq))
+            self.hits_memory += int(row_counts[in_memory].sum())
+            self.hits_disk += int(row_counts[found & ~in_memory].sum())
+            self.misses += int(row_counts[~found].sum())
+
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            preds[missing] = compute(Q[first[missing]])
+            now = time.time()
+            rows = [(key_list[i], mixes[i], float(preds[i]), now) for i in missing]
+            with self._lock:
+                if self.fingerprint != fingerprint:
+                    # Rebound to a new model while computing: don't store stale results
+                    return preds[inverse.ravel()]
+                for row in rows:
+                    self._remember(*row[:3])
+                self._db.executemany("INSERT OR REPLACE INTO preds VALUES (?, ?, ?, ?)", rows)
+                self._rows += len(rows)
+                if self._rows > self.disk_capacity:
+                    self._evict()
+                self._db.commit()
+
+        return preds[inverse.ravel()]
+
+    def predict_one(self, features, compute, fingerprint=None):
+        """Cached prediction for a single mix; arguments as in ``predict``."""
+        return float(self.predict(features, compute, fingerprint)[0])
+
+    def _remember(self, key, mix, pred):
+        self._memory[key] = (mix, pred)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        # ``_rows`` over-counts replaced keys; recount before deleting anything
+        self._rows = self._db.execute("SELECT COUNT(*) FROM preds").fetchone()[0]
+        excess = self._rows - self.disk_capacity
+        if excess > 0:
+            self._db.execute("DELETE FROM preds WHERE key IN "
+                             "(SELECT key FROM preds ORDER BY used LIMIT ?)", (excess,))
+            self._rows -= excess
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM preds")
+            self._db.commit()
+            self._rows = 0
+            self.hits_memory = self.hits_disk = self.misses = 0
+
+    def close(self):
+        self._db.close()
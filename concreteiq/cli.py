@@ -0,0 +1,121 @@
+"""Command-line entry point: ``python -m concreteiq <command> ...``."""
+import argparse
+import sys
+import time
+
+from .api import API_HOST, API_PORT
+from .batch import FLAGS_COL
+from .batching import MAX_ROWS, MAX_WAIT_US
+from .engine import CURVE_AGES, MODEL_PATH
+from .grades import GRADE_SCHEMES_PATH, scheme_keys
+from .parallel import SHARD_BYTES
+
+
+def _cmd_score(args):
+    from .parallel import score_file
+
+    t0 = time.perf_counter()
+    summary = score_file(args.input, args.output, model_path=args.model,
+                         workers=args.workers, shard_bytes=args.shard_mb * 1024 * 1024,
+                         scheme=args.grade_scheme, curve_ages=args.curve_ages)
+    elapsed = time.perf_counter() - t0
+
+    stats = summary.stats
+    print(f"Scored {summary.rows:,} rows in {elapsed:.2f}s "
+          f"({summary.rows / max(elapsed, 1e-9):,.0f} rows/s) -> {args.output}")
+    if summary.rows:
+        print(f"  mean {stats.mean:.2f}  std {stats.std:.2f}  "
+              f"min {stats.min:.2f}  max {stats.max:.2f} MPa")
+        for grade, count in summary.grade_counts(args.grade_scheme).items():
+            print(f"  {grade:<7} {count:>12,}")
+        checks = summary.validation
+        if checks.flagged_rows:
+            print(f"Validation: {checks.error_rows:,} rows with errors, {checks.warning_rows:,} with "
+                  f"warnings, {checks.ood_rows:,} outside the training range "
+                  f"(bitmask in '{FLAGS_COL}')")
+            for severity, message, rows in checks.items():
+                print(f"  {severity:<7} {rows:>12,}  {message}")
+    return 0
+
+
+def _cmd_serve(args):
+    from .api import serve
+    from .registry import ModelSlot
+
+    slot = ModelSlot(args.model)
+    if args.watch:
+        slot.watch()
+    print(f"Serving {args.model} ({slot.current.label}) on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        serve(slot, args.host, args.port, workers=args.workers,
+              max_batch=args.max_batch, max_wait_us=args.max_wait_us)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _cmd_convert(args):
+    from .artifact import convert_pickle
+
+    digest = convert_pickle(args.input, args.output)
+    print(f"Wrote {args.output} (content hash {digest[:16]}…)")
+    return 0
+
+
+def _ages(text):
+    try:
+        ages = tuple(float(a) for a in text.split(',') if a.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated days, got {text!r}")
+    if not ages or min(ages) < 1:
+        raise argparse.ArgumentTypeError("ages must be at least 1 day")
+    return ages
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='concreteiq', description="ConcreteIQ strength predictor")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('score', help="Batch-score a CSV, Parquet or Arrow file")
+    p.add_argument('input', help="input .csv, .csv.gz, .csv.zst, .parquet or .arrow/.feather file")
+    p.add_argument('output', help="output file; format follows the extension")
+    p.add_argument('--model', default=MODEL_PATH, help="model file (default: %(default)s)")
+    p.add_argument('-j', '--workers', type=int, default=None,
+                   help="worker processes (default: all cores)")
+    p.add_argument('--shard-mb', type=int, default=SHARD_BYTES // (1024 * 1024),
+                   help="approximate shard size in MB (default: %(default)s)")
+    p.add_argument('--grade-scheme', default=None, choices=scheme_keys(),
+                   help=f"grade scheme from {GRADE_SCHEMES_PATH} (default: the file's default)")
+    p.add_argument('--curve-ages', type=_ages, default=None, metavar='DAYS',
+                   help="also write the predicted strength at these ages, comma-separated "
+                        f"(e.g. {','.join(map(str, CURVE_AGES))})")
+    p.set_defaults(func=_cmd_score)
+
+    p = sub.add_parser('serve', help="Serve predictions over HTTP")
+    p.add_argument('--model', default=MODEL_PATH, help="model file (default: %(default)s)")
+    p.add_argument('--host', default=API_HOST, help="bind address (default: %(default)s)")
+    p.add_argument('--port', type=int, default=API_PORT, help="port (default: %(default)s)")
+    p.add_argument('-j', '--workers', type=int, default=None,
+                   help="scoring threads (default: up to 8)")
+    p.add_argument('--max-batch', type=int, default=MAX_ROWS,
+                   help="max single-mix requests scored together (default: %(default)s)")
+    p.add_argument('--max-wait-us', type=int, default=MAX_WAIT_US,
+                   help="max microseconds a request waits for others (default: %(default)s)")
+    p.add_argument('--watch', action='store_true',
+                   help="reload the model when the file changes")
+    p.set_defaults(func=_cmd_serve)
+
+    p = sub.add_parser('convert', help="Convert a pickled model to a binary .ciq artifact")
+    p.add_argument('input', help="joblib .pkl model file")
+    p.add_argument('output', help="artifact to write, e.g. concrete_strength_model.ciq")
+    p.set_defaults(func=_cmd_convert)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1,90 @@
+"""Mapping of uploaded column headers onto the canonical input names.
+
+Headers are normalised (case, spacing, punctuation and unit suffixes such as
+``(kg/m3)`` or ``_days`` removed) and looked up in ``ALIAS_INDEX``, which
+covers English and Indonesian spellings and common abbreviations.  The
+result depends only on the header list, so it is cached per header
+signature: repeated uploads of the same export skip resolution.
+"""
+import re
+from functools import lru_cache
+
+from .engine import FEATURE_NAMES, INPUT_COLUMNS
+
+# Extra spellings per canonical column; the canonical name and the model's
+# Indonesian feature name are always included
+ALIASES = {
+    'Cement':             ('cem', 'opc', 'portland cement', 'cement content', 'binder cement'),
+    'Blast Furnace Slag': ('slag', 'bfs', 'ggbs', 'ggbfs', 'blast furnace', 'furnace slag',
+                           'slag tanur', 'terak'),
+    'Fly Ash':            ('ash', 'flyash', 'pfa', 'abu', 'abu terbang'),
+    'Water':              ('w', 'h2o', 'air', 'mixing water', 'air pencampur'),
+    'Superplasticizer':   ('sp', 'superplasticiser', 'superplastic', 'super plasticizer', 'hrwr',
+                           'plasticizer', 'plasticiser'),
+    'Coarse Aggregate':   ('ca', 'coarse agg', 'coarseagg', 'coarse', 'gravel', 'agregat kasar',
+                           'kerikil', 'batu pecah'),
+    'Fine Aggregate':     ('fine agg', 'fineagg', 'fine', 'sand', 'agregat halus', 'pasir'),
+    'Age':                ('age days', 'curing age', 'curing days', 'days', 'umur', 'umur hari',
+                           'hari'),
+}
+
+# Parenthesised/bracketed qualifiers, then a trailing unit token after a separator
+_QUALIFIER = re.compile(r'[(\[{][^)\]}]*[)\]}]')
+_UNIT = re.compile(r'[\s_\-/]+(?:kg[\s_/]*m[\s_^]*[3³]|kg|mpa|days?|hari|d)\s*$')
+_PUNCT = re.compile(r'[^0-9a-z]+')
+
+
+def normalise_header(name):
+    """Lookup key for a header: lower case, no units, no punctuation."""
+    text = _QUALIFIER.sub(' ', str(name).strip().lower())
+    text = _UNIT.sub('', text.strip())
+    return _PUNCT.sub('', text)
+
+
+def _build_index():
+    index = {}
+    for col, feature in zip(INPUT_COLUMNS, FEATURE_NAMES):
+        for alias in (col, feature, *ALIASES.get(col, ())):
+            key = normalise_header(alias)
+            if index.setdefault(key, col) != col:
+                raise ValueError(f"Alias {alias!r} maps to both {index[key]!r} and {col!r}")
+    return index
+
+
+ALIAS_INDEX = _build_index()
+
+
+@lru_cache(maxsize=256)
+def _resolve(signature, required):
+    """``((header, canonical), ...)`` for the first header naming each
+    required column, in header order."""
+    pairs, seen = [], set()
+    for header in signature:
+        col = ALIAS_INDEX.get(normalise_header(header))
+        if col in required and col not in seen:
+            pairs.append((header, col))
+            seen.add(col)
+    return tuple(pairs)
+
+
+def select_columns(columns, required=INPUT_COLUMNS):
+    """Return ``{header: canonical}`` for the first header matching each
+    required column (canonical spellings included), in ``columns`` order.
+
+    Works on names alone, e.g. a file's schema before any data is read.
+    """
+    return dict(_resolve(tuple(columns), tuple(required)))
+
+
+def resolve_columns(columns, required=INPUT_COLUMNS):
+    """Return a ``{header: canonical}`` rename mapping for ``columns``.
+
+    Headers that already use the canonical spelling are left out of the
+    mapping, so the result can go straight to one ``DataFrame.rename`` call.
+    """
+    return {h: c for h, c in _resolve(tuple(columns), tuple(required)) if h != c}
+
+
+def missing_columns(columns, required=INPUT_COLUMNS):
+    present = set(columns)
+    return [c for c in required if c not in present]
@@ -0,0 +1,255 @@
+"""Headless scoring engine for the concrete strength model.
+
+The pickled model is a StandardScaler followed by a LinearRegression, so the
+whole pipeline collapses to ``features @ weights + bias``.  ``StrengthEngine``
+folds the scaler statistics into the regression coefficients once at load
+time and then scores mixes with a single NumPy dot product, skipping the
+per-call validation done by sklearn's ``transform``/``predict``.
+
+Only ``Umur_Hari`` and ``Log_Umur_Hari`` depend on the curing age, so a
+linear score splits into an age-independent part and an age term;
+``predict_curve`` computes the first once per mix and broadcasts the second
+over a vector of ages.
+
+Nothing in here imports Streamlit, pandas or Plotly.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+# A joblib pickle or a binary artifact (see ``artifact``); overridable per deployment
+MODEL_PATH = os.environ.get('CONCRETEIQ_MODEL', 'concrete_strength_model.pkl')
+
+# User-facing mix parameters, in the order every 8-column array uses
+INPUT_COLUMNS = ['Cement', 'Blast Furnace Slag', 'Fly Ash', 'Water',
+                 'Superplasticizer', 'Coarse Aggregate', 'Fine Aggregate', 'Age']
+
+# Model feature order: the 8 inputs (Indonesian names) + 3 engineered features
+FEATURE_NAMES = ['Semen', 'Slag_Tanur_Tinggi', 'Abu_Terbang', 'Air',
+                 'Superplasticizer', 'Agregat_Kasar', 'Agregat_Halus', 'Umur_Hari',
+                 'Rasio_Air_Semen', 'Total_Bahan_Pengikat', 'Log_Umur_Hari']
+
+
+def file_fingerprint(path):
+    """SHA-256 hex digest of a file's contents, used to tell model versions apart."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def model_fingerprint(path):
+    """Version id of a model file: the embedded hash of an artifact, or the
+    SHA-256 of any other file."""
+    from .artifact import artifact_fingerprint, is_artifact
+    if is_artifact(path):
+        return artifact_fingerprint(path)
+    return file_fingerprint(path)
+
+
+def load_model(path=MODEL_PATH):
+    """Load a model file and always return the ``model_data`` dict.
+
+    Binary artifacts are memory-mapped without running any pickle code;
+    anything else is unpickled with joblib.
+    """
+    from .artifact import is_artifact, load_artifact
+    if is_artifact(path):
+        return load_artifact(path)
+
+    import joblib
+    model_data = joblib.load(path)
+    if isinstance(model_data, dict):
+        return model_data
+    return {'model': model_data}
+
+
+N_FEATURES = len(FEATURE_NAMES)
+
+# Standard test ages (days) for strength-gain curves
+CURVE_AGES = (1, 3, 7, 14, 28, 56, 90)
+# Feature columns that depend on the age
+AGE_FEATURES = (FEATURE_NAMES.index('Umur_Hari'), FEATURE_NAMES.index('Log_Umur_Hari'))
+
+
+def feature_buffer(n):
+    """Allocate an uninitialised (n, 11) column-major feature matrix.
+
+    Column-major keeps each feature contiguous, so the kernel's ufuncs and
+    per-column fills from a DataFrame run at full memory bandwidth.
+    """
+    return np.empty((n, N_FEATURES), order='F')
+
+
+def wc_ratio(water, cement, out=None):
+    """Water/cement ratio, 0 (not ``inf``) where cement is zero or negative."""
+    water = np.asarray(water, dtype=np.float64)
+    cement = np.asarray(cement, dtype=np.float64)
+    no_cement = cement <= 0
+    if out is None:
+        out = np.empty(np.broadcast(water, cement).shape)
+    out[no_cement] = 0.0
+    return np.divide(water, cement, out=out, where=~no_cement)
+
+
+def fill_engineered(F):
+    """Compute columns 8-10 of F in place from its first 8 columns.
+
+    This is the only definition of the engineered features; single-mix and
+    batch scoring both go through it.  Zero (or negative) cement gives a W/C
+    ratio of 0 rather than ``inf``.
+    """
+    cement = F[:, 0]
+    wc_ratio(F[:, 3], cement, out=F[:, 8])
+    binder = F[:, 9]
+    np.add(cement, F[:, 1], out=binder)
+    binder += F[:, 2]
+    np.log1p(F[:, 7], out=F[:, 10])
+    return F
+
+
+def engineer_features(X, out=None):
+    """Map an (n, 8) array of mix parameters to the (n, 11) model features.
+
+    ``out`` may be a preallocated buffer from ``feature_buffer``; it is
+    filled in place and returned.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if out is None:
+        out = feature_buffer(X.shape[0])
+    out[:, :8] = X
+    return fill_engineered(out)
+
+
+def features_from_columns(columns, n):
+    """Build the feature matrix from 8 separate 1-D columns (e.g. DataFrame
+    columns in INPUT_COLUMNS order) without an intermediate (n, 8) copy."""
+    F = feature_buffer(n)
+    for j, col in enumerate(columns):
+        F[:, j] = col
+    return fill_engineered(F)
+
+
+class StrengthEngine:
+    """Scores concrete mixes from a loaded ``model_data`` dict.
+
+    Linear models are folded into ``weights``/``bias``; anything else falls
+    back to the sklearn ``scaler.transform`` + ``model.predict`` path.
+    """
+
+    def __init__(self, model_data, fingerprint=None):
+        if not isinstance(model_data, dict):
+            model_data = {'model': model_data}
+        self.model_data = model_data
+        self.fingerprint = fingerprint
+        self.model  = model_data.get('model')
+        self.scaler = model_data.get('scaler')
+        self.feature_names = list(model_data.get('feature_names') or FEATURE_NAMES)
+        self.weights, self.bias = self._fold()
+
+    def _fold(self):
+        coef = getattr(self.model, 'coef_', None)
+        if coef is None or np.size(coef) != N_FEATURES:
+            return None, None
+        if sorted(self.feature_names) != sorted(FEATURE_NAMES):
+            return None, None
+
+        coef = np.ravel(coef).astype(np.float64)
+        intercept = float(np.ravel(self.model.intercept_)[0])
+        mean  = np.zeros_like(coef)
+        scale = np.ones_like(coef)
+        if self.scaler is not None:
+            if getattr(self.scaler, 'mean_', None) is not None:
+                mean = np.asarray(self.scaler.mean_, dtype=np.float64)
+            if getattr(self.scaler, 'scale_', None) is not None:
+                scale = np.asarray(self.scaler.scale_, dtype=np.float64)
+
+        # (x - mean) / scale @ coef + b  ==  x @ (coef / scale) + (b - mean @ coef / scale)
+        w = coef / scale
+        bias = intercept - float(mean @ w)
+
+        # Re-index to FEATURE_NAMES so callers never care about the pickled order
+        order = [self.feature_names.index(f) for f in FEATURE_NAMES]
+        return np.ascontiguousarray(w[order]), bias
+
+    @property
+    def is_linear(self):
+        return self.weights is not None
+
+    def predict_features(self, F):
+        """Score an (n, 11) engineered-feature matrix in FEATURE_NAMES order."""
+        if self.is_linear:
+            y = F @ self.weights
+            y += self.bias
+        else:
+            y = np.asarray(self._sklearn_predict(F), dtype=np.float64)
+        return np.maximum(y, 0, out=y)
+
+    def _sklearn_predict(self, F):
+        order = [FEATURE_NAMES.index(f) for f in self.feature_names]
+        F = F[:, order]
+        if self.scaler is not None:
+            if hasattr(self.scaler, 'feature_names_in_'):
+                import pandas as pd
+                F = pd.DataFrame(F, columns=self.feature_names)
+            F = self.scaler.transform(F)
+        return self.model.predict(F)
+
+    def predict_curve_features(self, F, ages=CURVE_AGES):
+        """Strength (MPa) of every mix in feature matrix ``F`` at every age in
+        ``ages``, as an ``(n, len(ages))`` array; the age columns of ``F`` are
+        ignored.
+
+        For a linear model the age-independent score is one dot product per
+        mix and each age adds ``w_age * age + w_log * log1p(age)``.  Other
+        models score one copy of ``F`` per age.
+        """
+        ages = np.asarray(ages, dtype=np.float64).ravel()
+        n, m = F.shape[0], len(ages)
+        if self.is_linear:
+            fixed = self.weights.copy()
+            fixed[list(AGE_FEATURES)] = 0.0
+            age_w, log_w = self.weights[list(AGE_FEATURES)]
+            y = np.empty((n, m))
+            y[:] = (ages * age_w + np.log1p(ages) * log_w)[None, :]
+            y += (F @ fixed + self.bias)[:, None]
+            return np.maximum(y, 0, out=y)
+        G = feature_buffer(n * m)
+        for j in range(N_FEATURES):
+            G[:, j] = np.tile(F[:, j], m)
+        G[:, AGE_FEATURES[0]] = np.repeat(ages, n)
+        G[:, AGE_FEATURES[1]] = np.repeat(np.log1p(ages), n)
+        return self.predict_features(G).reshape(m, n).T
+
+    def predict_curve(self, X, ages=CURVE_AGES):
+        """Strength-gain curves: ``(n, len(ages))`` MPa for an (n, 8) array of
+        mixes (their ``Age`` is ignored) or ``(len(ages),)`` for one mix."""
+        X = np.asarray(X, dtype=np.float64)
+        curve = self.predict_curve_features(engineer_features(X), ages)
+        return curve[0] if X.ndim == 1 else curve
+
+    def predict(self, X):
+        """Predict strength (MPa, clipped at 0) for an (n, 8) array of mixes."""
+        return self.predict_features(engineer_features(X))
+
+    def predict_columns(self, table, columns=INPUT_COLUMNS):
+        """Predict from a column mapping (DataFrame, dict of arrays, ...)
+        holding the 8 inputs under ``columns``."""
+        cols = [np.asarray(table[c], dtype=np.float64) for c in columns]
+        return self.predict_features(features_from_columns(cols, len(cols[0])))
+
+    def predict_one(self, features):
+        """Predict strength for a single 8-value mix."""
+        F = engineer_features(features)
+        if not self.is_linear:
+            return float(self.predict_features(F)[0])
+        y = float(F[0] @ self.weights) + self.bias
+        return y if y > 0 else 0.0
+
+
+def load_engine(path=MODEL_PATH):
+    return StrengthEngine(load_model(path), fingerprint=model_fingerprint(path))
@@ -0,0 +1,321 @@
+"""Tabular input/output for batch scoring: CSV (plain, gzip, zstd), Parquet
+and Arrow IPC (Feather v2).
+
+Readers look at the schema first — the Parquet footer, the IPC schema
+message or the CSV header line — and resolve the 8 required inputs from the
+column names alone, so only those columns are ever read and parsed.  Frames
+come back with the canonical ``INPUT_COLUMNS`` names as float64.
+
+``FrameWriter`` appends DataFrames chunk by chunk to any of the formats, so
+results are written as they are produced.  All parsing and formatting goes
+through pyarrow, which is imported lazily.
+"""
+import io
+import os
+
+from .columns import missing_columns, select_columns
+from .engine import INPUT_COLUMNS
+
+FORMATS = ('csv', 'csv.gz', 'csv.zst', 'parquet', 'arrow')
+
+# Longest suffix first, so 'x.csv.gz' is not taken for plain gzip
+_SUFFIXES = (('.csv.gz', 'csv.gz'), ('.csv.zst', 'csv.zst'), ('.csv', 'csv'),
+             ('.gz', 'csv.gz'), ('.zst', 'csv.zst'), ('.parquet', 'parquet'), ('.pq', 'parquet'),
+             ('.arrow', 'arrow'), ('.feather', 'arrow'), ('.ipc', 'arrow'))
+# Extensions for st.file_uploader(type=...)
+UPLOAD_TYPES = ['csv', 'gz', 'zst', 'parquet', 'pq', 'arrow', 'feather', 'ipc']
+
+FILE_SUFFIX = {'csv': '.csv', 'csv.gz': '.csv.gz', 'csv.zst': '.csv.zst',
+               'parquet': '.parquet', 'arrow': '.arrow'}
+MIME_TYPES = {'csv': 'text/csv', 'csv.gz': 'application/gzip', 'csv.zst': 'application/zstd',
+              'parquet': 'application/vnd.apache.parquet', 'arrow': 'application/vnd.apache.arrow.file'}
+CODECS = {'csv.gz': 'gzip', 'csv.zst': 'zstd'}
+
+_ARROW_FILE_MAGIC = b'ARROW1'
+
+
+def detect_format(name):
+    """Format key for a file name or path, from its extension."""
+    lower = os.fspath(name).lower()
+    for suffix, fmt in _SUFFIXES:
+        if lower.endswith(suffix):
+            return fmt
+    raise ValueError(f"Unsupported file type: {os.path.basename(lower)!r} "
+                     f"(expected one of {', '.join(s for s, _ in _SUFFIXES)})")
+
+
+def _source(src):
+    """Something every pyarrow reader accepts, positioned at the start.
+
+    In-memory uploads are wrapped without copying.
+    """
+    import pyarrow as pa
+
+    if isinstance(src, (str, os.PathLike)):
+        return os.fspath(src)
+    if isinstance(src, io.BytesIO):
+        return pa.BufferReader(pa.py_buffer(src.getbuffer()))
+    src.seek(0)
+    return src
+
+
+def _csv_stream(src, fmt):
+    import pyarrow as pa
+    return pa.input_stream(_source(src), compression=CODECS.get(fmt))
+
+
+def arrow_reader(src):
+    """IPC file reader, falling back to the streaming format."""
+    import pyarrow as pa
+
+    source = _source(src)
+    if isinstance(source, str):
+        source = pa.memory_map(source)
+    head = source.read(len(_ARROW_FILE_MAGIC))
+    source.seek(0)
+    if head == _ARROW_FILE_MAGIC:
+        return pa.ipc.open_file(source)
+    return pa.ipc.open_stream(source)
+
+
+def _arrow_batches(src, columns):
+    """``(schema, batches)`` of an IPC file or stream, each record batch
+    projected onto ``columns`` as it is read; ``schema`` is projected too."""
+    import pyarrow as pa
+
+    reader = arrow_reader(src)
+    if hasattr(reader, 'get_batch'):
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    else:
+        batches = reader
+    schema = pa.schema([reader.schema.field(c) for c in columns])
+    return schema, (batch.select(columns) for batch in batches)
+
+
+def read_schema(src, fmt):
+    """Column names of ``src`` without reading its data."""
+    import csv
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(_source(src)).schema_arrow.names
+    if fmt == 'arrow':
+        return arrow_reader(src).schema.names
+    # CSV: decompress just enough for the header line
+    stream, head = _csv_stream(src, fmt), b''
+    while b'\n' not in head:
+        block = stream.read(1 << 16)
+        if not block:
+            break
+        head += block
+    line = head.split(b'\n', 1)[0].decode('utf-8-sig').rstrip('\r')
+    return next(csv.reader([line]), [])
+
+
+def estimate_rows(src, fmt, size=None):
+    """Row count of ``src``: exact for Parquet and Arrow files (from metadata),
+    extrapolated from the first 64 KiB for plain CSV of ``size`` bytes, else
+    ``None``."""
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(_source(src)).metadata.num_rows
+    if fmt == 'arrow':
+        reader = arrow_reader(src)
+        if not hasattr(reader, 'get_batch'):
+            return None
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    if fmt != 'csv' or not size:
+        return None
+    head = _csv_stream(src, fmt).read(1 << 16)
+    lines = head.count(b'\n')
+    if lines < 2:
+        return lines
+    return max(int(size / (len(head) / lines)) - 1, 1)
+
+
+def input_columns(names):
+    """``{header: canonical}`` for the required inputs among ``names``.
+
+    Raises ``ValueError`` naming the missing inputs.
+    """
+    selected = select_columns(names)
+    missing = missing_columns(selected.values())
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    return selected
+
+
+def input_frame(table, selected):
+    """Project a pyarrow ``table`` onto the ``selected`` inputs as a float64
+    DataFrame with canonical column names."""
+    import pyarrow as pa
+
+    table = table.select(list(selected)).rename_columns(list(selected.values()))
+    table = table.cast(pa.schema([(c, pa.float64()) for c in table.column_names]))
+    return table.select(INPUT_COLUMNS).to_pandas()
+
+
+def _csv_options(selected, batch_rows=None, names=None):
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+
+    read = pcsv.ReadOptions(column_names=names)
+    if batch_rows is not None:
+        # About ``batch_rows`` rows of a typical mix export per block
+        read.block_size = min(max(batch_rows * 128, 1 << 16), 1 << 26)
+    convert = pcsv.ConvertOptions(include_columns=list(selected),
+                                  column_types={c: pa.float64() for c in selected})
+    return read, convert
+
+
+def read_frame(src, fmt, selected=None, nrows=None, names=None):
+    """DataFrame of the 8 inputs of ``src`` (the first ``nrows`` rows if given).
+
+    ``selected`` is an ``input_columns`` mapping; resolved from the schema
+    when omitted.  ``names`` gives the columns of a header-less CSV.
+    """
+    if selected is None:
+        selected = input_columns(read_schema(src, fmt))
+    if nrows is not None:
+        frame = next(iter_frames(src, fmt, nrows, selected), None)
+        return frame.head(nrows) if frame is not None else input_frame(_empty(selected), selected)
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        table = pq.read_table(_source(src), columns=list(selected))
+    elif fmt == 'arrow':
+        import pyarrow as pa
+        schema, batches = _arrow_batches(src, list(selected))
+        table = pa.Table.from_batches(list(batches), schema=schema)
+    else:
+        import pyarrow.csv as pcsv
+        read, convert = _csv_options(selected, names=names)
+        table = pcsv.read_csv(_csv_stream(src, fmt), read_options=read, convert_options=convert)
+    return input_frame(table, selected)
+
+
+def _empty(selected):
+    import pyarrow as pa
+    return pa.table({c: pa.array([], pa.float64()) for c in selected})
+
+
+def iter_frames(src, fmt, batch_rows, selected=None):
+    """Yield DataFrames of the 8 inputs, roughly ``batch_rows`` rows each."""
+    if selected is None:
+        selected = input_columns(read_schema(src, fmt))
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(_source(src)).iter_batches(batch_size=batch_rows, columns=list(selected))
+    elif fmt == 'arrow':
+        batches = _arrow_batches(src, list(selected))[1]
+    else:
+        import pyarrow.csv as pcsv
+        read, convert = _csv_options(selected, batch_rows)
+        batches = pcsv.open_csv(_csv_stream(src, fmt), read_options=read, convert_options=convert)
+
+    import pyarrow as pa
+    for batch in batches:
+        if batch.num_rows:
+            yield input_frame(pa.Table.from_batches([batch]), selected)
+
+
+class _KeepOpen(io.RawIOBase):
+    """Write-through view of a caller's file that leaves it open on close."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        return self.raw.write(b)
+
+    def flush(self):
+        self.raw.flush()
+
+
+class FrameWriter:
+    """Append DataFrames with identical columns to ``dst`` in format ``fmt``.
+
+    ``dst`` is a path or a writable binary file.  The schema is fixed by the
+    first frame.  With ``header=False`` CSV output omits the header line.
+    Use as a context manager or call ``close``.
+    """
+
+    def __init__(self, dst, fmt, header=True):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+        self.dst = dst
+        self.fmt = fmt
+        self.header = header
+        self.schema = None
+        self.rows = 0
+        self._sink = None
+        self._writer = None
+
+    def _open(self, schema):
+        import pyarrow as pa
+
+        dst = os.fspath(self.dst) if isinstance(self.dst, (str, os.PathLike)) else _KeepOpen(self.dst)
+        if self.fmt == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(dst, schema)
+        elif self.fmt == 'arrow':
+            self._sink = pa.output_stream(dst)
+            self._writer = pa.ipc.new_file(self._sink, schema)
+        else:
+            import pyarrow.csv as pcsv
+            self._sink = pa.output_stream(dst, compression=CODECS.get(self.fmt))
+            self._writer = pcsv.CSVWriter(self._sink, schema, write_options=pcsv.WriteOptions(
+                include_header=self.header, quoting_style='needed'))
+
+    def write(self, df):
+        import pyarrow as pa
+        return self.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+
+    def write_table(self, table):
+        """Append a pyarrow table (cast to the schema of the first one)."""
+        import pyarrow as pa
+
+        if self._writer is None:
+            if self.fmt.startswith('csv'):
+                # Grades as plain text; CSV has no dictionary encoding
+                table = table.cast(pa.schema([
+                    pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+                    for f in table.schema]))
+            self.schema = table.schema
+            self._open(self.schema)
+        elif table.schema != self.schema:
+            table = table.cast(self.schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+        return self
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_frame(df, dst, fmt, chunk_rows=100_000):
+    """Write ``df`` to ``dst`` in ``chunk_rows`` slices; returns ``dst``."""
+    with FrameWriter(dst, fmt) as writer:
+        for start in range(0, max(len(df), 1), chunk_rows):
+            writer.write(df.iloc[start:start + chunk_rows])
+    return dst
+
+
+def frame_bytes(df, fmt, chunk_rows=100_000):
+    """``df`` encoded in ``fmt``, e.g. for a download button."""
+    return write_frame(df, io.BytesIO(), fmt, chunk_rows).getvalue()
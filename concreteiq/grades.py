@@ -0,0 +1,183 @@
+"""Concrete grade classification under configurable grade schemes.
+
+A scheme is an ordered list of grades, each with a lower strength bound.
+``GradeScheme`` compiles it once into a sorted threshold array plus an
+attribute table, so classifying is ``np.searchsorted`` over the thresholds
+followed by a ``take`` per attribute column (code, label, usage, CSS class).
+
+Schemes are read from ``grade_schemes.json``; the K-grade scheme the app has
+always used is built in and stays the default.
+"""
+import bisect
+import json
+import math
+import os
+
+import numpy as np
+
+GRADE_SCHEMES_PATH = 'grade_schemes.json'
+DEFAULT_SCHEME = 'K'
+
+_K_GRADES = [
+    {"code": "K-175",  "min": None, "label": "Low Strength",       "usage": "Non-structural works",         "css": "grade-low",    "dot": "🔴"},
+    {"code": "K-250",  "min": 20,   "label": "Medium Strength",    "usage": "Light structural elements",    "css": "grade-medium", "dot": "🟡"},
+    {"code": "K-300",  "min": 30,   "label": "High Strength",      "usage": "Standard building structures", "css": "grade-high",   "dot": "🟢"},
+    {"code": "K-400+", "min": 40,   "label": "Very High Strength", "usage": "Special / heavy structures",   "css": "grade-ultra",  "dot": "🔵"},
+]
+
+
+class GradeScheme:
+    """A compiled grade scheme.
+
+    ``grades`` is a list of dicts with ``code``, ``min`` (MPa lower bound;
+    ignored for the lowest grade), ``label``, ``usage``, ``css`` and ``dot``.
+    A strength equal to a bound belongs to the higher grade.
+    """
+
+    def __init__(self, key, name, grades):
+        if not grades:
+            raise ValueError(f"Grade scheme {key!r} has no grades")
+        grades = sorted(grades, key=lambda g: -math.inf if g.get('min') is None else g['min'])
+        if any(g.get('min') is None for g in grades[1:]):
+            raise ValueError(f"Grade scheme {key!r}: only the lowest grade may omit 'min'")
+
+        self.key = key
+        self.name = name
+        self.thresholds = [float(g['min']) for g in grades[1:]]
+        self.grades = [(g['code'], g.get('label', ''), g.get('usage', ''),
+                        g.get('css', 'grade-low'), g.get('dot', '')) for g in grades]
+        self.codes = [g[0] for g in self.grades]
+        self._thresholds = np.asarray(self.thresholds, dtype=np.float64)
+        self._table = np.array(self.grades, dtype=object)
+
+    def __repr__(self):
+        return f"GradeScheme({self.key!r}, {len(self.grades)} grades)"
+
+    def grade(self, s):
+        """Grade tuple ``(code, label, usage, css, dot)`` for a single strength."""
+        return self.grades[bisect.bisect_right(self.thresholds, s)]
+
+    def grade_index(self, strengths):
+        """Index into ``grades`` for every strength (int8 array)."""
+        idx = np.searchsorted(self._thresholds, np.asarray(strengths, dtype=np.float64), side='right')
+        return idx.astype(np.int8)
+
+    def classify(self, strengths):
+        return GradeArrays(self.grade_index(strengths), self)
+
+    def minimum(self, code):
+        """Lowest strength (MPa) of grade ``code``; 0 for the lowest grade."""
+        i = self.codes.index(code)
+        return self.thresholds[i - 1] if i > 0 else 0.0
+
+    def range_text(self, i):
+        """Human-readable strength range of grade ``i``, e.g. ``20–30 MPa``."""
+        lo = self.thresholds[i - 1] if i > 0 else None
+        hi = self.thresholds[i] if i < len(self.thresholds) else None
+        if lo is None and hi is None:
+            return "all strengths"
+        if lo is None:
+            return f"< {hi:g} MPa"
+        if hi is None:
+            return f"> {lo:g} MPa"
+        return f"{lo:g}–{hi:g} MPa"
+
+
+class GradeArrays:
+    """Column-wise grades for an array of strengths.
+
+    Only the int8 ``index`` is computed up front; the string columns are
+    materialised on access with a single ``take`` each.
+    """
+
+    def __init__(self, index, scheme):
+        self.index = index
+        self.scheme = scheme
+
+    def __len__(self):
+        return len(self.index)
+
+    def _column(self, j):
+        return self.scheme._table[:, j].take(self.index)
+
+    @property
+    def code(self):
+        return self._column(0)
+
+    @property
+    def label(self):
+        return self._column(1)
+
+    @property
+    def usage(self):
+        return self._column(2)
+
+    @property
+    def css(self):
+        return self._column(3)
+
+    def categorical(self):
+        """Grade codes as a ``pandas.Categorical`` ordered from low to high."""
+        import pandas as pd
+        return pd.Categorical.from_codes(self.index, categories=self.scheme.codes, ordered=True)
+
+    def counts(self):
+        """``{code: count}`` for the grades that occur, low to high."""
+        n = np.bincount(self.index, minlength=len(self.scheme.grades))
+        return {code: int(c) for code, c in zip(self.scheme.codes, n) if c}
+
+
+def load_schemes(path=GRADE_SCHEMES_PATH):
+    """Read and compile every scheme in ``path``.
+
+    Returns ``(schemes, default_key)``.  The built-in K scheme is always
+    present; a missing config file just leaves it as the only scheme.
+    """
+    schemes = {DEFAULT_SCHEME: GradeScheme(DEFAULT_SCHEME, "K (PBI 1971)", _K_GRADES)}
+    default = DEFAULT_SCHEME
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as fh:
+            config = json.load(fh)
+        for key, spec in config.get('schemes', {}).items():
+            schemes[key] = GradeScheme(key, spec.get('name', key), spec['grades'])
+        default = config.get('default', default)
+        if default not in schemes:
+            raise ValueError(f"Default grade scheme {default!r} is not defined in {path}")
+    return schemes, default
+
+
+# Process-wide registry, loaded on first use
+_REGISTRY = None
+
+
+def _registry():
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = load_schemes()
+    return _REGISTRY
+
+
+def scheme_keys():
+    return list(_registry()[0])
+
+
+def default_scheme_key():
+    return _registry()[1]
+
+
+def get_scheme(scheme=None):
+    """Look up a scheme by key; ``None`` gives the default, and a
+    ``GradeScheme`` instance is passed through."""
+    if isinstance(scheme, GradeScheme):
+        return scheme
+    schemes, default = _registry()
+    return schemes[default if scheme is None else scheme]
+
+
+def get_concrete_grade(s, scheme=None):
+    return get_scheme(scheme).grade(s)
+
+
+def classify(strengths, scheme=None):
+    """Vectorized ``get_concrete_grade`` over an array of strengths."""
+    return get_scheme(scheme).classify(strengths)
@@ -0,0 +1,182 @@
+"""Bounded, columnar prediction history.
+
+``PredictionHistory`` keeps the most recent ``capacity`` records in
+preallocated NumPy columns: the 8 input features, the prediction, an epoch
+timestamp (``datetime64[ns]``) and the number of rows the record stands for
+(1 for a single prediction, the row count for a summarised batch run).
+
+Every record is written twice, at slot ``i`` and ``i + capacity``, so the
+retained window is always one contiguous run of the columns and ``tail``
+returns plain views without copying or reordering.
+
+With a ``path`` the history is also appended to a local Arrow IPC file.
+Each append writes one small self-contained IPC stream to the end of the
+file, so the file is never rewritten; loading reads the streams back in
+order and keeps the newest ``capacity`` records.
+"""
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import INPUT_COLUMNS
+
+HISTORY_CAPACITY = 1_000
+
+_PRED = 'prediction'
+_TIME = 'timestamp'
+_ROWS = 'rows'
+
+
+@dataclass
+class HistorySlice:
+    """Column views over a contiguous run of history records, oldest first."""
+    features: np.ndarray     # (n, 8) float64
+    prediction: np.ndarray   # (n,) float64; batch records hold the mean
+    timestamp: np.ndarray    # (n,) datetime64[ns]
+    rows: np.ndarray         # (n,) int64
+
+    def __len__(self):
+        return len(self.prediction)
+
+    def feature(self, name):
+        return self.features[:, INPUT_COLUMNS.index(name)]
+
+
+class PredictionHistory:
+    """Fixed-capacity ring buffer of predictions, optionally persisted."""
+
+    def __init__(self, capacity=HISTORY_CAPACITY, path=None):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self.path = path
+        self._features = np.full((2 * capacity, len(INPUT_COLUMNS)), np.nan)
+        self._prediction = np.empty(2 * capacity)
+        self._timestamp = np.empty(2 * capacity, dtype='datetime64[ns]')
+        self._rows = np.empty(2 * capacity, dtype=np.int64)
+        self._next = 0     # slot (mod capacity) the next record goes to
+        self._len = 0
+        if path and os.path.exists(path):
+            # Keep the append-only file from growing without bound
+            if self._load(path) > 2 * capacity:
+                self.compact()
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    @property
+    def predictions(self):
+        """Number of predicted rows the retained records cover."""
+        return int(self.tail().rows.sum())
+
+    def _put(self, features, prediction, timestamp, rows):
+        # One slot per record in each half of the double-length columns
+        i = self._next
+        for slot in (i, i + self.capacity):
+            self._features[slot] = features
+            self._prediction[slot] = prediction
+            self._timestamp[slot] = timestamp
+            self._rows[slot] = rows
+        self._next = (i + 1) % self.capacity
+        self._len = min(self._len + 1, self.capacity)
+
+    def append(self, features, prediction, rows=1, timestamp=None):
+        """Record one prediction (or one batch summary when ``rows`` > 1).
+
+        ``features`` are the 8 inputs in ``INPUT_COLUMNS`` order; ``None``
+        leaves them as NaN.
+        """
+        if timestamp is None:
+            timestamp = np.datetime64(time.time_ns(), 'ns')
+        features = np.nan if features is None else np.asarray(features, dtype=np.float64)
+        self._put(features, float(prediction), timestamp, rows)
+        if self.path:
+            self._persist(self.tail(1))
+
+    def append_batch(self, preds, X=None):
+        """Summarise a batch run as one record: mean prediction, mean mix
+        (if the (n, 8) inputs ``X`` are given) and the row count."""
+        preds = np.asarray(preds, dtype=np.float64)
+        if not len(preds):
+            return
+        features = None if X is None else np.asarray(X, dtype=np.float64).mean(axis=0)
+        self.append(features, preds.mean(), rows=len(preds))
+
+    def tail(self, n=None):
+        """The newest ``n`` records (all by default) as zero-copy views."""
+        n = self._len if n is None else min(n, self._len)
+        # Until the ring is full the records sit at slots 0.._len-1; after
+        # that the window ends in the upper half
+        stop = self._next + self.capacity if self._len == self.capacity else self._next
+        return HistorySlice(self._features[stop - n:stop], self._prediction[stop - n:stop],
+                            self._timestamp[stop - n:stop], self._rows[stop - n:stop])
+
+    def clear(self):
+        """Forget every record, including the persisted file."""
+        self._next = self._len = 0
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    # --------------------------------------------------------
+    #  Arrow persistence
+    # --------------------------------------------------------
+    @staticmethod
+    def _to_table(view):
+        import pyarrow as pa
+        columns = {name: view.features[:, j] for j, name in enumerate(INPUT_COLUMNS)}
+        columns.update({_PRED: view.prediction, _TIME: view.timestamp, _ROWS: view.rows})
+        return pa.table(columns)
+
+    def _persist(self, view):
+        import pyarrow as pa
+        table = self._to_table(view)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'ab') as fh, pa.ipc.new_stream(fh, table.schema) as writer:
+            writer.write_table(table)
+
+    def _load(self, path):
+        """Read the persisted records into the ring; returns how many the file holds."""
+        import pyarrow as pa
+        tables = []
+        with pa.memory_map(path) as src:
+            while src.tell() < src.size():
+                try:
+                    tables.append(pa.ipc.open_stream(src).read_all())
+                except (pa.ArrowInvalid, OSError):
+                    break    # torn write at the end of the file
+        if not tables:
+            return 0
+        table = pa.concat_tables(tables)
+        total = len(table)
+        table = table.slice(max(0, total - self.capacity))
+        features = np.column_stack([table[c].to_numpy() for c in INPUT_COLUMNS])
+        prediction = table[_PRED].to_numpy()
+        timestamp = table[_TIME].to_numpy().astype('datetime64[ns]')
+        rows = table[_ROWS].to_numpy()
+        for i in range(len(table)):
+            self._put(features[i], prediction[i], timestamp[i], rows[i])
+        return total
+
+    def compact(self):
+        """Rewrite the persisted file as a single stream of the retained records."""
+        if not self.path:
+            return
+        tmp = self.path + '.tmp'
+        path, self.path = self.path, tmp
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            if self._len:
+                self._persist(self.tail())
+                os.replace(tmp, path)
+            elif os.path.exists(path):
+                os.remove(path)
+        finally:
+            self.path = path
@@ -0,0 +1,290 @@
+"""Background batch scoring, shared fairly between users.
+
+``JobQueue`` runs streamed scoring jobs (``batch.score_chunks``) on a pool
+of worker threads, outside any Streamlit script run, so a job keeps going
+when its tab is closed.  Each job reports rows done, throughput and ETA,
+and can be cancelled between chunks.
+
+Workers advance a job by one chunk at a time.  After every chunk the job
+goes back to its owner's queue and the next owner in round-robin order
+gets a turn, so one user's huge upload shares the workers with everyone
+else's jobs chunk by chunk instead of holding them up until it finishes.
+
+Output is written to ``results_dir`` as ``<id>.part<suffix>`` and renamed
+when complete, next to an ``<id>.json`` with the job's metadata and
+``BatchSummary``.  Finished jobs found there at start-up are listed again.
+"""
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from .batch import CHUNK_ROWS, BatchSummary, score_chunks
+from .formats import FILE_SUFFIX
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+RESULTS_DIR = os.environ.get('CONCRETEIQ_RESULTS_DIR', '.concreteiq_results')
+QUEUE_WORKERS = int(os.environ.get('CONCRETEIQ_QUEUE_WORKERS', '2'))
+
+
+def _as_tuple(value):
+    """Undo JSON's tuple-to-list conversion of a stored job key."""
+    if isinstance(value, list):
+        return tuple(_as_tuple(v) for v in value)
+    return value
+
+
+@dataclass
+class ScoringJob:
+    """One queued upload; read its fields from any thread."""
+    id: str
+    owner: str
+    name: str
+    out_fmt: str
+    key: tuple = None
+    total: int = None
+    status: str = QUEUED
+    rows: int = 0
+    summary: BatchSummary = field(default_factory=BatchSummary)
+    error: str = None
+    path: str = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+    _steps: object = field(default=None, repr=False)
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def throughput(self):
+        """Rows per second since the job started (wall clock, so shared
+        workers show up as lower throughput)."""
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def fraction(self):
+        if self.status == DONE:
+            return 1.0
+        return min(self.rows / self.total, 1.0) if self.total else 0.0
+
+    @property
+    def eta(self):
+        """Seconds left at the current throughput, or ``None`` if unknown."""
+        if self.finished:
+            return 0.0
+        if not self.total or not self.throughput:
+            return None
+        return max(self.total - self.rows, 0) / self.throughput
+
+    def meta(self):
+        return {'id': self.id, 'owner': self.owner, 'name': self.name, 'out_fmt': self.out_fmt,
+                'key': self.key, 'rows': self.rows, 'path': os.path.basename(self.path),
+                'submitted_at': self.submitted_at, 'started_at': self.started_at,
+                'finished_at': self.finished_at, 'summary': self.summary.to_dict()}
+
+
+class JobQueue:
+    """Worker threads scoring ``ScoringJob``s, round-robin across owners."""
+
+    def __init__(self, workers=QUEUE_WORKERS, results_dir=RESULTS_DIR, chunksize=CHUNK_ROWS):
+        self.results_dir = results_dir
+        self.chunksize = chunksize
+        os.makedirs(results_dir, exist_ok=True)
+        self._jobs = {}
+        self._ready = OrderedDict()          # owner -> deque of jobs waiting for a step
+        self._cond = threading.Condition()
+        self._closed = False
+        self._load_finished()
+        self._threads = [threading.Thread(target=self._work, name=f'concreteiq-queue-{i}', daemon=True)
+                         for i in range(max(workers, 1))]
+        for thread in self._threads:
+            thread.start()
+
+    def _load_finished(self):
+        for entry in os.scandir(self.results_dir):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                with open(entry.path) as fh:
+                    meta = json.load(fh)
+                path = os.path.join(self.results_dir, meta['path'])
+                if not os.path.exists(path):
+                    continue
+                job = ScoringJob(meta['id'], meta['owner'], meta['name'], meta['out_fmt'],
+                                 key=_as_tuple(meta.get('key')), status=DONE, rows=meta['rows'],
+                                 summary=BatchSummary.from_dict(meta['summary']), path=path,
+                                 submitted_at=meta['submitted_at'], started_at=meta['started_at'],
+                                 finished_at=meta['finished_at'])
+            except (OSError, ValueError, KeyError):
+                continue
+            self._jobs[job.id] = job
+
+    def submit(self, owner, src, engine, in_fmt='csv', out_fmt='csv', name='', scheme=None,
+               compare=None, key=None, total=None, curve_ages=None):
+        """Queue ``src`` (a path or bytes) for scoring with ``engine``.
+
+        Arguments follow ``batch.stream_score``; ``key`` (e.g. a
+        ``jobs.job_key``) lets callers find the job again with ``find``, and
+        ``total`` is the expected row count for progress and ETA.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        path = os.path.join(self.results_dir, job_id + FILE_SUFFIX[out_fmt])
+        if isinstance(src, (bytes, bytearray, memoryview)):
+            src = io.BytesIO(src)
+        job = ScoringJob(job_id, owner, name, out_fmt, key=key, total=total, path=path)
+        job._steps = score_chunks(engine, src, self._file(job, '.part' + FILE_SUFFIX[out_fmt]),
+                                  job.summary, in_fmt, out_fmt,
+                                  self.chunksize, scheme, compare, curve_ages)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("job queue is closed")
+            self._jobs[job_id] = job
+            self._ready.setdefault(owner, deque()).append(job)
+            self._cond.notify()
+        return job
+
+    def _file(self, job, suffix):
+        return os.path.join(self.results_dir, job.id + suffix)
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner=None):
+        """Jobs (of ``owner``, if given), newest first."""
+        with self._cond:
+            found = [j for j in self._jobs.values() if owner is None or j.owner == owner]
+        return sorted(found, key=lambda j: j.submitted_at, reverse=True)
+
+    def find(self, key, owner=None):
+        """Newest queued, running or finished job for ``key`` that did not fail
+        or get cancelled."""
+        for job in self.jobs(owner):
+            if job.key == key and job.status not in (FAILED, CANCELLED):
+                return job
+        return None
+
+    def cancel(self, job_id):
+        """Cancel a job: at once if it is waiting, else after its current chunk."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job._cancel.set()
+            waiting = self._ready.get(job.owner)
+            if waiting is not None and job in waiting:
+                waiting.remove(job)
+                if not waiting:
+                    del self._ready[job.owner]
+            else:
+                return job
+        self._finish(job, CANCELLED)
+        return job
+
+    def remove(self, job_id):
+        """Forget a finished job and delete its files."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or not job.finished:
+                return False
+            del self._jobs[job_id]
+        for path in (job.path, self._file(job, '.json')):
+            if os.path.exists(path):
+                os.remove(path)
+        return True
+
+    def _next(self):
+        with self._cond:
+            while not self._closed:
+                for owner, waiting in self._ready.items():
+                    job = waiting.popleft()
+                    # The owner goes to the back of the line until its job is requeued
+                    if waiting:
+                        self._ready.move_to_end(owner)
+                    else:
+                        del self._ready[owner]
+                    return job
+                self._cond.wait()
+            return None
+
+    def _work(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            if job._cancel.is_set():
+                self._finish(job, CANCELLED)
+                continue
+            if job.started_at is None:
+                job.started_at = time.time()
+                job.status = RUNNING
+            try:
+                job.rows = next(job._steps)
+            except StopIteration:
+                self._finish(job, DONE)
+                continue
+            except Exception as e:
+                self._finish(job, FAILED, f"{type(e).__name__}: {e}")
+                continue
+            with self._cond:
+                if self._closed:
+                    return
+                self._ready.setdefault(job.owner, deque()).appendleft(job)
+                self._cond.notify()
+
+    def _finish(self, job, status, error=None):
+        """Close out ``job`` with ``status``.  Never raises, so a worker
+        survives it: a job whose output cannot be written out (disk full,
+        permissions, results directory gone) ends FAILED, and whatever it
+        left behind is removed."""
+        part = self._file(job, '.part' + FILE_SUFFIX[job.out_fmt])
+        meta_path = self._file(job, '.json')
+        try:
+            job._steps.close()
+            if status == DONE:
+                if not os.path.exists(part):     # no rows: nothing was written
+                    open(part, 'wb').close()
+                os.replace(part, job.path)
+                job.finished_at = time.time()
+                with open(meta_path + '.tmp', 'w') as fh:
+                    json.dump(job.meta(), fh)
+                os.replace(meta_path + '.tmp', meta_path)
+        except Exception as e:
+            if status == DONE:
+                status, error = FAILED, f"{type(e).__name__}: {e}"
+        if status != DONE:
+            for path in (part, job.path, meta_path + '.tmp', meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            job.finished_at = time.time()
+        job.error = error
+        job.status = status
+
+    def close(self):
+        """Stop the workers; unfinished jobs are abandoned."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,200 @@
+"""Scored batch uploads kept in server memory between requests.
+
+A ``BatchJob`` is keyed by the upload's content hash and the fingerprint of
+every model that scored it, so the same file scored by the same model
+versions maps to the same job whoever uploads it.  It holds the parsed
+inputs and, once scored, the predictions and validation report; result
+frames are assembled once per grade scheme (and set of curve ages) and
+reused.
+
+``JobStore`` keeps jobs in an LRU bounded by their total size in bytes.
+Streamed scoring runs on the background ``jobqueue`` instead.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .batch import (add_curve_columns, add_model_columns, add_result_columns, add_validation_columns,
+                    table_features)
+
+# Upper bound on the memory held by finished jobs
+JOB_STORE_BYTES = int(os.environ.get('CONCRETEIQ_JOB_STORE_MB', '512')) * 1024 * 1024
+
+_HASH_BLOCK = 1 << 20
+
+
+def content_hash(src):
+    """Hex digest of an upload's bytes (a path, a binary file or a buffer)."""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        h.update(src)
+    elif isinstance(src, (str, os.PathLike)):
+        with open(src, 'rb') as fh:
+            for block in iter(lambda: fh.read(_HASH_BLOCK), b''):
+                h.update(block)
+    elif hasattr(src, 'getbuffer'):
+        h.update(src.getbuffer())
+    else:
+        src.seek(0)
+        for block in iter(lambda: src.read(_HASH_BLOCK), b''):
+            h.update(block)
+        src.seek(0)
+    return h.hexdigest()
+
+
+def job_key(content, engines, *options):
+    """Key for ``content`` scored by ``engines`` (``{name: engine}``, the
+    primary model first) with any further ``options`` that change the output."""
+    return (content, tuple((name, e.fingerprint) for name, e in engines.items()), *options)
+
+
+def _frame_bytes(df):
+    return int(df.memory_usage(index=False).sum())
+
+
+@dataclass
+class BatchJob:
+    """One upload and what has been computed for it: ``inputs`` (the 8
+    canonical columns) and, after ``finish``, the predictions."""
+    key: tuple
+    inputs: object = None
+    preds: np.ndarray = None
+    by_model: dict = None
+    report: object = None
+    # Strength-gain curves by tuple of ages, from the primary model
+    curves: dict = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    _views: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def rows(self):
+        return 0 if self.inputs is None else len(self.inputs)
+
+    @property
+    def scored(self):
+        return self.preds is not None
+
+    def finish(self, preds, report, by_model=None):
+        self.preds = preds
+        self.report = report
+        self.by_model = by_model
+        self.curves.clear()
+        self._views.clear()
+        return self
+
+    def curve(self, engine, ages):
+        """``(rows, len(ages))`` strength-gain curves, computed on first use."""
+        ages = tuple(ages)
+        curve = self.curves.get(ages)
+        if curve is None:
+            curve = self.curves[ages] = engine.predict_curve_features(table_features(self.inputs), ages)
+        return curve
+
+    def results(self, scheme, curve_ages=()):
+        """Inputs plus result, validation and model columns for ``scheme``,
+        and the ``curve`` columns for ``curve_ages`` (computed beforehand).
+
+        Built once per scheme and ages; treat the returned frame as
+        read-only, it is shared with every later caller.
+        """
+        curve_ages = tuple(curve_ages)
+        view = self._views.get((scheme.key, curve_ages))
+        if view is None:
+            view = self.inputs.copy(deep=False)
+            add_result_columns(view, self.preds, scheme)
+            if self.report is not None:
+                add_validation_columns(view, self.report)
+            if self.by_model:
+                add_model_columns(view, self.by_model)
+            if curve_ages:
+                add_curve_columns(view, self.curves[curve_ages], curve_ages)
+            self._views[(scheme.key, curve_ages)] = view
+        return view
+
+    @property
+    def nbytes(self):
+        size = 0 if self.inputs is None else _frame_bytes(self.inputs)
+        if self.preds is not None:
+            size += self.preds.nbytes
+        if self.report is not None:
+            size += self.report.flags.nbytes
+        for preds in (self.by_model or {}).values():
+            size += preds.nbytes
+        for curve in self.curves.values():
+            size += curve.nbytes
+        # Views share the input columns; count only what they add
+        for view in self._views.values():
+            size += _frame_bytes(view) - (0 if self.inputs is None else _frame_bytes(self.inputs))
+        return size
+
+    def close(self):
+        self.curves.clear()
+        self._views.clear()
+
+
+class JobStore:
+    """LRU of ``BatchJob``s holding at most ``capacity`` bytes.
+
+    The most recently stored job is kept even when it alone exceeds the
+    bound.  Safe to share between threads (Streamlit sessions).
+    """
+
+    def __init__(self, capacity=JOB_STORE_BYTES):
+        self.capacity = capacity
+        self.evictions = 0
+        self._jobs = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def get(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def put(self, job):
+        """Store (or re-measure, after it changed) ``job`` and evict beyond capacity."""
+        size = job.nbytes
+        with self._lock:
+            old = self._jobs.pop(job.key, None)
+            self._jobs[job.key] = job
+            self._sizes[job.key] = size
+            evicted = []
+            total = sum(self._sizes.values())
+            while total > self.capacity and len(self._jobs) > 1:
+                key, victim = self._jobs.popitem(last=False)
+                total -= self._sizes.pop(key)
+                evicted.append(victim)
+            self.evictions += len(evicted)
+        for victim in evicted:
+            victim.close()
+        if old is not None and old is not job:
+            old.close()
+        return job
+
+    def refresh(self, job):
+        """Re-measure a stored job, e.g. after ``results`` built a new view."""
+        with self._lock:
+            if self._jobs.get(job.key) is not job:
+                return
+        self.put(job)
+
+    def close(self):
+        with self._lock:
+            jobs, self._jobs, self._sizes = list(self._jobs.values()), OrderedDict(), {}
+        for job in jobs:
+            job.close()
@@ -0,0 +1,188 @@
+"""Inverse mix design: the cheapest mixes that reach a required strength.
+
+``optimize_mix`` searches the 7 material quantities (age is fixed) with a
+batched differential evolution.  Each population member carries its own
+strength target, spread over ``strength_range``, and a child replaces its
+parent when it reaches that target more cheaply; one run therefore traces
+the whole strength–cost trade-off.  Every feasible mix evaluated is folded
+into a Pareto archive (highest strength for its cost).
+
+Each generation is scored as one matrix through ``predict_features``, so
+the engineered features (W/C ratio, total binder, log age) and any model
+type are handled exactly as in prediction.
+
+Constraints are per-material bounds (``validation.TYPICAL_RANGES`` by
+default, enforced by clipping), a maximum W/C ratio and a fresh-density
+range (enforced by a repair step, with any remainder penalised).
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import INPUT_COLUMNS, feature_buffer, fill_engineered
+from .validation import TYPICAL_RANGES
+
+MATERIALS = INPUT_COLUMNS[:7]
+
+# Indicative prices in Rp per kg; pass ``costs`` with local prices
+MATERIAL_COSTS = {
+    'Cement':             1_400,
+    'Blast Furnace Slag':   900,
+    'Fly Ash':              500,
+    'Water':                 20,
+    'Superplasticizer':  40_000,
+    'Coarse Aggregate':     220,
+    'Fine Aggregate':       180,
+}
+WC_MAX = 0.5
+# Fresh concrete mass per m³ (kg)
+DENSITY_RANGE = (2200.0, 2550.0)
+STRENGTH_RANGE = (10.0, 80.0)
+
+POPULATION = 400
+GENERATIONS = 80
+# Differential evolution step size and crossover rate
+DE_WEIGHT = 0.6
+DE_CROSSOVER = 0.8
+
+
+@dataclass
+class MixDesign:
+    """Pareto-optimal mixes (``INPUT_COLUMNS`` order), cheapest first;
+    strength rises with cost along the set."""
+    mixes: np.ndarray
+    strength: np.ndarray
+    cost: np.ndarray
+    target: float
+    evaluated: int
+    seconds: float
+
+    def __len__(self):
+        return len(self.cost)
+
+    @property
+    def wc(self):
+        return self.mixes[:, 3] / self.mixes[:, 0]
+
+    @property
+    def best(self):
+        """Index of the cheapest mix reaching ``target``, or ``None``."""
+        hits = np.flatnonzero(self.strength >= self.target)
+        return int(hits[0]) if len(hits) else None
+
+    def to_frame(self):
+        import pandas as pd
+
+        from .batch import PRED_COL, WC_COL
+
+        df = pd.DataFrame(self.mixes, columns=INPUT_COLUMNS)
+        df[PRED_COL] = self.strength
+        df[WC_COL] = self.wc
+        df['Cost (Rp/m³)'] = self.cost
+        return df
+
+
+def pareto_front(strength, cost):
+    """Indices of the mixes no other mix beats on both cost and strength,
+    sorted by cost."""
+    order = np.lexsort((-strength, cost))
+    s = strength[order]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], s[:-1])))
+    return order[s > best_before]
+
+
+def _repair(X, lo, hi, wc_max, density):
+    """Move candidate mixes (in place) into the bounds, under the W/C limit
+    and, by rescaling the aggregates, into the density range."""
+    np.clip(X, lo, hi, out=X)
+    cement, water = X[:, 0], X[:, 3]
+    np.maximum(cement, np.minimum(water / wc_max, hi[0]), out=cement)
+    np.minimum(water, cement * wc_max, out=water)
+    total = X.sum(axis=1)
+    agg = X[:, 5] + X[:, 6]
+    shift = np.clip(total, *density) - total
+    # Each aggregate takes its share of the shift; an even split when both
+    # are zero (possible when their lower bounds are 0)
+    share = np.full((len(X), 2), 0.5)
+    np.divide(X[:, 5:7], agg[:, None], out=share, where=agg[:, None] > 0)
+    X[:, 5:7] += share * shift[:, None]
+    np.clip(X, lo, hi, out=X)
+    return X
+
+
+def _evaluate(engine, X, age, costs, wc_max, density):
+    """``(strength, cost, violation)`` for every row of ``X`` in one model call."""
+    n = len(X)
+    F = feature_buffer(n)
+    F[:, :len(MATERIALS)] = X
+    F[:, len(MATERIALS)] = age
+    fill_engineered(F)
+    strength = engine.predict_features(F)
+    total = X.sum(axis=1)
+    violation = (np.maximum(F[:, 8] - wc_max, 0) / wc_max
+                 + (np.maximum(density[0] - total, 0) + np.maximum(total - density[1], 0)) / density[0])
+    return strength, X @ costs, violation
+
+
+def optimize_mix(engine, target, age=28, costs=None, bounds=None, wc_max=WC_MAX,
+                 density=DENSITY_RANGE, strength_range=STRENGTH_RANGE, population=POPULATION,
+                 generations=GENERATIONS, seed=0):
+    """Search for the cheapest mixes reaching ``target`` MPa at ``age`` days.
+
+    ``costs`` and ``bounds`` map material names to a price per kg and a
+    ``(lo, hi)`` range; missing entries use ``MATERIAL_COSTS`` and
+    ``TYPICAL_RANGES``.  Returns a ``MixDesign`` holding the Pareto set over
+    ``strength_range`` (widened to include ``target``).
+    """
+    t0 = time.perf_counter()
+    costs = {**MATERIAL_COSTS, **(costs or {})}
+    bounds = {**TYPICAL_RANGES, **(bounds or {})}
+    c = np.array([costs[m] for m in MATERIALS], dtype=np.float64)
+    lo = np.array([bounds[m][0] for m in MATERIALS], dtype=np.float64)
+    hi = np.array([bounds[m][1] for m in MATERIALS], dtype=np.float64)
+    if np.any(hi < lo):
+        raise ValueError("Each bound needs lo <= hi")
+    if lo[0] <= 0:
+        lo[0] = 1.0                              # W/C needs some cement
+
+    rng = np.random.default_rng(seed)
+    n, d = population, len(MATERIALS)
+    s_lo, s_hi = min(strength_range[0], target), max(strength_range[1], target)
+    targets = np.linspace(s_lo, s_hi, n)
+    # Cost units per MPa short of the target; far above any cost difference
+    penalty = float(c @ (hi - lo)) + 1.0
+
+    def fitness(strength, cost, violation):
+        return cost + penalty * (np.maximum(targets - strength, 0) + 100 * violation)
+
+    P = _repair(lo + rng.random((n, d)) * (hi - lo), lo, hi, wc_max, density)
+    strength, cost, violation = _evaluate(engine, P, age, c, wc_max, density)
+    fit = fitness(strength, cost, violation)
+    arch_X, arch_s, arch_c = P[violation == 0], strength[violation == 0], cost[violation == 0]
+
+    rows = np.arange(n)
+    for _ in range(generations):
+        r = rng.integers(0, n, size=(3, n))
+        mutant = P[r[0]] + DE_WEIGHT * (P[r[1]] - P[r[2]])
+        cross = rng.random((n, d)) < DE_CROSSOVER
+        cross[rows, rng.integers(0, d, n)] = True
+        child = _repair(np.where(cross, mutant, P), lo, hi, wc_max, density)
+
+        c_strength, c_cost, c_violation = _evaluate(engine, child, age, c, wc_max, density)
+        c_fit = fitness(c_strength, c_cost, c_violation)
+        better = c_fit <= fit
+        P[better], fit[better] = child[better], c_fit[better]
+
+        ok = c_violation == 0
+        arch_X = np.concatenate((arch_X, child[ok]))
+        arch_s = np.concatenate((arch_s, c_strength[ok]))
+        arch_c = np.concatenate((arch_c, c_cost[ok]))
+        keep = pareto_front(arch_s, arch_c)
+        arch_X, arch_s, arch_c = arch_X[keep], arch_s[keep], arch_c[keep]
+
+    mixes = np.empty((len(arch_X), len(INPUT_COLUMNS)))
+    mixes[:, :d] = arch_X
+    mixes[:, d] = age
+    return MixDesign(mixes, arch_s, arch_c, float(target), n * (generations + 1),
+                     time.perf_counter() - t0)
@@ -0,0 +1,236 @@
+"""Multi-process batch scoring of large CSV / Parquet / Arrow files.
+
+The input is cut into shards — newline-aligned byte ranges for plain CSV,
+row groups for Parquet, record batches for Arrow IPC files — and scored in a
+process pool.  Compressed CSV cannot be split and is streamed as a single
+shard.  Only the 8 input columns are read.  Each worker loads the model once
+in the pool initializer and then scores whole shards, writing them to part
+files that are concatenated in input order at the end.
+
+CSV sharding assumes no quoted field contains a newline, which holds for the
+numeric mix exports this is meant for.
+"""
+import csv
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .batch import (CHUNK_ROWS, FLAGS_COL, GRADE_COL, OOD_COL, PRED_COL, WC_COL, BatchSummary,
+                    add_curve_columns, add_result_columns, add_validation_columns, curve_column,
+                    table_features)
+from .engine import INPUT_COLUMNS, MODEL_PATH, load_engine
+from .formats import (CODECS, FrameWriter, arrow_reader, detect_format, input_columns,
+                      input_frame, iter_frames, read_frame, read_schema)
+from .validation import training_bounds, validate
+
+SHARD_BYTES = 64 * 1024 * 1024
+
+# Per-process engine, its training-range bounds and the curve ages, set by _init_worker
+_ENGINE = None
+_BOUNDS = None
+_CURVE_AGES = None
+
+
+def _init_worker(model_path, curve_ages=None):
+    global _ENGINE, _BOUNDS, _CURVE_AGES
+    _ENGINE = load_engine(model_path)
+    _BOUNDS = training_bounds(_ENGINE)
+    _CURVE_AGES = curve_ages
+
+
+def _csv_header(path):
+    with open(path, 'rb') as fh:
+        line = fh.readline()
+    names = next(csv.reader([line.decode('utf-8-sig')]))
+    return [n.strip() for n in names], len(line)
+
+
+def csv_shards(path, shard_bytes=SHARD_BYTES):
+    """Return newline-aligned ``(start, end)`` byte ranges over the data rows."""
+    size = os.path.getsize(path)
+    _, start = _csv_header(path)
+    shards = []
+    with open(path, 'rb') as fh:
+        while start < size:
+            end = min(start + shard_bytes, size)
+            if end < size:
+                fh.seek(end)
+                fh.readline()
+                end = fh.tell()
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+def parquet_shards(path, shard_bytes=SHARD_BYTES):
+    """Group consecutive row groups into shards of roughly ``shard_bytes``."""
+    import pyarrow.parquet as pq
+    meta = pq.ParquetFile(path).metadata
+    shards, current, current_bytes = [], [], 0
+    for i in range(meta.num_row_groups):
+        current.append(i)
+        current_bytes += meta.row_group(i).total_byte_size
+        if current_bytes >= shard_bytes:
+            shards.append(current)
+            current, current_bytes = [], 0
+    if current:
+        shards.append(current)
+    return shards
+
+
+def arrow_shards(path, shard_bytes=SHARD_BYTES):
+    """Group consecutive record batches of an IPC file into shards of roughly
+    ``shard_bytes``; an IPC stream is one shard (``None``)."""
+    reader = arrow_reader(path)
+    if not hasattr(reader, 'get_batch'):
+        return [None]
+    shards, current, current_bytes = [], [], 0
+    for i in range(reader.num_record_batches):
+        current.append(i)
+        current_bytes += reader.get_batch(i).nbytes
+        if current_bytes >= shard_bytes:
+            shards.append(current)
+            current, current_bytes = [], 0
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _score_frame(df, writer, scheme):
+    F = table_features(df)
+    report = validate(F, _BOUNDS)
+    preds = _ENGINE.predict_features(F)
+    add_result_columns(df, preds, scheme)
+    add_validation_columns(df, report)
+    if _CURVE_AGES:
+        add_curve_columns(df, _ENGINE.predict_curve_features(F, _CURVE_AGES), _CURVE_AGES)
+    writer.write(df)
+    return BatchSummary().update(preds, report)
+
+
+def _score_csv_range(path, start, end, names, selected, part, out_fmt, scheme):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+    df = read_frame(io.BytesIO(data), 'csv', selected, names=names)
+    with FrameWriter(part, out_fmt, header=False) as writer:
+        return _score_frame(df, writer, scheme)
+
+
+def _score_row_groups(path, groups, selected, part, out_fmt, scheme):
+    import pyarrow.parquet as pq
+    table = pq.ParquetFile(path).read_row_groups(groups, columns=list(selected))
+    with FrameWriter(part, out_fmt, header=False) as writer:
+        return _score_frame(input_frame(table, selected), writer, scheme)
+
+
+def _score_batches(path, batches, selected, part, out_fmt, scheme):
+    import pyarrow as pa
+    reader = arrow_reader(path)
+    table = pa.Table.from_batches([reader.get_batch(i) for i in batches], schema=reader.schema)
+    with FrameWriter(part, out_fmt, header=False) as writer:
+        return _score_frame(input_frame(table, selected), writer, scheme)
+
+
+def _score_stream(path, in_fmt, selected, part, out_fmt, scheme):
+    summary = BatchSummary()
+    with FrameWriter(part, out_fmt, header=False) as writer:
+        for df in iter_frames(path, in_fmt, CHUNK_ROWS, selected):
+            summary.merge(_score_frame(df, writer, scheme))
+    return summary
+
+
+def _write_empty(output, out_fmt, scheme):
+    # No shard produced rows: score an empty frame so the file still carries
+    # the output schema (inputs, results and any curve columns)
+    import pyarrow as pa
+    table = pa.table({c: pa.array([], pa.float64()) for c in INPUT_COLUMNS})
+    with FrameWriter(output, out_fmt) as writer:
+        _score_frame(input_frame(table, {c: c for c in INPUT_COLUMNS}), writer, scheme)
+
+
+def _concat_parts(parts, output, out_fmt, columns):
+    import pyarrow as pa
+
+    parts = [p for p in parts if os.path.exists(p)]
+    if out_fmt in ('parquet', 'arrow'):
+        import pyarrow.parquet as pq
+        with FrameWriter(output, out_fmt) as writer:
+            for part in parts:
+                writer.write_table(pq.read_table(part) if out_fmt == 'parquet'
+                                   else arrow_reader(part).read_all())
+        return
+    # Header-less CSV parts; gzip members and zstd frames concatenate into a
+    # valid compressed file, so parts are appended byte for byte
+    header = io.StringIO()
+    csv.writer(header, lineterminator='\n').writerow(columns)
+    with pa.output_stream(output, compression=CODECS.get(out_fmt)) as out:
+        out.write(header.getvalue().encode('utf-8'))
+    with open(output, 'ab') as out:
+        for part in parts:
+            with open(part, 'rb') as fh:
+                shutil.copyfileobj(fh, out)
+
+
+def score_file(input_path, output_path, model_path=MODEL_PATH, workers=None,
+               shard_bytes=SHARD_BYTES, scheme=None, curve_ages=None):
+    """Score ``input_path`` into ``output_path`` in parallel.
+
+    Both formats follow the file extensions (see ``formats.detect_format``)
+    and the ``Grade`` column uses the grade scheme key ``scheme``.
+    ``curve_ages`` adds one strength column per age.  Returns
+    the merged ``BatchSummary``; raises ``ValueError`` if required columns
+    are missing or a file type is not supported.
+    """
+    workers = workers or os.cpu_count() or 1
+    in_fmt, out_fmt = detect_format(input_path), detect_format(output_path)
+
+    names = read_schema(input_path, in_fmt)
+    selected = input_columns(names)
+    out_names = INPUT_COLUMNS + [PRED_COL, GRADE_COL, WC_COL, FLAGS_COL, OOD_COL]
+    out_names += [curve_column(age) for age in curve_ages or ()]
+
+    if in_fmt == 'csv':
+        shards = csv_shards(input_path, shard_bytes)
+    elif in_fmt == 'parquet':
+        shards = parquet_shards(input_path, shard_bytes)
+    elif in_fmt == 'arrow':
+        shards = arrow_shards(input_path, shard_bytes)
+    else:
+        shards = [None]
+
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    summary = BatchSummary()
+    with tempfile.TemporaryDirectory(dir=out_dir, prefix='.parts-') as tmp:
+        parts = [os.path.join(tmp, f'part-{i:05d}') for i in range(len(shards))]
+        if in_fmt == 'csv':
+            tasks = [(_score_csv_range, (input_path, start, end, names, selected, part, out_fmt, scheme))
+                     for (start, end), part in zip(shards, parts)]
+        elif in_fmt == 'parquet':
+            tasks = [(_score_row_groups, (input_path, groups, selected, part, out_fmt, scheme))
+                     for groups, part in zip(shards, parts)]
+        elif shards == [None]:
+            tasks = [(_score_stream, (input_path, in_fmt, selected, parts[0], out_fmt, scheme))]
+        else:
+            tasks = [(_score_batches, (input_path, batches, selected, part, out_fmt, scheme))
+                     for batches, part in zip(shards, parts)]
+
+        if workers == 1 or len(tasks) <= 1:
+            _init_worker(model_path, curve_ages)
+            results = [fn(*args) for fn, args in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                     initializer=_init_worker, initargs=(model_path, curve_ages)) as pool:
+                futures = [pool.submit(fn, *args) for fn, args in tasks]
+                results = [f.result() for f in futures]
+
+        for part_summary in results:
+            summary.merge(part_summary)
+        if out_fmt in ('parquet', 'arrow') and not any(map(os.path.exists, parts)):
+            _init_worker(model_path, curve_ages)
+            _write_empty(output_path, out_fmt, scheme)
+        else:
+            _concat_parts(parts, output_path, out_fmt, out_names)
+    return summary
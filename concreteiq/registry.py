@@ -0,0 +1,250 @@
+"""Hot-reloadable model slot.
+
+``ModelSlot`` owns the model served from one path.  A background thread
+polls the file; when its fingerprint changes the new model is loaded and
+checked against ``GOLDEN_MIXES`` off the request path, and only then is the
+slot's ``current`` reference replaced.  Rebinding one attribute is atomic,
+so callers that read ``slot.current`` once per request or batch keep scoring
+with the version they started on while new calls see the new one.
+
+A model that fails to load or validate is reported in ``last_error`` and
+the running version stays in place.
+
+``ModelRegistry`` keeps several named slots (per supplier, per region, ...)
+in memory, loading them on first use and evicting the least recently used
+ones beyond ``capacity``.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .engine import StrengthEngine, load_model, model_fingerprint
+
+WATCH_INTERVAL = 2.0
+
+# Optional directory of extra models, one file per model (named by file stem)
+MODEL_DIR = os.environ.get('CONCRETEIQ_MODEL_DIR')
+MODEL_SUFFIXES = ('.pkl', '.joblib', '.ciq')
+MODEL_CAPACITY = 4
+
+# Representative mixes (INPUT_COLUMNS order) every candidate model must score
+GOLDEN_MIXES = np.array([
+    [540.0,   0.0,   0.0, 162.0,  2.5, 1040.0, 676.0,  28],
+    [332.5, 142.5,   0.0, 228.0,  0.0,  932.0, 594.0, 270],
+    [198.6, 132.4,   0.0, 192.0,  0.0,  978.4, 825.5, 360],
+    [266.0, 114.0,   0.0, 228.0,  0.0,  932.0, 670.0,  90],
+    [380.0,  95.0,   0.0, 228.0,  0.0,  932.0, 594.0,   7],
+    [139.6, 209.4,   0.0, 192.0,  0.0, 1047.0, 806.9,   3],
+    [252.0,   0.0, 120.0, 185.0,  8.0, 1050.0, 770.0,  14],
+])
+# Plausible range for any golden prediction, MPa
+GOLDEN_RANGE = (0.0, 150.0)
+
+
+@dataclass
+class ModelVersion:
+    """One loaded model and where it came from."""
+    engine: StrengthEngine
+    fingerprint: str
+    path: str
+    number: int
+    loaded_at: float = field(default_factory=time.time)
+    load_seconds: float = 0.0
+
+    @property
+    def model_data(self):
+        return self.engine.model_data
+
+    @property
+    def label(self):
+        return f"v{self.number} · {self.fingerprint[:8]}"
+
+
+def validate_engine(engine, golden=GOLDEN_MIXES, bounds=GOLDEN_RANGE):
+    """Raise ``ValueError`` unless ``engine`` gives finite, plausible and
+    non-constant predictions for the golden mixes; returns them otherwise."""
+    preds = engine.predict(golden)
+    if preds.shape != (len(golden),) or not np.all(np.isfinite(preds)):
+        raise ValueError("model returned non-finite predictions for the golden mixes")
+    lo, hi = bounds
+    if preds.min() < lo or preds.max() > hi:
+        raise ValueError(f"golden predictions outside {lo:g}–{hi:g} MPa "
+                         f"(got {preds.min():.1f}–{preds.max():.1f})")
+    if np.ptp(preds) == 0:
+        raise ValueError("model gives the same prediction for every golden mix")
+    return preds
+
+
+class ModelSlot:
+    """The current model version for ``path``, optionally hot-reloaded.
+
+    The first version is loaded (and validated) in the constructor, so
+    construction raises if the file is missing or invalid.
+    """
+
+    def __init__(self, path, validate=validate_engine):
+        self.path = path
+        self.validate = validate
+        self.last_error = None
+        self._number = 0
+        self._lock = threading.Lock()        # serialises reloads, not reads
+        self._listeners = []
+        self._stat = self._file_stat()
+        self.current = self._load(model_fingerprint(path))
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def _file_stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _load(self, fingerprint):
+        t0 = time.perf_counter()
+        engine = StrengthEngine(load_model(self.path), fingerprint=fingerprint)
+        if self.validate is not None:
+            self.validate(engine)
+        self._number += 1
+        return ModelVersion(engine, fingerprint, self.path, self._number,
+                            load_seconds=time.perf_counter() - t0)
+
+    def on_swap(self, callback):
+        """Call ``callback(new_version, old_version)`` after every swap."""
+        self._listeners.append(callback)
+
+    def reload(self, force=False):
+        """Load the file again if its fingerprint changed (or ``force``).
+
+        Returns the new ``ModelVersion``, or ``None`` if nothing was swapped.
+        Load and validation errors are stored in ``last_error``.
+        """
+        with self._lock:
+            self._stat = self._file_stat()
+            try:
+                fingerprint = model_fingerprint(self.path)
+                if fingerprint == self.current.fingerprint and not force:
+                    return None
+                version = self._load(fingerprint)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                return None
+            self.last_error = None
+            old, self.current = self.current, version
+        for callback in self._listeners:
+            callback(version, old)
+        return version
+
+    def check(self):
+        """Reload if the file's stat changed since the last look."""
+        if self._file_stat() != self._stat:
+            return self.reload()
+        return None
+
+    def watch(self, interval=WATCH_INTERVAL):
+        """Poll the file on a daemon thread every ``interval`` seconds."""
+        if self._watcher is not None:
+            return self
+        def run():
+            while not self._stop.wait(interval):
+                self.check()
+        self._watcher = threading.Thread(target=run, name='concreteiq-model-watch', daemon=True)
+        self._watcher.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+def discover_models(directory):
+    """``{name: path}`` for the model files in ``directory``, sorted by name."""
+    found = {}
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        stem, suffix = os.path.splitext(entry.name)
+        if entry.is_file() and suffix.lower() in MODEL_SUFFIXES:
+            found.setdefault(stem, entry.path)
+    return found
+
+
+class ModelRegistry:
+    """Named ``ModelSlot``s, loaded lazily and held in an LRU of ``capacity``.
+
+    ``default`` (the first name unless given) is never evicted.  Evicted
+    slots stop watching their file; versions already handed out keep
+    working until their holders drop them.
+    """
+
+    def __init__(self, paths, default=None, capacity=MODEL_CAPACITY, watch=True,
+                 interval=WATCH_INTERVAL):
+        if not paths:
+            raise ValueError("ModelRegistry needs at least one model")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.paths = dict(paths)
+        self.default = default if default is not None else next(iter(self.paths))
+        if self.default not in self.paths:
+            raise KeyError(self.default)
+        self.capacity = capacity
+        self.watch = watch
+        self.interval = interval
+        self._slots = OrderedDict()
+        self._lock = threading.Lock()
+        self.get(self.default)
+
+    @property
+    def names(self):
+        return list(self.paths)
+
+    @property
+    def loaded(self):
+        """Names of the models in memory, least recently used first."""
+        with self._lock:
+            return list(self._slots)
+
+    def get(self, name=None):
+        """The slot for ``name`` (default model if ``None``), loading it if needed."""
+        name = self.default if name is None else name
+        with self._lock:
+            slot = self._slots.get(name)
+            if slot is not None:
+                self._slots.move_to_end(name)
+                return slot
+        if name not in self.paths:
+            raise KeyError(f"Unknown model {name!r}")
+        # Loading can take a while; other models stay available meanwhile
+        slot = ModelSlot(self.paths[name])
+        if self.watch:
+            slot.watch(self.interval)
+        with self._lock:
+            if name in self._slots:        # loaded concurrently: keep the first one
+                slot.close()
+                self._slots.move_to_end(name)
+                return self._slots[name]
+            self._slots[name] = slot
+            evicted = self._evict()
+        for old in evicted:
+            old.close()
+        return slot
+
+    def _evict(self):
+        evicted = []
+        for name in list(self._slots):
+            if len(self._slots) <= self.capacity:
+                break
+            if name != self.default:
+                evicted.append(self._slots.pop(name))
+        return evicted
+
+    def close(self):
+        with self._lock:
+            slots, self._slots = list(self._slots.values()), OrderedDict()
+        for slot in slots:
+            slot.close()
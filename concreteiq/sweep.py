@@ -0,0 +1,90 @@
+"""What-if sweeps around one mix.
+
+``sweep`` varies one or two inputs of a base mix over an evenly spaced grid
+and scores every grid point with a single ``predict_features`` call.  The
+feature matrix is filled column by column — the fixed inputs broadcast,
+the swept ones repeated/tiled — so no per-point rows are ever built, and a
+grid of tens of thousands of points costs a few milliseconds.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import INPUT_COLUMNS, feature_buffer, fill_engineered
+from .validation import TYPICAL_RANGES, validate
+
+# Grid points per axis for one- and two-parameter sweeps
+SWEEP_POINTS = {1: 365, 2: 150}
+MAX_GRID_POINTS = 250_000
+
+
+@dataclass
+class SweepResult:
+    """Predictions over the grid spanned by ``axes``.
+
+    ``strength`` and ``out_of_range`` have shape ``(len(axes[0]),)`` or
+    ``(len(axes[0]), len(axes[1]))``.
+    """
+    params: tuple
+    axes: tuple
+    strength: np.ndarray
+    out_of_range: np.ndarray = None
+
+    @property
+    def points(self):
+        return self.strength.size
+
+
+def sweep_axis(column, lo=None, hi=None, points=SWEEP_POINTS[1]):
+    """Evenly spaced values of ``column``; ``lo``/``hi`` default to its typical range."""
+    if column not in INPUT_COLUMNS:
+        raise ValueError(f"Unknown input {column!r}")
+    typical_lo, typical_hi = TYPICAL_RANGES[column]
+    lo = typical_lo if lo is None else lo
+    hi = typical_hi if hi is None else hi
+    if not hi > lo:
+        raise ValueError(f"{column}: sweep range must have hi > lo (got {lo}–{hi})")
+    return np.linspace(lo, hi, int(points))
+
+
+def sweep(engine, base, ranges, points=None, bounds=None):
+    """Score ``base`` (8 inputs, ``INPUT_COLUMNS`` order) with one or two
+    inputs swept.
+
+    ``ranges`` maps each swept column to ``(lo, hi)`` (``None`` for the
+    typical range) or to an explicit array of values.  ``points`` is the
+    number of values per axis for ``(lo, hi)`` ranges.  With ``bounds`` from
+    ``validation.training_bounds`` the result also marks grid points
+    outside the training range.
+    """
+    if not 1 <= len(ranges) <= 2:
+        raise ValueError("Sweep one or two parameters")
+    base = np.asarray(base, dtype=np.float64)
+    if base.shape != (len(INPUT_COLUMNS),):
+        raise ValueError(f"Base mix must have {len(INPUT_COLUMNS)} values")
+    points = points or SWEEP_POINTS[len(ranges)]
+    axes = []
+    for column, spec in ranges.items():
+        if spec is None or (isinstance(spec, tuple) and len(spec) == 2):
+            axes.append(sweep_axis(column, *(spec or (None, None)), points=points))
+        else:
+            axes.append(np.asarray(spec, dtype=np.float64))
+    shape = tuple(len(a) for a in axes)
+    n = int(np.prod(shape))
+    if n > MAX_GRID_POINTS:
+        raise ValueError(f"Sweep grid of {n:,} points exceeds {MAX_GRID_POINTS:,}")
+
+    F = feature_buffer(n)
+    F[:, :len(INPUT_COLUMNS)] = base
+    # 'ij' order: the first axis varies slowest
+    inner = 1
+    for column, values in zip(reversed(list(ranges)), reversed(axes)):
+        F[:, INPUT_COLUMNS.index(column)] = np.tile(np.repeat(values, inner), n // (inner * len(values)))
+        inner *= len(values)
+    fill_engineered(F)
+
+    strength = engine.predict_features(F).reshape(shape)
+    out_of_range = None
+    if bounds is not None:
+        out_of_range = validate(F, bounds).out_of_range.reshape(shape)
+    return SweepResult(tuple(ranges), tuple(axes), strength, out_of_range)
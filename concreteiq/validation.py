@@ -0,0 +1,247 @@
+"""Vectorized validation of mix inputs.
+
+``RULES`` is a declarative table of per-column bounds: hard errors (missing
+or negative values, the minimums the Manual Input page has always enforced)
+and warnings for values outside the typical ranges listed in the README
+(the span of the training data for each input).  ``validate`` ORs each
+rule's bit into a per-row ``uint32`` bitmask.  Column minima and maxima are
+taken first, so a rule only costs a masked pass over the rows when some row
+actually breaks it; a clean batch costs two reductions over the feature
+matrix, about as much as scoring it.
+
+A separate bit marks rows whose engineered features (W/C ratio, total
+binder, log age) fall outside ``mean ± OOD_Z * scale`` of the model's
+stored scaler statistics — combinations the model never saw even when each
+input is in range.
+"""
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .engine import FEATURE_NAMES, INPUT_COLUMNS
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# Standard deviations from the training mean that count as out of distribution
+OOD_Z = 3.0
+# Features checked against the scaler statistics; the raw inputs are
+# covered by TYPICAL_RANGES, and their skewed distributions make mean ± z·σ
+# a poor range for them
+OOD_FEATURES = FEATURE_NAMES[len(INPUT_COLUMNS):]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Row is flagged when ``column`` is below ``lo`` (at or below it if
+    ``open_lo``) or above ``hi``."""
+    code: str
+    column: str
+    severity: str
+    message: str
+    lo: float = -math.inf
+    hi: float = math.inf
+    open_lo: bool = False
+
+
+# Typical ranges (README "Parameter Input" table): outside them is a warning
+TYPICAL_RANGES = {
+    'Cement':             (100, 540),
+    'Blast Furnace Slag': (0, 360),
+    'Fly Ash':            (0, 200),
+    'Water':              (120, 250),
+    'Superplasticizer':   (0, 32),
+    'Coarse Aggregate':   (800, 1150),
+    'Fine Aggregate':     (600, 1000),
+    'Age':                (1, 365),
+}
+_UNITS = {'Age': 'days'}
+
+RULES = (
+    *(Rule(f'{c.lower().replace(" ", "_")}_required', c, ERROR, f"{c} is required.", lo=0, open_lo=True)
+      for c in ('Cement', 'Water', 'Coarse Aggregate', 'Fine Aggregate')),
+    Rule('cement_low', 'Cement', ERROR, "Cement too low — expected 100–540 kg/m³.", lo=100),
+    Rule('water_low', 'Water', ERROR, "Water too low — expected 120–250 kg/m³.", lo=100),
+    Rule('coarse_low', 'Coarse Aggregate', ERROR, "Coarse Aggregate too low — expected 800–1150 kg/m³.", lo=500),
+    Rule('fine_low', 'Fine Aggregate', ERROR, "Fine Aggregate too low — expected 600–1000 kg/m³.", lo=500),
+    Rule('age_low', 'Age', ERROR, "Age must be at least 1 day.", lo=1),
+    *(Rule(f'{c.lower().replace(" ", "_")}_negative', c, ERROR, f"{c} is negative.", lo=0)
+      for c in INPUT_COLUMNS if c not in ('Cement', 'Water', 'Coarse Aggregate', 'Fine Aggregate', 'Age')),
+    *(Rule(f'{c.lower().replace(" ", "_")}_atypical', c, WARNING,
+           f"{c} outside the typical {lo}–{hi} {_UNITS.get(c, 'kg/m³')}.", lo=lo, hi=hi)
+      for c, (lo, hi) in TYPICAL_RANGES.items()),
+)
+
+# Bits after the rule bits
+MISSING_BIT = len(RULES)
+OOD_BIT = len(RULES) + 1
+assert OOD_BIT < 32
+
+MISSING_MESSAGE = "Missing or non-numeric value."
+OOD_MESSAGE = "Outside the model's training range."
+
+ERROR_MASK = np.uint32(sum(1 << i for i, r in enumerate(RULES) if r.severity == ERROR) | (1 << MISSING_BIT))
+WARNING_MASK = np.uint32(sum(1 << i for i, r in enumerate(RULES) if r.severity == WARNING))
+OOD_MASK = np.uint32(1 << OOD_BIT)
+
+
+def training_bounds(engine, z=OOD_Z):
+    """``(lo, hi)`` per engineered feature (``FEATURE_NAMES`` order) from the
+    engine's scaler statistics, or ``None`` if the model has no scaler."""
+    scaler = getattr(engine, 'scaler', None)
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    if mean is None or scale is None:
+        return None
+    order = [engine.feature_names.index(f) for f in FEATURE_NAMES]
+    mean = np.asarray(mean, dtype=np.float64)[order]
+    scale = np.asarray(scale, dtype=np.float64)[order]
+    return mean - z * scale, mean + z * scale
+
+
+def flag_messages(flags, severity=None):
+    """Messages for the bits set in one row's ``flags``, optionally only of
+    ``severity``; at most one message per column, in ``RULES`` order."""
+    flags, out, seen = int(flags), [], set()
+    if flags >> MISSING_BIT & 1 and severity in (None, ERROR):
+        out.append(MISSING_MESSAGE)
+    for i, rule in enumerate(RULES):
+        if flags >> i & 1 and severity in (None, rule.severity) and rule.column not in seen:
+            out.append(rule.message)
+            seen.add(rule.column)
+    if flags >> OOD_BIT & 1 and severity in (None, WARNING):
+        out.append(OOD_MESSAGE)
+    return out
+
+
+@dataclass
+class ValidationSummary:
+    """Row and per-rule counts over one or more validated batches."""
+    rows: int = 0
+    error_rows: int = 0
+    warning_rows: int = 0
+    ood_rows: int = 0
+    # One count per bit: the RULES, then missing and out of training range
+    bit_counts: np.ndarray = field(default_factory=lambda: np.zeros(OOD_BIT + 1, dtype=np.int64))
+    # Out-of-training-range rows per engineered feature
+    ood_features: np.ndarray = field(default_factory=lambda: np.zeros(len(FEATURE_NAMES), dtype=np.int64))
+
+    @property
+    def flagged_rows(self):
+        return self.error_rows + self.warning_rows + self.ood_rows
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.error_rows += other.error_rows
+        self.warning_rows += other.warning_rows
+        self.ood_rows += other.ood_rows
+        self.bit_counts += other.bit_counts
+        self.ood_features += other.ood_features
+        return self
+
+    def to_dict(self):
+        return {'rows': self.rows, 'error_rows': self.error_rows, 'warning_rows': self.warning_rows,
+                'ood_rows': self.ood_rows, 'bit_counts': self.bit_counts.tolist(),
+                'ood_features': self.ood_features.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['rows'], d['error_rows'], d['warning_rows'], d['ood_rows'],
+                   np.asarray(d['bit_counts'], dtype=np.int64),
+                   np.asarray(d['ood_features'], dtype=np.int64))
+
+    def items(self):
+        """``[(severity, message, rows)]`` for every rule that fired."""
+        out = []
+        if self.bit_counts[MISSING_BIT]:
+            out.append((ERROR, MISSING_MESSAGE, int(self.bit_counts[MISSING_BIT])))
+        out += [(r.severity, r.message, int(c)) for r, c in zip(RULES, self.bit_counts) if c]
+        if self.bit_counts[OOD_BIT]:
+            names = ', '.join(n for n, c in zip(FEATURE_NAMES, self.ood_features) if c)
+            out.append((WARNING, f"{OOD_MESSAGE} ({names})", int(self.bit_counts[OOD_BIT])))
+        return out
+
+
+@dataclass
+class ValidationReport:
+    """Per-row flag bitmasks for one batch plus its summary."""
+    flags: np.ndarray
+    summary: ValidationSummary
+
+    @property
+    def errors(self):
+        return (self.flags & ERROR_MASK) != 0
+
+    @property
+    def out_of_range(self):
+        return (self.flags & OOD_MASK) != 0
+
+
+def _breaks(lo, hi, low, high, open_lo=False):
+    """Whether any value in a column spanning ``[low, high]`` is outside ``(lo, hi)``."""
+    return (low <= lo if open_lo else low < lo) or high > hi
+
+
+def validate(F, bounds=None):
+    """Validate an (n, 11) feature matrix (``FEATURE_NAMES`` order; the first
+    8 columns are the inputs).  ``bounds`` comes from ``training_bounds``.
+    """
+    F = np.asarray(F, dtype=np.float64)
+    if F.ndim == 1:
+        F = F.reshape(1, -1)
+    n = F.shape[0]
+    flags = np.zeros(n, dtype=np.uint32)
+    mask = np.empty(n, dtype=bool)
+    tmp = np.empty(n, dtype=bool)
+    summary = ValidationSummary(rows=n)
+    counts = summary.bit_counts
+    if not n:
+        return ValidationReport(flags, summary)
+
+    def mark(bit):
+        counts[bit] = np.count_nonzero(mask)
+        if counts[bit]:
+            np.bitwise_or(flags, np.uint32(1 << bit), out=flags, where=mask)
+
+    # Column extremes; NaN propagates, so a NaN minimum marks a column with gaps
+    low, high = F.min(axis=0), F.max(axis=0)
+    gaps = np.flatnonzero(np.isnan(low))
+    if len(gaps):
+        mask.fill(False)
+        for j in gaps:
+            low[j], high[j] = np.fmin.reduce(F[:, j]), np.fmax.reduce(F[:, j])
+            if j < len(INPUT_COLUMNS):
+                mask |= np.isnan(F[:, j], out=tmp)
+        mark(MISSING_BIT)
+
+    # NaN compares False, so missing values only raise the missing bit
+    for bit, rule in enumerate(RULES):
+        j = INPUT_COLUMNS.index(rule.column)
+        if not _breaks(rule.lo, rule.hi, low[j], high[j], rule.open_lo):
+            continue
+        col = F[:, j]
+        (np.less_equal if rule.open_lo else np.less)(col, rule.lo, out=mask)
+        if rule.hi < math.inf:
+            mask |= np.greater(col, rule.hi, out=tmp)
+        mark(bit)
+
+    if bounds is not None and F.shape[1] == len(FEATURE_NAMES):
+        lo, hi = bounds
+        ood = None
+        for name in OOD_FEATURES:
+            j = FEATURE_NAMES.index(name)
+            if not _breaks(lo[j], hi[j], low[j], high[j]):
+                continue
+            np.less(F[:, j], lo[j], out=mask)
+            mask |= np.greater(F[:, j], hi[j], out=tmp)
+            summary.ood_features[j] = np.count_nonzero(mask)
+            ood = mask.copy() if ood is None else np.logical_or(ood, mask, out=ood)
+        if ood is not None:
+            mask[:] = ood
+            mark(OOD_BIT)
+
+    summary.error_rows = int(np.count_nonzero(flags & ERROR_MASK))
+    summary.warning_rows = int(np.count_nonzero(flags & WARNING_MASK))
+    summary.ood_rows = int(counts[OOD_BIT])
+    return ValidationReport(flags, summary)
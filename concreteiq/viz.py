@@ -0,0 +1,145 @@
+"""Server-side reduction of batch results for plotting.
+
+Charts over a large batch should ship a bounded payload to the browser, not
+every row.  Histograms are binned here with NumPy and sent as bar heights;
+scatter plots get a sample of at most ``budget`` points, either stratified
+by grade (every grade that occurs stays visible) or picked with
+Largest-Triangle-Three-Buckets (LTTB), which keeps the visual outline of a
+series sorted by x.
+
+Very large batches are better drawn as a density grid: ``density_grid``
+bins the full data with ``np.histogram2d`` so the payload size depends only
+on the grid, and ``scatter_mode`` picks between SVG points, WebGL points
+and the density grid from the point and row counts.
+
+Everything returns NumPy arrays or row indices; building the figures is
+left to the caller.
+"""
+import numpy as np
+
+POINT_BUDGET = 5_000
+SAMPLING_METHODS = ('stratified', 'lttb')
+
+# Scatter rendering thresholds: WebGL above this many plotted points,
+# a server-side density grid above this many rows
+WEBGL_MIN_POINTS = 1_000
+DENSITY_MIN_ROWS = 100_000
+DENSITY_BINS = (60, 50)
+
+# Stratified sampling keeps at least this many points of every grade present
+_MIN_PER_STRATUM = 25
+
+
+def histogram(values, bins=25, range=None):
+    """``(edges, counts)`` of ``values``, ignoring NaNs."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins=bins, range=range)
+    return edges, counts
+
+
+def stratified_sample(strata, budget=POINT_BUDGET, seed=0):
+    """Row indices of a sample of at most ``budget`` rows, split across
+    the integer ``strata`` (e.g. grade index) in proportion to their size.
+
+    Small strata get at least ``min(size, 25)`` rows so rare grades are not
+    sampled away.  Indices are returned in ascending order.
+    """
+    strata = np.asarray(strata)
+    n = len(strata)
+    if n <= budget:
+        return np.arange(n)
+    order = np.argsort(strata, kind='stable')
+    values, starts, sizes = np.unique(strata[order], return_index=True, return_counts=True)
+
+    floor = np.minimum(sizes, _MIN_PER_STRATUM)
+    take = np.maximum(floor, np.floor(sizes * (budget / n)).astype(np.int64))
+    # The floors can push the total over budget; trim the largest strata
+    excess = take.sum() - budget
+    while excess > 0:
+        j = int(np.argmax(take - floor))
+        cut = min(excess, int(take[j] - floor[j]))
+        if cut <= 0:
+            break
+        take[j] -= cut
+        excess -= cut
+
+    rng = np.random.default_rng(seed)
+    picks = [order[s + rng.choice(size, k, replace=False)]
+             for s, size, k in zip(starts, sizes, take) if k]
+    return np.sort(np.concatenate(picks))
+
+
+def lttb(x, y, budget=POINT_BUDGET):
+    """Row indices chosen by Largest-Triangle-Three-Buckets.
+
+    Rows are ordered by ``x`` first; the first and last rows are always
+    kept and each of the ``budget - 2`` buckets in between contributes the
+    row forming the largest triangle with its neighbours' picks.  Returns
+    indices into the original arrays, ordered by ``x``.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    order = np.argsort(x, kind='stable')
+    if n <= budget:
+        return order
+    if budget < 3:
+        return order[np.linspace(0, n - 1, budget).astype(np.int64)]
+    xs, ys = x[order], y[order]
+
+    # Bucket boundaries over rows 1..n-2
+    bounds = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    picked = np.empty(budget, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        nlo, nhi = hi, bounds[i + 2] if i + 2 < len(bounds) else n
+        cx, cy = xs[nlo:nhi].mean(), ys[nlo:nhi].mean()
+        area = np.abs((xs[a] - cx) * (ys[lo:hi] - ys[a]) - (xs[a] - xs[lo:hi]) * (cy - ys[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return order[picked]
+
+
+def sample_points(x, y, strata=None, budget=POINT_BUDGET, method='stratified', seed=0):
+    """Indices of at most ``budget`` rows to plot, by ``method``
+    (``'stratified'`` over ``strata`` or ``'lttb'`` along ``x``)."""
+    if method == 'lttb':
+        return lttb(x, y, budget)
+    if method != 'stratified':
+        raise ValueError(f"Unknown sampling method {method!r}; expected one of {SAMPLING_METHODS}")
+    if strata is None:
+        strata = np.zeros(len(x), dtype=np.int8)
+    return stratified_sample(strata, budget, seed)
+
+
+def page_bounds(n_rows, page, page_size):
+    """``(start, stop, n_pages)`` for 1-based ``page`` (clamped to range)."""
+    n_pages = max(1, -(-n_rows // page_size))
+    page = min(max(page, 1), n_pages)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n_rows), n_pages
+
+
+def scatter_mode(n_points, n_rows=None):
+    """``'svg'``, ``'webgl'`` or ``'density'`` for a scatter of ``n_points``
+    plotted points drawn from ``n_rows`` rows."""
+    if (n_rows if n_rows is not None else n_points) >= DENSITY_MIN_ROWS:
+        return 'density'
+    return 'webgl' if n_points >= WEBGL_MIN_POINTS else 'svg'
+
+
+def density_grid(x, y, bins=DENSITY_BINS):
+    """``(x_edges, y_edges, counts)`` of a 2-D histogram over all rows.
+
+    ``counts`` is indexed ``[y_bin, x_bin]`` (heatmap orientation); rows with
+    a NaN coordinate are dropped.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = ~(np.isnan(x) | np.isnan(y))
+    counts, x_edges, y_edges = np.histogram2d(x[ok], y[ok], bins=bins)
+    return x_edges, y_edges, counts.T
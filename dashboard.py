@@ -1,10 +1,38 @@
+import html
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+
 import streamlit as st
-import pandas as pd
 import numpy as np
-import joblib
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from concreteiq.batch import (CHUNK_ROWS, HIST_EDGES, PRED_COL, SPREAD_COLS,
+                              score_models, table_features)
+from concreteiq.batching import MicroBatcher
+from concreteiq.cache import CACHE_PATH, PredictionCache
+from concreteiq.columns import missing_columns, select_columns
+from concreteiq.engine import CURVE_AGES, INPUT_COLUMNS, MODEL_PATH, engineer_features
+from concreteiq.formats import (FILE_SUFFIX, FORMATS, MIME_TYPES, UPLOAD_TYPES, detect_format,
+                                estimate_rows, frame_bytes, read_frame, read_schema)
+from concreteiq.grades import default_scheme_key, get_scheme, scheme_keys
+from concreteiq.history import PredictionHistory
+from concreteiq.jobqueue import DONE, FAILED, JobQueue
+from concreteiq.jobs import BatchJob, JobStore, content_hash, job_key
+from concreteiq.optimize import MATERIAL_COSTS, MATERIALS, WC_MAX, optimize_mix
+from concreteiq.registry import MODEL_DIR, ModelRegistry, discover_models
+from concreteiq.sweep import SWEEP_POINTS, sweep
+from concreteiq.validation import (ERROR, TYPICAL_RANGES, WARNING, flag_messages, training_bounds,
+                                   validate)
+from concreteiq.viz import (POINT_BUDGET, SAMPLING_METHODS, density_grid, histogram, page_bounds,
+                            sample_points, scatter_mode)
+
+# Set to a directory to keep each user's prediction history across sessions
+HISTORY_DIR = os.environ.get('CONCRETEIQ_HISTORY_DIR')
+# Set to a port to serve the HTTP prediction API next to the dashboard
+API_PORT = os.environ.get('CONCRETEIQ_API_PORT')
 
 # ============================================================
 #  PAGE CONFIG
@@ -44,594 +72,23 @@ st.set_page_config(
 #  Surface White    #FFFFFF   Cards / inputs
 # ============================================================
 
-CSS = """
-<style>
-/* ── GOOGLE FONT ─────────────────────────────────────────── */
-@import url('https://fonts.googleapis.com/css2?family=DM+Sans:wght@300;400;500;600;700&family=DM+Mono:wght@400;500&display=swap');
-
-/* ── CSS VARIABLES ───────────────────────────────────────── */
-:root {
-  --primary:          #1B4FD8;
-  --primary-dark:     #1338A8;
-  --primary-light:    #EEF3FF;
-  --secondary:        #0EA5A0;
-  --secondary-light:  #E6F8F7;
-
-  --n950: #0D1117;
-  --n800: #1E2633;
-  --n600: #4B5563;
-  --n400: #9CA3AF;
-  --n200: #E5E7EB;
-  --n100: #F3F4F6;
-  --n50:  #F9FAFB;
-
-  --success: #059669;
-  --warning: #D97706;
-  --error:   #DC2626;
-
-  --surface: #FFFFFF;
-  --radius-sm: 6px;
-  --radius-md: 10px;
-  --radius-lg: 16px;
-  --shadow-sm: 0 1px 3px rgba(0,0,0,.06), 0 1px 2px rgba(0,0,0,.04);
-  --shadow-md: 0 4px 12px rgba(0,0,0,.08), 0 2px 4px rgba(0,0,0,.05);
-  --shadow-lg: 0 8px 24px rgba(0,0,0,.10), 0 4px 8px rgba(0,0,0,.06);
-
-  --font: 'DM Sans', -apple-system, BlinkMacSystemFont, sans-serif;
-  --mono: 'DM Mono', 'Fira Mono', monospace;
-}
-
-/* ── GLOBAL RESET ────────────────────────────────────────── */
-html, body, [data-testid="stAppViewContainer"] {
-  font-family: var(--font) !important;
-  background-color: var(--n50) !important;
-  color: var(--n800) !important;
-}
-.main .block-container {
-  padding: 2rem 2.5rem 4rem !important;
-  max-width: 1340px !important;
-}
-
-/* ── TOP HEADER BAR ──────────────────────────────────────── */
-[data-testid="stHeader"] {
-  background-color: var(--surface) !important;
-  border-bottom: 1px solid var(--n200) !important;
-  box-shadow: var(--shadow-sm) !important;
-}
-
-/* ── SIDEBAR ─────────────────────────────────────────────── */
-[data-testid="stSidebar"] {
-  background-color: var(--surface) !important;
-  border-right: 1px solid var(--n200) !important;
-}
-[data-testid="stSidebar"] > div:first-child {
-  padding: 1.5rem 1rem !important;
-}
-/* Sidebar text */
-[data-testid="stSidebar"] * {
-  color: var(--n800) !important;
-  font-family: var(--font) !important;
-}
-/* Sidebar radio label */
-[data-testid="stSidebar"] .stRadio label {
-  font-size: 0.9rem !important;
-  font-weight: 500 !important;
-  padding: 0.45rem 0.75rem !important;
-  border-radius: var(--radius-sm) !important;
-  cursor: pointer !important;
-  transition: background .15s;
-}
-[data-testid="stSidebar"] .stRadio label:hover {
-  background: var(--n100) !important;
-}
-/* Active radio */
-[data-testid="stSidebar"] [data-baseweb="radio"] [aria-checked="true"] + div {
-  color: var(--primary) !important;
-  font-weight: 600 !important;
-}
-
-/* ── TYPOGRAPHY ──────────────────────────────────────────── */
-h1, h2, h3, h4 {
-  font-family: var(--font) !important;
-  color: var(--n950) !important;
-  letter-spacing: -0.02em !important;
-}
-h1 { font-size: 1.75rem !important; font-weight: 700 !important; }
-h2 { font-size: 1.3rem  !important; font-weight: 650 !important; }
-h3 { font-size: 1.05rem !important; font-weight: 600 !important; }
-
-p, span, div, label, li {
-  font-family: var(--font) !important;
-  color: var(--n800) !important;
-  line-height: 1.6 !important;
-}
-
-/* ── INPUTS ──────────────────────────────────────────────── */
-.stNumberInput input,
-input[type="number"],
-input[type="text"] {
-  background-color: var(--surface) !important;
-  color: var(--n950) !important;
-  border: 1.5px solid var(--n200) !important;
-  border-radius: var(--radius-sm) !important;
-  font-family: var(--font) !important;
-  font-size: 0.9rem !important;
-  transition: border-color .2s, box-shadow .2s !important;
-}
-.stNumberInput input:focus,
-input[type="number"]:focus {
-  border-color: var(--primary) !important;
-  box-shadow: 0 0 0 3px rgba(27,79,216,.12) !important;
-  outline: none !important;
-}
-
-/* ── METRIC CARDS ────────────────────────────────────────── */
-[data-testid="stMetric"] {
-  background-color: var(--surface) !important;
-  border: 1px solid var(--n200) !important;
-  border-radius: var(--radius-md) !important;
-  padding: 1.1rem 1.25rem !important;
-  box-shadow: var(--shadow-sm) !important;
-  transition: box-shadow .2s, transform .2s !important;
-}
-[data-testid="stMetric"]:hover {
-  box-shadow: var(--shadow-md) !important;
-  transform: translateY(-1px) !important;
-}
-[data-testid="stMetricLabel"] > div {
-  font-size: 0.78rem !important;
-  font-weight: 600 !important;
-  text-transform: uppercase !important;
-  letter-spacing: .06em !important;
-  color: var(--n600) !important;
-}
-[data-testid="stMetricValue"] {
-  font-size: 1.75rem !important;
-  font-weight: 700 !important;
-  color: var(--primary) !important;
-  letter-spacing: -0.02em !important;
-}
-[data-testid="stMetricDelta"] {
-  font-size: 0.8rem !important;
-}
+# The stylesheet lives in static/concreteiq.css.  With static serving on
+# (.streamlit/config.toml) the browser fetches and caches it once and each
+# rerun only re-sends the <link>; Streamlit >= 1.56 serves it as text/css.
+# Without static serving it is inlined from a cached read.
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'concreteiq.css')
 
-/* ── BUTTONS ─────────────────────────────────────────────── */
-.stButton > button {
-  background-color: var(--primary) !important;
-  color: #FFFFFF !important;
-  border: none !important;
-  border-radius: var(--radius-sm) !important;
-  font-family: var(--font) !important;
-  font-weight: 600 !important;
-  font-size: 0.88rem !important;
-  padding: 0.55rem 1.2rem !important;
-  letter-spacing: .01em !important;
-  box-shadow: 0 1px 2px rgba(27,79,216,.3) !important;
-  transition: background .15s, box-shadow .15s, transform .1s !important;
-}
-.stButton > button:hover {
-  background-color: var(--primary-dark) !important;
-  box-shadow: 0 4px 12px rgba(27,79,216,.3) !important;
-  transform: translateY(-1px) !important;
-}
-.stButton > button:active {
-  transform: translateY(0) !important;
-}
-/* Secondary / ghost buttons (non-primary) */
-.stButton > button[kind="secondary"] {
-  background-color: var(--surface) !important;
-  color: var(--primary) !important;
-  border: 1.5px solid var(--primary) !important;
-  box-shadow: none !important;
-}
-.stButton > button[kind="secondary"]:hover {
-  background-color: var(--primary-light) !important;
-}
-
-/* ── TABS ────────────────────────────────────────────────── */
-[data-baseweb="tab-list"] {
-  background-color: var(--n100) !important;
-  border-radius: var(--radius-sm) !important;
-  padding: 3px !important;
-  gap: 2px !important;
-  border: none !important;
-}
-[data-baseweb="tab"] {
-  border-radius: calc(var(--radius-sm) - 1px) !important;
-  font-family: var(--font) !important;
-  font-size: 0.85rem !important;
-  font-weight: 500 !important;
-  color: var(--n600) !important;
-  padding: 0.4rem 1rem !important;
-  border: none !important;
-  transition: background .15s, color .15s !important;
-}
-[aria-selected="true"][data-baseweb="tab"] {
-  background-color: var(--surface) !important;
-  color: var(--primary) !important;
-  font-weight: 600 !important;
-  box-shadow: var(--shadow-sm) !important;
-}
-
-/* ── DATA TABLE ──────────────────────────────────────────── */
-[data-testid="stDataFrame"] {
-  border: 1px solid var(--n200) !important;
-  border-radius: var(--radius-md) !important;
-  overflow: hidden !important;
-}
-thead th {
-  background-color: var(--n100) !important;
-  color: var(--n800) !important;
-  font-weight: 600 !important;
-  font-size: 0.8rem !important;
-  text-transform: uppercase !important;
-  letter-spacing: .04em !important;
-}
-
-/* ── FILE UPLOADER ───────────────────────────────────────── */
-[data-testid="stFileUploader"] {
-  background-color: var(--surface) !important;
-  border: 2px dashed var(--n200) !important;
-  border-radius: var(--radius-md) !important;
-  transition: border-color .2s !important;
-}
-[data-testid="stFileUploader"]:hover {
-  border-color: var(--primary) !important;
-}
 
-/* ── SELECT / RADIO ──────────────────────────────────────── */
-[data-baseweb="radio"] [data-checked="true"] div {
-  background-color: var(--primary) !important;
-  border-color: var(--primary) !important;
-}
-
-/* ── ALERTS / CALLOUTS ───────────────────────────────────── */
-[data-testid="stAlert"] {
-  border-radius: var(--radius-md) !important;
-  font-family: var(--font) !important;
-}
-
-/* ── DIVIDER ─────────────────────────────────────────────── */
-hr {
-  border-color: var(--n200) !important;
-  margin: 1.5rem 0 !important;
-}
-
-/* ── CUSTOM COMPONENTS ───────────────────────────────────── */
-
-/* Page header hero */
-.page-hero {
-  background: linear-gradient(135deg, #1B4FD8 0%, #1338A8 60%, #0EA5A0 100%);
-  border-radius: var(--radius-lg);
-  padding: 2rem 2.5rem;
-  margin-bottom: 2rem;
-  box-shadow: 0 8px 32px rgba(27,79,216,.25);
-  position: relative;
-  overflow: hidden;
-}
-.page-hero::before {
-  content: '';
-  position: absolute;
-  top: -40px; right: -40px;
-  width: 220px; height: 220px;
-  border-radius: 50%;
-  background: rgba(255,255,255,.06);
-}
-.page-hero::after {
-  content: '';
-  position: absolute;
-  bottom: -60px; right: 80px;
-  width: 160px; height: 160px;
-  border-radius: 50%;
-  background: rgba(14,165,160,.2);
-}
-.page-hero h1 {
-  color: #FFFFFF !important;
-  font-size: 1.9rem !important;
-  margin: 0 0 .35rem !important;
-}
-.page-hero p {
-  color: rgba(255,255,255,.78) !important;
-  font-size: 1rem !important;
-  margin: 0 !important;
-}
-.page-hero .badge {
-  display: inline-block;
-  background: rgba(255,255,255,.15);
-  border: 1px solid rgba(255,255,255,.25);
-  border-radius: 100px;
-  padding: .2rem .75rem;
-  font-size: .75rem;
-  font-weight: 600;
-  color: white !important;
-  letter-spacing: .04em;
-  text-transform: uppercase;
-  margin-bottom: .75rem;
-}
-
-/* Section card */
-.section-card {
-  background: var(--surface);
-  border: 1px solid var(--n200);
-  border-radius: var(--radius-lg);
-  padding: 1.5rem;
-  margin-bottom: 1.25rem;
-  box-shadow: var(--shadow-sm);
-}
-.section-title {
-  font-size: .72rem;
-  font-weight: 700;
-  color: var(--n600) !important;
-  text-transform: uppercase;
-  letter-spacing: .08em;
-  margin-bottom: .75rem;
-  display: flex;
-  align-items: center;
-  gap: .4rem;
-}
-
-/* Info callout */
-.callout-info {
-  background: var(--primary-light);
-  border-left: 3px solid var(--primary);
-  border-radius: var(--radius-sm);
-  padding: .9rem 1.1rem;
-  color: var(--n800) !important;
-  font-size: .88rem;
-}
-.callout-warning {
-  background: #FFFBEB;
-  border-left: 3px solid var(--warning);
-  border-radius: var(--radius-sm);
-  padding: .9rem 1.1rem;
-  color: #78350F !important;
-  font-size: .88rem;
-}
-.callout-success {
-  background: #ECFDF5;
-  border-left: 3px solid var(--success);
-  border-radius: var(--radius-sm);
-  padding: .9rem 1.1rem;
-  color: #065F46 !important;
-  font-size: .88rem;
-}
-.callout-error {
-  background: #FEF2F2;
-  border-left: 3px solid var(--error);
-  border-radius: var(--radius-sm);
-  padding: .9rem 1.1rem;
-  color: #7F1D1D !important;
-  font-size: .88rem;
-}
-
-/* Result card */
-.result-hero {
-  background: linear-gradient(135deg, #1B4FD8 0%, #0EA5A0 100%);
-  border-radius: var(--radius-lg);
-  padding: 2rem;
-  text-align: center;
-  color: white;
-  box-shadow: var(--shadow-lg);
-  margin: 1.5rem 0;
-  position: relative;
-  overflow: hidden;
-}
-.result-hero::before {
-  content: '';
-  position: absolute;
-  top: -30px; left: -30px;
-  width: 160px; height: 160px;
-  border-radius: 50%;
-  background: rgba(255,255,255,.06);
-}
-.result-hero .result-label {
-  font-size: .78rem;
-  font-weight: 700;
-  text-transform: uppercase;
-  letter-spacing: .1em;
-  color: rgba(255,255,255,.7) !important;
-  margin-bottom: .5rem;
-}
-.result-hero .result-value {
-  font-size: 3.5rem;
-  font-weight: 700;
-  color: white !important;
-  line-height: 1;
-  letter-spacing: -0.03em;
-}
-.result-hero .result-unit {
-  font-size: 1.1rem;
-  color: rgba(255,255,255,.8) !important;
-  margin-left: .25rem;
-}
-.result-hero .result-category {
-  font-size: .95rem;
-  color: rgba(255,255,255,.85) !important;
-  margin-top: .5rem;
-}
-
-/* KPI stat pill in sidebar */
-.stat-pill {
-  background: var(--n100);
-  border-radius: 8px;
-  padding: .6rem .9rem;
-  margin-bottom: .5rem;
-  display: flex;
-  justify-content: space-between;
-  align-items: center;
-}
-.stat-pill .label { font-size: .78rem; color: var(--n600) !important; font-weight: 500; }
-.stat-pill .value { font-size: .88rem; color: var(--n950) !important; font-weight: 700; font-family: var(--mono); }
-
-/* Performance metric card */
-.perf-card {
-  border-radius: var(--radius-md);
-  padding: 1.5rem;
-  text-align: center;
-  color: white;
-  box-shadow: var(--shadow-md);
-}
-.perf-card .metric-label {
-  font-size: .72rem;
-  font-weight: 700;
-  text-transform: uppercase;
-  letter-spacing: .08em;
-  color: rgba(255,255,255,.7) !important;
-  margin-bottom: .4rem;
-}
-.perf-card .metric-value {
-  font-size: 2.4rem;
-  font-weight: 700;
-  color: white !important;
-  letter-spacing: -0.03em;
-  line-height: 1;
-}
-.perf-card .metric-sub {
-  font-size: .75rem;
-  color: rgba(255,255,255,.65) !important;
-  margin-top: .35rem;
-}
-
-/* Grade badge */
-.grade-badge {
-  display: inline-flex;
-  align-items: center;
-  gap: .3rem;
-  padding: .25rem .7rem;
-  border-radius: 100px;
-  font-size: .78rem;
-  font-weight: 700;
-  letter-spacing: .02em;
-}
-.grade-low    { background: #FEE2E2; color: #991B1B !important; }
-.grade-medium { background: #FEF9C3; color: #854D0E !important; }
-.grade-high   { background: #D1FAE5; color: #065F46 !important; }
-.grade-ultra  { background: var(--primary-light); color: var(--primary) !important; }
-
-/* Sidebar logo */
-.sidebar-brand {
-  display: flex;
-  align-items: center;
-  gap: .6rem;
-  padding: .25rem 0 1.25rem;
-  border-bottom: 1px solid var(--n200);
-  margin-bottom: 1.25rem;
-}
-.sidebar-brand .logo-icon {
-  width: 34px; height: 34px;
-  background: var(--primary);
-  border-radius: 8px;
-  display: flex; align-items: center; justify-content: center;
-  font-size: 1.1rem;
-}
-.sidebar-brand .logo-text {
-  font-size: .95rem !important;
-  font-weight: 700 !important;
-  color: var(--n950) !important;
-  line-height: 1.2;
-}
-.sidebar-brand .logo-sub {
-  font-size: .7rem !important;
-  color: var(--n400) !important;
-}
-
-/* Menu item */
-.nav-item {
-  display: flex;
-  align-items: center;
-  gap: .6rem;
-  padding: .55rem .8rem;
-  border-radius: var(--radius-sm);
-  font-size: .88rem;
-  font-weight: 500;
-  color: var(--n600) !important;
-  cursor: pointer;
-  margin-bottom: .2rem;
-  transition: background .15s, color .15s;
-}
-.nav-item:hover { background: var(--n100); color: var(--n950) !important; }
-.nav-item.active { background: var(--primary-light); color: var(--primary) !important; font-weight: 600; }
-
-/* Tag chips */
-.chip {
-  display: inline-block;
-  background: var(--n100);
-  border: 1px solid var(--n200);
-  color: var(--n600) !important;
-  border-radius: 100px;
-  font-size: .73rem;
-  font-weight: 600;
-  padding: .15rem .6rem;
-  letter-spacing: .02em;
-}
-.chip-primary {
-  background: var(--primary-light);
-  border-color: #C7D7FF;
-  color: var(--primary) !important;
-}
-
-/* Section heading with line */
-.section-heading {
-  display: flex;
-  align-items: center;
-  gap: .75rem;
-  margin: 1.5rem 0 1rem;
-}
-.section-heading .sh-icon {
-  width: 32px; height: 32px;
-  background: var(--primary-light);
-  border-radius: 8px;
-  display: flex; align-items: center; justify-content: center;
-  font-size: .95rem;
-}
-.section-heading h3 {
-  margin: 0 !important;
-  font-size: 1rem !important;
-  color: var(--n950) !important;
-}
+@st.cache_resource
+def _inline_css():
+    with open(CSS_PATH, encoding='utf-8') as fh:
+        return f"<style>\n{fh.read()}</style>"
 
-/* Footer */
-.footer {
-  text-align: center;
-  padding: 2rem 0 .5rem;
-  border-top: 1px solid var(--n200);
-  margin-top: 3rem;
-}
-.footer p { font-size: .8rem; color: var(--n400) !important; margin: .15rem 0 !important; }
-.footer strong { color: var(--n600) !important; }
-
-/* Scrollbar */
-::-webkit-scrollbar { width: 6px; }
-::-webkit-scrollbar-track { background: var(--n50); }
-::-webkit-scrollbar-thumb { background: var(--n200); border-radius: 3px; }
-::-webkit-scrollbar-thumb:hover { background: var(--n400); }
-
-/* Code block */
-code, pre {
-  font-family: var(--mono) !important;
-  font-size: .82rem !important;
-  background: var(--n100) !important;
-  border: 1px solid var(--n200) !important;
-  border-radius: var(--radius-sm) !important;
-}
 
-/* Remove Streamlit default top padding */
-.stApp > header { visibility: hidden; }
-
-/* Download button alignment */
-.stDownloadButton > button {
-  background-color: var(--surface) !important;
-  color: var(--primary) !important;
-  border: 1.5px solid var(--primary) !important;
-  box-shadow: none !important;
-}
-.stDownloadButton > button:hover {
-  background-color: var(--primary-light) !important;
-}
-</style>
-"""
-
-st.markdown(CSS, unsafe_allow_html=True)
+if st.get_option('server.enableStaticServing'):
+    st.markdown('<link rel="stylesheet" href="app/static/concreteiq.css">', unsafe_allow_html=True)
+else:
+    st.markdown(_inline_css(), unsafe_allow_html=True)
 
 # ============================================================
 #  PLOTLY THEME
@@ -663,16 +120,115 @@ def _theme(fig, **extra):
     return fig
 
 
+def _sweep_chart(result, base, scheme):
+    """Response curve (one parameter) or contour map (two) of a ``SweepResult``,
+    with the current mix marked."""
+    import plotly.graph_objects as go
+
+    here = [base[INPUT_COLUMNS.index(p)] for p in result.params]
+    if len(result.params) == 1:
+        x, y = result.axes[0], result.strength
+        fig = go.Figure(go.Scatter(x=x, y=y, mode='lines', line=dict(color="#1B4FD8", width=2.5),
+                                   name='Predicted',
+                                   hovertemplate='%{x:,.1f}<br>%{y:.1f} MPa<extra></extra>'))
+        if result.out_of_range is not None and result.out_of_range.any():
+            fig.add_trace(go.Scatter(x=x, y=np.where(result.out_of_range, y, np.nan), mode='lines',
+                                     line=dict(color="#D97706", width=2.5, dash='dot'),
+                                     name='Outside training range', hoverinfo='skip'))
+        for t, code in zip(scheme.thresholds, scheme.codes[1:]):
+            fig.add_hline(y=t, line_dash='dot', line_color='#9CA3AF', annotation_text=code,
+                          annotation_position='top left', annotation_font_size=10)
+        fig.add_vline(x=here[0], line_color="#DC2626", annotation_text="current",
+                      annotation_font_size=10)
+        _theme(fig, title=f"Strength vs {result.params[0]}", showlegend=bool(len(fig.data) > 1))
+        fig.update_xaxes(title_text=result.params[0])
+        fig.update_yaxes(title_text=PRED_COL)
+        return fig
+
+    # First axis on y, second on x: z is indexed [y, x]
+    fig = go.Figure(go.Contour(
+        x=result.axes[1], y=result.axes[0], z=result.strength, colorscale='Blues',
+        contours=dict(coloring='heatmap', showlabels=True, labelfont=dict(size=10, color='#fff')),
+        colorbar_title='MPa',
+        hovertemplate=(f'{result.params[1]} %{{x:,.1f}}<br>{result.params[0]} %{{y:,.1f}}'
+                       '<br>%{z:.1f} MPa<extra></extra>')))
+    fig.add_trace(go.Scatter(x=[here[1]], y=[here[0]], mode='markers', name='current',
+                             marker=dict(color="#DC2626", size=11, symbol='x')))
+    _theme(fig, title=f"Strength over {result.params[0]} × {result.params[1]}", showlegend=False)
+    fig.update_xaxes(title_text=result.params[1])
+    fig.update_yaxes(title_text=result.params[0])
+    return fig
+
+
+def _curve_chart(engine, features, scheme):
+    """Predicted strength of one mix over 1–365 days, the standard test ages
+    labelled and the entered age marked."""
+    import plotly.graph_objects as go
+
+    days = np.arange(1, 366)
+    curve = engine.predict_curve(features, days)
+    marks = np.asarray(CURVE_AGES)
+    fig = go.Figure(go.Scatter(x=days, y=curve, mode='lines', line=dict(color="#1B4FD8", width=2.5),
+                               name='Predicted', hovertemplate='%{x} days<br>%{y:.1f} MPa<extra></extra>'))
+    fig.add_trace(go.Scatter(x=marks, y=curve[marks - 1], mode='markers+text', name='Test ages',
+                             marker=dict(color="#0EA5A0", size=8), text=[f"{v:.1f}" for v in curve[marks - 1]],
+                             textposition='top left', textfont_size=10, hoverinfo='skip'))
+    for t, code in zip(scheme.thresholds, scheme.codes[1:]):
+        fig.add_hline(y=t, line_dash='dot', line_color='#9CA3AF', annotation_text=code,
+                      annotation_position='top left', annotation_font_size=10)
+    fig.add_vline(x=features[-1], line_color="#DC2626", annotation_text="current",
+                  annotation_font_size=10)
+    _theme(fig, title="Strength Development", showlegend=False)
+    fig.update_xaxes(title_text="Curing age (days, log scale)", type='log',
+                     tickvals=list(marks) + [180, 365])
+    fig.update_yaxes(title_text=PRED_COL)
+    return fig
+
+
+def _strength_age_chart(df, shown, scheme, mode):
+    """Strength-vs-Age figure for ``mode`` from ``scatter_mode``.
+
+    Point modes plot the sampled rows ``shown`` (SVG or Scattergl); the
+    density mode bins every row of ``df`` and marks the grade boundaries.
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    y = 'Predicted Strength (MPa)'
+    if mode == 'density':
+        xe, ye, counts = density_grid(df['Age'], df[y])
+        fig = go.Figure(go.Heatmap(
+            x=(xe[:-1] + xe[1:]) / 2, y=(ye[:-1] + ye[1:]) / 2,
+            z=np.where(counts > 0, counts, np.nan), colorscale='Blues', colorbar_title='Rows',
+            hovertemplate='Age %{x:.0f} d<br>Strength %{y:.1f} MPa<br>%{z:,.0f} rows<extra></extra>'))
+        for t, code in zip(scheme.thresholds, scheme.codes[1:]):
+            fig.add_hline(y=t, line_dash='dot', line_color='#9CA3AF', annotation_text=code,
+                          annotation_position='top left', annotation_font_size=10)
+        return _theme(fig, title="Strength vs Curing Age (density)",
+                      xaxis_title='Age', yaxis_title=y)
+    fig = px.scatter(shown, x='Age', y=y,
+                     color='Grade', size='Cement',
+                     title="Strength vs Curing Age",
+                     hover_data=['Cement','Water','W/C Ratio'],
+                     category_orders={'Grade': scheme.codes},
+                     color_discrete_sequence=COLOR_SEQUENCE,
+                     render_mode='webgl' if mode == 'webgl' else 'svg')
+    return _theme(fig)
+
+
 # ============================================================
 #  MODEL LOADING
 # ============================================================
 @st.cache_resource
-def load_model():
+def load_registry():
+    # Every model file is watched; a changed model is validated, then swapped in.
+    # The default model is always loaded, the others on first use (LRU-capped)
+    paths = {os.path.splitext(os.path.basename(MODEL_PATH))[0]: MODEL_PATH}
+    if MODEL_DIR:
+        for name, path in discover_models(MODEL_DIR).items():
+            paths.setdefault(name, path)
     try:
-        model_data = joblib.load('concrete_strength_model.pkl')
-        if isinstance(model_data, dict):
-            return model_data
-        return {'model': model_data}
+        return ModelRegistry(paths)
     except FileNotFoundError:
         st.error("❌ Model file not found — place `concrete_strength_model.pkl` in the working directory.")
         return None
@@ -681,87 +237,335 @@ def load_model():
         return None
 
 
+@st.cache_resource
+def load_prediction_cache():
+    # Shared by every session; stale entries are dropped when the model is swapped
+    # Bound to the default model; other models bypass it (see PredictionCache.predict)
+    slot = load_registry().get()
+    try:
+        cache = PredictionCache(CACHE_PATH, fingerprint=slot.current.fingerprint)
+    except Exception as e:
+        st.warning(f"Prediction cache disabled: {e}")
+        return None
+    slot.on_swap(lambda new, old: cache.rebind(new.fingerprint))
+    return cache
+
+
+@st.cache_resource
+def load_batcher(name):
+    # Single-mix predictions for one model from every session (and the API) are
+    # scored together, each batch with the version current when it is dispatched
+    registry = load_registry()
+    return MicroBatcher(lambda X: registry.get(name).current.engine.predict(X))
+
+
+@st.cache_resource
+def load_job_store():
+    # Scored uploads shared by every session and kept across reruns
+    return JobStore()
+
+
+@st.cache_resource
+def load_job_queue():
+    # Streamed uploads run here, outside the script run, shared by every session
+    return JobQueue()
+
+
+@st.cache_resource
+def start_api(port):
+    # One API server per dashboard process, following the same model slot
+    from concreteiq.api import serve_in_thread
+    try:
+        registry = load_registry()
+        return serve_in_thread(registry.get(), port=port, batcher=load_batcher(registry.default))
+    except OSError as e:
+        st.warning(f"Prediction API not started: {e}")
+        return None
+
+
+# ============================================================
+#  MODEL PERFORMANCE ARTIFACTS
+# ============================================================
+@st.cache_data(show_spinner=False)
+def model_performance_artifacts(fingerprint, _model_data):
+    """HTML and figure spec for the static part of Model Performance.
+
+    Depends only on the model, so it is keyed by the model fingerprint and
+    shared by every session; reruns and page switches reuse it.
+    """
+    import plotly.graph_objects as go
+
+    model_data = _model_data
+
+    # Metrics
+    metrics = model_data.get('metrics', {}) if isinstance(model_data, dict) else {}
+    r2   = metrics.get('r2_score', metrics.get('r2', 0.85))
+    rmse = metrics.get('rmse', 10.24)
+    mae  = metrics.get('mae', 7.82)
+
+    cards = [f"""
+        <div class="perf-card" style="background:linear-gradient(135deg,#1B4FD8,#1338A8);">
+          <div class="metric-label">R² Score</div>
+          <div class="metric-value">{r2:.3f}</div>
+          <div class="metric-sub">Coefficient of Determination</div>
+          <div style="background:rgba(255,255,255,.2);height:6px;border-radius:3px;margin-top:14px;">
+            <div style="background:white;height:6px;border-radius:3px;width:{int(r2*100)}%;"></div>
+          </div>
+        </div>
+        """, f"""
+        <div class="perf-card" style="background:linear-gradient(135deg,#059669,#047857);">
+          <div class="metric-label">RMSE</div>
+          <div class="metric-value">{rmse:.2f}</div>
+          <div class="metric-sub">Root Mean Squared Error (MPa)</div>
+        </div>
+        """, f"""
+        <div class="perf-card" style="background:linear-gradient(135deg,#0EA5A0,#0D7A76);">
+          <div class="metric-label">MAE</div>
+          <div class="metric-value">{mae:.2f}</div>
+          <div class="metric-sub">Mean Absolute Error (MPa)</div>
+        </div>
+        """]
+
+    mobj  = model_data.get('model') if isinstance(model_data, dict) else model_data
+    fnames= model_data.get('feature_names', []) if isinstance(model_data, dict) else []
+    mtype = model_data.get('model_type') or (mobj.__class__.__name__ if mobj else "Unknown")
+
+    config = f"""
+        <div class="section-card">
+          <div style="display:grid;grid-template-columns:1fr 1fr;gap:.75rem;">
+            <div><div class="section-title">Algorithm</div><div style="font-weight:700;color:var(--n950);">{mtype}</div></div>
+            <div><div class="section-title">Method</div><div style="font-weight:700;color:var(--n950);">OLS Regression</div></div>
+            <div><div class="section-title">Input Features</div><div style="font-weight:700;color:var(--n950);">8 parameters</div></div>
+            <div><div class="section-title">Output</div><div style="font-weight:700;color:var(--n950);">MPa (comp. strength)</div></div>
+          </div>
+        </div>
+        """
+
+    params = [
+        ("Cement",             "kg/m³","Primary binder"),
+        ("Blast Furnace Slag", "kg/m³","SCM replacement"),
+        ("Fly Ash",            "kg/m³","Pozzolanic additive"),
+        ("Water",              "kg/m³","W/C ratio driver"),
+        ("Superplasticizer",   "kg/m³","Workability enhancer"),
+        ("Coarse Aggregate",   "kg/m³","Skeletal structure"),
+        ("Fine Aggregate",     "kg/m³","Void filler"),
+        ("Age",                "days", "Curing maturity"),
+    ]
+    params_html = "".join(f"""
+            <div style="display:flex;align-items:center;gap:.75rem;padding:.5rem 0;border-bottom:1px solid var(--n200);">
+              <span style="background:var(--primary-light);color:var(--primary);width:22px;height:22px;
+                           border-radius:50%;display:inline-flex;align-items:center;justify-content:center;
+                           font-size:.7rem;font-weight:700;flex-shrink:0;">{i}</span>
+              <div>
+                <div style="font-weight:600;font-size:.88rem;color:var(--n950);">{name}
+                  <span class="chip chip-primary" style="margin-left:.35rem;">{unit}</span>
+                </div>
+                <div style="font-size:.75rem;color:var(--n600);">{desc}</div>
+              </div>
+            </div>
+            """ for i,(name,unit,desc) in enumerate(params,1))
+
+    if hasattr(mobj,'coef_') and len(fnames) > 0:
+        coefs = mobj.coef_[:8]
+        feat_display = fnames[:8]
+    else:
+        coefs = np.array([0.117,0.104,0.087,-0.148,0.277,0.010,0.010,0.114])
+        feat_display = ['Cement','Slag','Fly Ash','Water','Superplasticizer','Coarse Agg','Fine Agg','Age']
+
+    # Sorted by magnitude; the colour scale is symmetric around zero
+    order = np.argsort(np.abs(coefs), kind='stable')
+    coefs = np.asarray(coefs)[order]
+    feats = [feat_display[i] for i in order]
+    bound = float(np.abs(coefs).max())
+
+    fig_fi = go.Figure(go.Bar(
+        x=coefs, y=feats, orientation='h',
+        marker=dict(
+            color=coefs,
+            colorscale=[[0,"#DC2626"],[0.5,"#F3F4F6"],[1,"#1B4FD8"]],
+            cmin=-bound, cmax=bound,
+            line=dict(width=0)
+        ),
+        text=[f"{c:+.3f}" for c in coefs],
+        textposition='outside',
+        textfont=dict(size=10, family="DM Mono", color="#1E2633"),
+    ))
+    _theme(fig_fi, height=340)
+    fig_fi.update_xaxes(title_text="Coefficient", gridcolor="#F3F4F6",
+                        zeroline=True, zerolinecolor="#E5E7EB", zerolinewidth=1.5)
+    fig_fi.update_yaxes(title_text="", gridcolor="#F3F4F6")
+
+    # Serialised once; st.plotly_chart takes the spec dict as is
+    return {'cards': cards, 'config': config, 'params': params_html,
+            'fig_fi': json.loads(fig_fi.to_json())}
+
+
 # ============================================================
 #  PREDICTION HELPERS
 # ============================================================
-def predict_strength(model_data, features):
+def predict_strength(batcher, features, cache=None, fingerprint=None):
     try:
-        model   = model_data.get('model') if isinstance(model_data, dict) else model_data
-        scaler  = model_data.get('scaler') if isinstance(model_data, dict) else None
-        f_names = model_data.get('feature_names', []) if isinstance(model_data, dict) else []
-
-        cement, slag, flyash, water, sp, coarse, fine, age = features
-        wc = water / cement if cement > 0 else 0
-        binder = cement + slag + flyash
-        log_age = np.log1p(age)
-
-        if len(f_names) == 11 and 'Semen' in f_names:
-            df = pd.DataFrame({
-                'Semen':[cement],'Slag_Tanur_Tinggi':[slag],'Abu_Terbang':[flyash],
-                'Air':[water],'Superplasticizer':[sp],'Agregat_Kasar':[coarse],
-                'Agregat_Halus':[fine],'Umur_Hari':[age],
-                'Rasio_Air_Semen':[wc],'Total_Bahan_Pengikat':[binder],'Log_Umur_Hari':[log_age]
-            })
-            arr = scaler.transform(df) if scaler else df.values
-        else:
-            arr = np.array([cement,slag,flyash,water,sp,coarse,fine,age,wc,binder,log_age]).reshape(1,-1)
-            if scaler: arr = scaler.transform(arr)
-
-        return max(0, float(model.predict(arr)[0]))
+        if cache is not None:
+            return cache.predict_one(features, batcher.predict, fingerprint)
+        return batcher.predict_one(features)
     except Exception as e:
         st.error(f"Prediction error: {e}")
         return None
 
 
-def predict_batch(model_data, df):
+def compare_engines(names):
+    """``{name: engine}`` for the selected model plus ``names``, or ``None``."""
+    if not names:
+        return None
+    engines = {model_name: engine}
+    for name in names:
+        engines[name] = registry.get(name).current.engine
+    return engines
+
+
+def predict_batch(engine, df, cache=None):
     try:
-        model  = model_data.get('model') if isinstance(model_data, dict) else model_data
-        scaler = model_data.get('scaler') if isinstance(model_data, dict) else None
-
-        dm = pd.DataFrame()
-        dm['Semen']           = df['Cement']
-        dm['Slag_Tanur_Tinggi']= df['Blast Furnace Slag']
-        dm['Abu_Terbang']     = df['Fly Ash']
-        dm['Air']             = df['Water']
-        dm['Superplasticizer']= df['Superplasticizer']
-        dm['Agregat_Kasar']   = df['Coarse Aggregate']
-        dm['Agregat_Halus']   = df['Fine Aggregate']
-        dm['Umur_Hari']       = df['Age']
-        dm['Rasio_Air_Semen'] = dm['Air'] / dm['Semen']
-        dm['Total_Bahan_Pengikat'] = dm['Semen'] + dm['Slag_Tanur_Tinggi'] + dm['Abu_Terbang']
-        dm['Log_Umur_Hari']   = np.log1p(dm['Umur_Hari'])
-
-        arr = scaler.transform(dm) if scaler else dm.values
-        return np.maximum(0, model.predict(arr))
+        # A folded linear model scores a batch faster than the cache can look it up
+        if cache is not None and not engine.is_linear:
+            return cache.predict(df[INPUT_COLUMNS].to_numpy(dtype=np.float64), engine.predict,
+                                 fingerprint=engine.fingerprint)
+        return engine.predict_columns(df)
     except Exception as e:
         st.error(f"Batch prediction error: {e}")
         return None
 
 
-def get_concrete_grade(s):
-    if s < 20:
-        return "K-175", "Low Strength",   "Non-structural works",         "grade-low",   "🔴"
-    elif s < 30:
-        return "K-250", "Medium Strength", "Light structural elements",   "grade-medium","🟡"
-    elif s < 40:
-        return "K-300", "High Strength",   "Standard building structures","grade-high",  "🟢"
-    else:
-        return "K-400+","Very High Strength","Special / heavy structures", "grade-ultra", "🔵"
+def upload_hash(uploaded):
+    """Content hash of an upload, computed once per uploaded file."""
+    known = st.session_state.get('_upload_hash')
+    if known is None or known[0] != uploaded.file_id:
+        known = (uploaded.file_id, content_hash(uploaded))
+        st.session_state._upload_hash = known
+    return known[1]
+
+
+def file_bytes(path):
+    with open(path, 'rb') as fh:
+        return fh.read()
+
+
+@st.fragment(run_every=1.0)
+def job_progress(job_id):
+    """Progress bar for a queued job, polled every second until it finishes."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return
+    if job.finished:
+        st.rerun()
+    eta = f"{job.eta:,.0f}s" if job.eta is not None else "—"
+    status = "Waiting for a worker…" if job.started_at is None else f"Scored {job.rows:,} rows"
+    st.progress(job.fraction, text=f"{status} · {job.throughput:,.0f} rows/s · ETA {eta}")
+    if st.button("✖ Cancel", key=f'_cancel_{job_id}'):
+        job_queue.cancel(job_id)
+        st.rerun()
+
+
+def show_jobs(owner):
+    """The user's background jobs, including finished ones from earlier sessions."""
+    jobs = job_queue.jobs(owner)
+    if not jobs:
+        return
+    with st.expander(f"🗂️ Background Jobs ({len(jobs)})"):
+        for job in jobs:
+            c1, c2, c3 = st.columns([3, 2, 1])
+            c1.markdown(f"**{html.escape(job.name or job.id)}** · `{job.id}`")
+            c2.caption(f"{job.status} · {job.rows:,} rows · {job.throughput:,.0f} rows/s"
+                       + (f" · {job.error}" if job.error else ""))
+            if job.status == DONE:
+                c3.download_button("💾", lambda p=job.path: file_bytes(p),
+                                   "prediction_results" + FILE_SUFFIX[job.out_fmt],
+                                   MIME_TYPES[job.out_fmt], key=f'_dl_{job.id}')
+            elif not job.finished and c3.button("✖", key=f'_cancel_list_{job.id}'):
+                job_queue.cancel(job.id)
+                st.rerun()
+
+
+def show_validation(checks):
+    """Input Validation section for a ``ValidationSummary``."""
+    import pandas as pd
+
+    st.markdown("""
+    <div class="section-heading"><div class="sh-icon">🩺</div><h3>Input Validation</h3></div>
+    """, unsafe_allow_html=True)
+    v1, v2, v3 = st.columns(3)
+    v1.metric("Rows with Errors",          f"{checks.error_rows:,}")
+    v2.metric("Rows with Warnings",        f"{checks.warning_rows:,}")
+    v3.metric("Outside Training Range",    f"{checks.ood_rows:,}")
+    if not checks.flagged_rows:
+        st.markdown('<div class="callout-info">✅ All rows pass the input checks.</div>', unsafe_allow_html=True)
+        return
+    st.dataframe(pd.DataFrame(checks.items(), columns=['Severity', 'Check', 'Rows']),
+                 hide_index=True, use_container_width=True)
+    if checks.error_rows:
+        st.markdown(f'<div class="callout-warning">⚠️ <strong>{checks.error_rows:,}</strong> rows have '
+                    f'invalid inputs; their predictions are not reliable. See the '
+                    f'<em>Validation Flags</em> column.</div>', unsafe_allow_html=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def mix_design(fingerprint, _engine, target, age, costs, bounds, wc_max):
+    """Pareto set from ``optimize_mix``; keyed by the model fingerprint and
+    the constraints, so reruns reuse it."""
+    return optimize_mix(_engine, target, age, costs, bounds, wc_max)
 
 
 # ============================================================
 #  SESSION STATE
 # ============================================================
+def session_id():
+    """Random id of this browser session, stable across its reruns."""
+    if '_session_id' not in st.session_state:
+        st.session_state._session_id = uuid.uuid4().hex
+    return st.session_state._session_id
+
+
+def current_user():
+    """Owner of this session's jobs and history: the login email, else the
+    session, so visitors who are not logged in never share a queue or files."""
+    return st.user.get('email') or f"session-{session_id()}"
+
+
+def history_path():
+    if not HISTORY_DIR:
+        return None
+    return os.path.join(HISTORY_DIR, re.sub(r'[^\w.@-]', '_', current_user()) + '.arrow')
+
+
 if 'history' not in st.session_state:
-    st.session_state.history = []
+    st.session_state.history = PredictionHistory(path=history_path())
 
 
 # ============================================================
 #  LOAD MODEL
 # ============================================================
-model_data = load_model()
-if model_data is None:
+registry = load_registry()
+if registry is None:
     st.stop()
+# The sidebar selector below owns this key; read it first so the whole run uses one model
+if st.session_state.get('_model') not in registry.paths:
+    st.session_state._model = registry.default
+model_name = st.session_state._model
+try:
+    slot = registry.get(model_name)
+except Exception as e:
+    st.error(f"❌ Error loading model '{model_name}': {e}")
+    model_name = st.session_state._model = registry.default
+    slot = registry.get()
+# Read once: this run keeps scoring with this version even if a reload lands
+model_version = slot.current
+engine = model_version.engine
+model_data = model_version.model_data
+prediction_cache = load_prediction_cache()
+batcher = load_batcher(model_name)
+job_store = load_job_store()
+job_queue = load_job_queue()
+if API_PORT:
+    start_api(int(API_PORT))
 
 
 # ============================================================
@@ -782,7 +586,8 @@ with st.sidebar:
     # Navigation
     st.markdown('<div class="section-title">Navigation</div>', unsafe_allow_html=True)
     menu = st.radio(
-        "Navigation Menu", ["📝  Manual Input", "📁  Batch CSV Upload", "📊  Model Performance"],
+        "Navigation Menu", ["📝  Manual Input", "📁  Batch CSV Upload", "🎯  Mix Optimizer",
+                            "📊  Model Performance"],
         label_visibility="collapsed"
     )
 
@@ -790,11 +595,14 @@ with st.sidebar:
 
     # Model info
     st.markdown('<div class="section-title">Model Info</div>', unsafe_allow_html=True)
+    if len(registry.paths) > 1:
+        st.selectbox("Model", registry.names, key='_model', label_visibility="collapsed",
+                     help=f"Up to {registry.capacity} models are kept in memory")
     if isinstance(model_data, dict):
         m = model_data.get('model')
         fn = model_data.get('feature_names', [])
         metrics = model_data.get('metrics', {})
-        mtype = m.__class__.__name__ if m else "N/A"
+        mtype = model_data.get('model_type') or (m.__class__.__name__ if m else "N/A")
         r2 = metrics.get('r2', metrics.get('r2_score', '—'))
     else:
         mtype, fn, r2 = "Unknown", [], "—"
@@ -803,19 +611,30 @@ with st.sidebar:
     <div class="stat-pill"><span class="label">Algorithm</span><span class="value">{mtype[:18]}</span></div>
     <div class="stat-pill"><span class="label">Features</span><span class="value">{len(fn) if fn else 11}</span></div>
     <div class="stat-pill"><span class="label">R² Score</span><span class="value">{r2 if isinstance(r2, str) else f'{r2:.3f}'}</span></div>
-    <div class="stat-pill"><span class="label">Total Predictions</span><span class="value">{len(st.session_state.history)}</span></div>
+    <div class="stat-pill"><span class="label">Model Version</span><span class="value">{html.escape(model_version.label)}</span></div>
+    <div class="stat-pill"><span class="label">Loaded</span><span class="value">{datetime.fromtimestamp(model_version.loaded_at):%H:%M:%S} · {model_version.load_seconds * 1e3:.0f} ms</span></div>
+    <div class="stat-pill"><span class="label">Total Predictions</span><span class="value">{st.session_state.history.predictions:,}</span></div>
     """, unsafe_allow_html=True)
+    if slot.last_error:
+        st.warning(f"Model reload rejected, still serving {model_version.label}: {slot.last_error}")
+    # Filled at the end of the run so this run's lookups are counted
+    cache_pills = st.empty()
 
     st.markdown("<hr>", unsafe_allow_html=True)
-    st.markdown("""
-    <div class="section-title">Concrete Grade Scale</div>
+    st.markdown('<div class="section-title">Concrete Grade Scale</div>', unsafe_allow_html=True)
+    keys = scheme_keys()
+    scheme_key = st.selectbox("Grade scheme", keys, index=keys.index(default_scheme_key()),
+                              format_func=lambda k: get_scheme(k).name,
+                              label_visibility="collapsed")
+    scheme = get_scheme(scheme_key)
+    legend = "<br>".join(
+        f'<span class="grade-badge {css}">{html.escape(code)}</span> &nbsp; {html.escape(scheme.range_text(i))}'
+        for i, (code, _, _, css, _) in enumerate(scheme.grades))
+    st.markdown(f'''
     <div style="font-size:.8rem; line-height:2;">
-      <span class="grade-badge grade-low">K-175</span> &nbsp; &lt; 20 MPa<br>
-      <span class="grade-badge grade-medium">K-250</span> &nbsp; 20–30 MPa<br>
-      <span class="grade-badge grade-high">K-300</span> &nbsp; 30–40 MPa<br>
-      <span class="grade-badge grade-ultra">K-400+</span> &nbsp; &gt; 40 MPa
+      {legend}
     </div>
-    """, unsafe_allow_html=True)
+    ''', unsafe_allow_html=True)
 
 
 # ============================================================
@@ -824,6 +643,7 @@ with st.sidebar:
 PAGE_META = {
     "📝  Manual Input":       ("📝 Manual Input",         "Enter mix parameters to predict compressive strength",      "Prediction Tool"),
     "📁  Batch CSV Upload":   ("📁 Batch CSV Upload",      "Upload a CSV to predict multiple concrete mixes at once",   "Batch Processing"),
+    "🎯  Mix Optimizer":      ("🎯 Mix Optimizer",         "Find the cheapest mixes that reach a target strength grade", "Mix Design"),
     "📊  Model Performance":  ("📊 Model Performance",     "Evaluate model accuracy, feature impact, and history",      "Analytics"),
 }
 title, subtitle, badge = PAGE_META.get(menu, ("Dashboard","",""))
@@ -840,6 +660,10 @@ st.markdown(f"""
 #  MENU 1 — MANUAL INPUT
 # ============================================================
 if menu == "📝  Manual Input":
+    # What-if sweep slider limits: the same as the input fields'
+    SWEEP_LIMITS = {'Cement': (0, 600), 'Blast Furnace Slag': (0, 400), 'Fly Ash': (0, 250),
+                    'Water': (0, 300), 'Superplasticizer': (0, 35), 'Coarse Aggregate': (0, 1200),
+                    'Fine Aggregate': (0, 1100), 'Age': (1, 365)}
 
     st.markdown("""
     <div class="callout-info">
@@ -908,32 +732,26 @@ if menu == "📝  Manual Input":
 
     # ── Prediction result ────────────────────────────────────
     if predict_btn:
-        ERRORS = []
-        if cement == 0 or water == 0 or coarse == 0 or fine == 0:
-            ERRORS.append("Cement, Water, Coarse Aggregate, and Fine Aggregate are required.")
-        if cement > 0 and cement < 100:
-            ERRORS.append("Cement too low — expected 100–540 kg/m³.")
-        if water > 0 and water < 100:
-            ERRORS.append("Water too low — expected 120–250 kg/m³.")
-        if coarse > 0 and coarse < 500:
-            ERRORS.append("Coarse Aggregate too low — expected 800–1150 kg/m³.")
-        if fine > 0 and fine < 500:
-            ERRORS.append("Fine Aggregate too low — expected 600–1000 kg/m³.")
+        features = [cement, slag, flyash, water, sp, coarse, fine, age]
+        # Same rule set as batch uploads (concreteiq.validation)
+        flags = validate(engineer_features(np.array([features], dtype=np.float64)),
+                         training_bounds(engine)).flags[0]
+        ERRORS = flag_messages(flags, ERROR)
 
         if ERRORS:
             for err in ERRORS:
                 st.markdown(f'<div class="callout-error">⚠️ {err}</div>', unsafe_allow_html=True)
         else:
-            features = [cement, slag, flyash, water, sp, coarse, fine, age]
             with st.spinner("Computing prediction…"):
-                pred = predict_strength(model_data, features)
+                pred = predict_strength(batcher, features, prediction_cache, model_version.fingerprint)
 
             if pred is not None:
-                st.session_state.history.append({
-                    'features': features, 'prediction': pred,
-                    'timestamp': pd.Timestamp.now()
-                })
-                grade, grade_label, usage, grade_cls, grade_dot = get_concrete_grade(pred)
+                # Charting libraries load only once there is something to chart
+                import pandas as pd
+                import plotly.express as px
+
+                st.session_state.history.append(features, pred)
+                grade, grade_label, usage, grade_cls, grade_dot = scheme.grade(pred)
                 wc = water / cement
 
                 # Hero result
@@ -957,6 +775,8 @@ if menu == "📝  Manual Input":
 
                 # Usage callout
                 st.markdown(f'<div class="callout-info" style="margin-top:.75rem;"><strong>💡 Recommended application:</strong> {usage}</div>', unsafe_allow_html=True)
+                for warning in flag_messages(flags, WARNING):
+                    st.markdown(f'<div class="callout-warning" style="margin-top:.5rem;">⚠️ {warning}</div>', unsafe_allow_html=True)
 
                 # Composition chart
                 st.markdown("""
@@ -982,11 +802,59 @@ if menu == "📝  Manual Input":
                                          x=.5, y=.5, font_size=13, showarrow=False, font_color="#0D1117")])
                 st.plotly_chart(fig, use_container_width=True)
 
+                # Strength gain: the age-independent score once, plus the age term per day
+                st.markdown("""
+                <div class="section-heading" style="margin-top:1.5rem;">
+                  <div class="sh-icon">📈</div><h3>Strength Development</h3>
+                </div>
+                """, unsafe_allow_html=True)
+                st.plotly_chart(_curve_chart(engine, features, scheme), use_container_width=True)
+
+    # ── What-if sweep ────────────────────────────────────────
+    st.markdown("<hr>", unsafe_allow_html=True)
+    if st.toggle("🔬 What-if sweep", key='_sweep',
+                 help="Vary one or two inputs of the mix above and chart the predicted strength"):
+        features = [cement, slag, flyash, water, sp, coarse, fine, age]
+        bounds = training_bounds(engine)
+        if flag_messages(validate(engineer_features(np.array([features], dtype=np.float64)), bounds).flags[0], ERROR):
+            st.markdown('<div class="callout-info">ℹ️ Enter a valid mix above to sweep around it.</div>',
+                        unsafe_allow_html=True)
+        else:
+            sw1, sw2 = st.columns([2, 1])
+            params = sw1.multiselect("Parameters to vary (1 or 2)", INPUT_COLUMNS, default=['Age'],
+                                     max_selections=2, key='_sweep_params')
+            if params:
+                points = sw2.select_slider("Grid points per axis", [25, 50, 100, 150, 250, 365],
+                                           value=SWEEP_POINTS[len(params)], key=f'_sweep_points_{len(params)}')
+                ranges = {}
+                for col, cell in zip(params, st.columns(len(params))):
+                    lo, hi = TYPICAL_RANGES[col]
+                    ranges[col] = cell.slider(f"{col} range", float(SWEEP_LIMITS[col][0]),
+                                              float(SWEEP_LIMITS[col][1]), (float(lo), float(hi)),
+                                              key=f'_sweep_range_{col}')
+                try:
+                    t0 = time.perf_counter()
+                    result = sweep(engine, features, ranges, points, bounds)
+                    elapsed = time.perf_counter() - t0
+                except ValueError as e:
+                    st.markdown(f'<div class="callout-error">⚠️ {e}</div>', unsafe_allow_html=True)
+                else:
+                    st.plotly_chart(_sweep_chart(result, features, scheme), use_container_width=True)
+                    best = np.unravel_index(np.argmax(result.strength), result.strength.shape)
+                    at_best = ", ".join(f"{p} {a[i]:,.1f}" for p, a, i in zip(result.params, result.axes, best))
+                    st.caption(f"{result.points:,} mixes scored in {elapsed * 1000:.1f} ms · "
+                               f"max {result.strength[best]:.1f} MPa at {at_best}"
+                               + (f" · {result.out_of_range.mean():.0%} of the grid outside the training range"
+                                  if result.out_of_range is not None and result.out_of_range.any() else ""))
+
 
 # ============================================================
 #  MENU 2 — BATCH CSV
 # ============================================================
 elif menu == "📁  Batch CSV Upload":
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
 
     st.markdown("""
     <div class="callout-info">
@@ -995,6 +863,9 @@ elif menu == "📁  Batch CSV Upload":
     </div>
     """, unsafe_allow_html=True)
 
+    # Uploads above this size default to chunked streaming
+    STREAM_MIN_BYTES = 50 * 1024 * 1024
+
     # Template
     template = pd.DataFrame({
         'Cement':[540,450,425],'Blast Furnace Slag':[0,100,106],
@@ -1018,137 +889,386 @@ elif menu == "📁  Batch CSV Upload":
 
     st.markdown("<hr>", unsafe_allow_html=True)
 
-    uploaded = st.file_uploader("Upload CSV file", type=["csv"])
+    uploaded = st.file_uploader("Upload CSV, Parquet or Arrow file", type=UPLOAD_TYPES,
+                                help="CSV may be gzip- or zstd-compressed; only the 8 input columns are read")
+    show_jobs(current_user())
 
     if uploaded:
         try:
-            df = pd.read_csv(uploaded)
-            df.columns = df.columns.str.strip()
-            st.success(f"✅ File loaded — {len(df):,} rows")
+            in_fmt = detect_format(uploaded.name)
+            # Matched on the header / schema alone, before any data is parsed
+            selected = select_columns(read_schema(uploaded, in_fmt))
+        except Exception as e:
+            st.markdown(f'<div class="callout-error">❌ File read error: {e}</div>', unsafe_allow_html=True)
+            uploaded = None
 
-            st.markdown("""
-            <div class="section-heading"><div class="sh-icon">👁️</div><h3>Data Preview</h3></div>
-            """, unsafe_allow_html=True)
-            st.dataframe(df.head(8), use_container_width=True)
+    if uploaded:
+        missing = missing_columns(selected.values())
+        streaming = st.toggle("⚡ Streaming mode", value=uploaded.size > STREAM_MIN_BYTES,
+                              help=f"Score the file in {CHUNK_ROWS:,}-row chunks with bounded memory. "
+                                   "Recommended for very large exports.")
+        out_fmt = st.selectbox("Output format", FORMATS, key='_out_fmt',
+                               format_func=lambda f: FILE_SUFFIX[f])
+        others = [n for n in registry.names if n != model_name]
+        compare = st.multiselect("⚖️ Compare with models", others, key='_compare',
+                                 help="Score the same rows with more models: one column per model "
+                                      "plus the per-row spread") if others else []
+        curve_ages = tuple(sorted(st.multiselect("📈 Strength at ages (days)", [*CURVE_AGES, 180, 365], key='_curve_ages',
+                                          help="Add one predicted-strength column per curing age "
+                                               "(wide format), whatever each row's own Age"))) or None
+
+    if uploaded and streaming:
+        try:
+            if missing:
+                st.markdown(f'<div class="callout-error">Missing columns: {", ".join(missing)}</div>', unsafe_allow_html=True)
+            else:
+                st.success(f"✅ File ready — {uploaded.size / 1e6:,.1f} MB, scored in {CHUNK_ROWS:,}-row chunks")
 
-            required = ['Cement','Blast Furnace Slag','Fly Ash','Water',
-                        'Superplasticizer','Coarse Aggregate','Fine Aggregate','Age']
-            for col in required:
-                for dc in df.columns:
-                    if col.lower().replace(' ','') == dc.lower().replace(' ','') and dc != col:
-                        df.rename(columns={dc:col}, inplace=True)
+                st.markdown("""
+                <div class="section-heading"><div class="sh-icon">👁️</div><h3>Data Preview</h3></div>
+                """, unsafe_allow_html=True)
+                st.dataframe(read_frame(uploaded, in_fmt, selected, nrows=8), use_container_width=True)
+
+                # Scored on the background queue: the run survives reruns and
+                # closed tabs, and the result is found again by content + models
+                engines = compare_engines(compare) or {model_name: engine}
+                key = job_key(upload_hash(uploaded), engines, 'stream', out_fmt, curve_ages)
+                job = job_queue.find(key, current_user())
+                if job is None and st.button("🚀 Run Batch Prediction", type="primary"):
+                    job = job_queue.submit(current_user(), uploaded.getvalue(), engine, in_fmt, out_fmt,
+                                           name=uploaded.name, scheme=scheme, compare=compare_engines(compare),
+                                           key=key, total=estimate_rows(uploaded, in_fmt, uploaded.size),
+                                           curve_ages=curve_ages)
+                    st.session_state._queued_job = job.id
+
+                last = job_queue.get(st.session_state.get('_queued_job', ''))
+                if job is None and last is not None and last.status == FAILED:
+                    st.markdown(f'<div class="callout-error">❌ Batch job failed: {html.escape(last.error)}</div>',
+                                unsafe_allow_html=True)
+                if job is not None and not job.finished:
+                    job_progress(job.id)
+                elif job is not None and job.id == st.session_state.get('_queued_job'):
+                    # Recorded once, by the session that queued the job
+                    del st.session_state._queued_job
+                    if job.rows:
+                        st.session_state.history.append(None, job.summary.stats.mean, rows=job.rows)
+
+                # The summary holds grade counts for every scheme, so switching
+                # schemes re-renders it without touching the file or the model
+                if job is not None and job.status == DONE:
+                    summary = job.summary
+                    st.markdown("""
+                    <div class="section-heading"><div class="sh-icon">📊</div><h3>Summary Statistics</h3></div>
+                    """, unsafe_allow_html=True)
+
+                    stats = summary.stats
+                    s1,s2,s3,s4 = st.columns(4)
+                    s1.metric("Mean Strength",  f"{stats.mean:.1f} MPa")
+                    s2.metric("Max Strength",   f"{stats.max:.1f} MPa")
+                    s3.metric("Min Strength",   f"{stats.min:.1f} MPa")
+                    s4.metric("Std Deviation",  f"{stats.std:.1f} MPa")
+
+                    st.markdown(f'<div class="callout-info">Scored <strong>{summary.rows:,}</strong> rows.</div>',
+                                unsafe_allow_html=True)
+                    show_validation(summary.validation)
+                    st.download_button("💾 Download Results", lambda: file_bytes(job.path),
+                                       "prediction_results" + FILE_SUFFIX[job.out_fmt], MIME_TYPES[job.out_fmt])
+
+                    st.markdown("""
+                    <div class="section-heading"><div class="sh-icon">📈</div><h3>Visualizations</h3></div>
+                    """, unsafe_allow_html=True)
+
+                    tab1, tab3 = st.tabs(["Distribution", "Grade Breakdown"])
+
+                    with tab1:
+                        fig1 = go.Figure(go.Bar(x=(HIST_EDGES[:-1] + HIST_EDGES[1:]) / 2, y=summary.hist_counts,
+                                                width=np.diff(HIST_EDGES), marker_color="#1B4FD8",
+                                                marker_line_color="#fff", marker_line_width=.5))
+                        _theme(fig1, title="Strength Distribution", bargap=0)
+                        fig1.update_xaxes(title_text=PRED_COL)
+                        fig1.update_yaxes(title_text="count")
+                        st.plotly_chart(fig1, use_container_width=True)
+
+                    with tab3:
+                        gc = pd.DataFrame(list(summary.grade_counts(scheme).items()), columns=['Grade','Count'])
+                        fig3 = px.bar(gc, x='Grade', y='Count', title="Grade Distribution",
+                                      color='Grade', color_discrete_sequence=COLOR_SEQUENCE,
+                                      text='Count')
+                        _theme(fig3)
+                        fig3.update_traces(textposition='outside', marker_line_width=0)
+                        st.plotly_chart(fig3, use_container_width=True)
 
-            missing = [c for c in required if c not in df.columns]
+        except Exception as e:
+            st.markdown(f'<div class="callout-error">❌ File read error: {e}</div>', unsafe_allow_html=True)
+
+    elif uploaded:
+        try:
             if missing:
                 st.markdown(f'<div class="callout-error">Missing columns: {", ".join(missing)}</div>', unsafe_allow_html=True)
             else:
+                # Parsed once per upload and model set; reruns (tabs, paging,
+                # downloads) reuse the job instead of re-reading the file
+                engines = compare_engines(compare) or {model_name: engine}
+                key = job_key(upload_hash(uploaded), engines)
+                job = job_store.get(key)
+                if job is None:
+                    job = job_store.put(BatchJob(key, inputs=read_frame(uploaded, in_fmt, selected)))
+                df = job.inputs
+                st.success(f"✅ File loaded — {len(df):,} rows")
+
+                st.markdown("""
+                <div class="section-heading"><div class="sh-icon">👁️</div><h3>Data Preview</h3></div>
+                """, unsafe_allow_html=True)
+                st.dataframe(df.head(8), use_container_width=True)
+
                 if st.button("🚀 Run Batch Prediction", type="primary"):
                     with st.spinner("Processing…"):
-                        preds = predict_batch(model_data, df)
-
+                        by_model = None
+                        if compare:
+                            # One feature matrix, scored by every selected model
+                            try:
+                                by_model = score_models(engines, df)
+                                preds = by_model[model_name]
+                            except Exception as e:
+                                st.error(f"Batch prediction error: {e}")
+                                preds = None
+                        else:
+                            preds = predict_batch(engine, df, prediction_cache)
                     if preds is not None:
-                        df['Predicted Strength (MPa)'] = preds
-                        df['Grade']    = df['Predicted Strength (MPa)'].apply(lambda x: get_concrete_grade(x)[0])
-                        df['W/C Ratio']= df['Water'] / df['Cement']
-
+                        job.finish(preds, validate(table_features(df), training_bounds(engine)), by_model)
+                        job_store.put(job)
+                        st.session_state.history.append_batch(preds, df[INPUT_COLUMNS].to_numpy(dtype=np.float64))
+
+                # A grade-scheme switch only re-runs the binning, once per scheme
+                if job.scored:
+                    if curve_ages:
+                        job.curve(engine, curve_ages)
+                    df = job.results(scheme, curve_ages or ())
+                    job_store.refresh(job)
+                    by_model = job.by_model
+
+                    st.markdown("""
+                    <div class="section-heading"><div class="sh-icon">📊</div><h3>Summary Statistics</h3></div>
+                    """, unsafe_allow_html=True)
+
+                    s1,s2,s3,s4 = st.columns(4)
+                    s1.metric("Mean Strength",  f"{df['Predicted Strength (MPa)'].mean():.1f} MPa")
+                    s2.metric("Max Strength",   f"{df['Predicted Strength (MPa)'].max():.1f} MPa")
+                    s3.metric("Min Strength",   f"{df['Predicted Strength (MPa)'].min():.1f} MPa")
+                    s4.metric("Std Deviation",  f"{df['Predicted Strength (MPa)'].std():.1f} MPa")
+
+                    show_validation(job.report.summary)
+
+                    if by_model:
                         st.markdown("""
-                        <div class="section-heading"><div class="sh-icon">📊</div><h3>Summary Statistics</h3></div>
+                        <div class="section-heading"><div class="sh-icon">⚖️</div><h3>Model Comparison</h3></div>
                         """, unsafe_allow_html=True)
+                        base = by_model[model_name]
+                        st.dataframe(pd.DataFrame({
+                            'Model': list(by_model),
+                            'Mean (MPa)': [p.mean() for p in by_model.values()],
+                            'Min (MPa)':  [p.min() for p in by_model.values()],
+                            'Max (MPa)':  [p.max() for p in by_model.values()],
+                            f'Mean Δ vs {model_name} (MPa)': [(p - base).mean() for p in by_model.values()],
+                        }), hide_index=True, use_container_width=True)
+                        spread = df[SPREAD_COLS[2]]
+                        c1, c2, c3 = st.columns(3)
+                        c1.metric("Mean Model Range", f"{spread.mean():.2f} MPa")
+                        c2.metric("Max Model Range",  f"{spread.max():.2f} MPa")
+                        c3.metric("Rows Range > 5 MPa", f"{int((spread > 5).sum()):,}")
+
+                    st.markdown("""
+                    <div class="section-heading"><div class="sh-icon">📋</div><h3>Full Results</h3></div>
+                    """, unsafe_allow_html=True)
+                    # Only the visible page is serialised to the browser
+                    pg1, pg2, _ = st.columns([1, 1, 3])
+                    page_size = pg1.selectbox("Rows per page", [50, 100, 500, 1000], index=1, key='_page_size')
+                    n_pages = page_bounds(len(df), 1, page_size)[2]
+                    if st.session_state.get('_page', 1) > n_pages:
+                        st.session_state._page = n_pages
+                    page = pg2.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages,
+                                            step=1, key='_page')
+                    start, stop, _ = page_bounds(len(df), page, page_size)
+                    st.dataframe(df.iloc[start:stop], use_container_width=True)
+                    st.caption(f"Rows {start + 1:,}–{stop:,} of {len(df):,}")
+                    # Encoded in chunks only when the button is clicked
+                    st.download_button("💾 Download Results", lambda: frame_bytes(df, out_fmt, CHUNK_ROWS),
+                                       "prediction_results" + FILE_SUFFIX[out_fmt], MIME_TYPES[out_fmt])
+
+                    # Charts
+                    st.markdown("""
+                    <div class="section-heading"><div class="sh-icon">📈</div><h3>Visualizations</h3></div>
+                    """, unsafe_allow_html=True)
+
+                    tab1, tab2, tab3 = st.tabs(["Distribution", "Strength vs Age", "Grade Breakdown"])
+
+                    with tab1:
+                        # Binned here; the browser only receives the bar heights
+                        edges, counts = histogram(df['Predicted Strength (MPa)'], bins=25)
+                        fig1 = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts,
+                                                width=np.diff(edges), marker_color="#1B4FD8"))
+                        _theme(fig1, title="Strength Distribution", bargap=0,
+                               xaxis_title='Predicted Strength (MPa)', yaxis_title='count')
+                        fig1.update_traces(marker_line_color="#fff", marker_line_width=.5)
+                        st.plotly_chart(fig1, use_container_width=True)
+
+                    with tab2:
+                        # Very large batches default to a density grid; points are sampled
+                        # down to the budget and drawn with WebGL past a few thousand
+                        mode = scatter_mode(0, len(df))
+                        if mode == 'density' and st.toggle("Show sampled points", key='_force_points'):
+                            mode = None
+                        shown = df
+                        if mode != 'density':
+                            sc1, sc2, _ = st.columns([1, 1, 3])
+                            method = sc1.selectbox("Sampling", SAMPLING_METHODS, key='_sampling',
+                                                   format_func={'stratified': "Stratified by grade",
+                                                                'lttb': "LTTB (along age)"}.get)
+                            budget = sc2.select_slider("Point budget", [1_000, 2_000, 5_000, 10_000, 20_000],
+                                                       value=POINT_BUDGET, key='_point_budget')
+                            idx = sample_points(df['Age'].to_numpy(), df['Predicted Strength (MPa)'].to_numpy(),
+                                                scheme.grade_index(df['Predicted Strength (MPa)']),
+                                                budget=budget, method=method)
+                            shown = df.iloc[idx]
+                            mode = scatter_mode(len(shown))
+                        fig2 = _strength_age_chart(df, shown, scheme, mode)
+                        st.plotly_chart(fig2, use_container_width=True)
+                        if mode == 'density':
+                            st.caption(f"Density of all {len(df):,} rows")
+                        elif len(shown) < len(df):
+                            st.caption(f"Showing {len(shown):,} of {len(df):,} rows"
+                                       + (" (WebGL)" if mode == 'webgl' else ""))
+
+                    with tab3:
+                        gc = pd.DataFrame(list(scheme.classify(df['Predicted Strength (MPa)']).counts().items()),
+                                          columns=['Grade','Count'])
+                        fig3 = px.bar(gc, x='Grade', y='Count', title="Grade Distribution",
+                                      color='Grade', color_discrete_sequence=COLOR_SEQUENCE,
+                                      text='Count')
+                        _theme(fig3)
+                        fig3.update_traces(textposition='outside', marker_line_width=0)
+                        st.plotly_chart(fig3, use_container_width=True)
 
-                        s1,s2,s3,s4 = st.columns(4)
-                        s1.metric("Mean Strength",  f"{df['Predicted Strength (MPa)'].mean():.1f} MPa")
-                        s2.metric("Max Strength",   f"{df['Predicted Strength (MPa)'].max():.1f} MPa")
-                        s3.metric("Min Strength",   f"{df['Predicted Strength (MPa)'].min():.1f} MPa")
-                        s4.metric("Std Deviation",  f"{df['Predicted Strength (MPa)'].std():.1f} MPa")
+        except Exception as e:
+            st.markdown(f'<div class="callout-error">❌ File read error: {e}</div>', unsafe_allow_html=True)
 
-                        st.markdown("""
-                        <div class="section-heading"><div class="sh-icon">📋</div><h3>Full Results</h3></div>
-                        """, unsafe_allow_html=True)
-                        st.dataframe(df, use_container_width=True)
-                        st.download_button("💾 Download Results", df.to_csv(index=False),
-                                           "prediction_results.csv", "text/csv")
 
-                        # Charts
-                        st.markdown("""
-                        <div class="section-heading"><div class="sh-icon">📈</div><h3>Visualizations</h3></div>
-                        """, unsafe_allow_html=True)
+# ============================================================
+#  MENU 3 — MIX OPTIMIZER
+# ============================================================
+elif menu == "🎯  Mix Optimizer":
+    import pandas as pd
+    import plotly.graph_objects as go
 
-                        tab1, tab2, tab3 = st.tabs(["Distribution", "Strength vs Age", "Grade Breakdown"])
-
-                        with tab1:
-                            fig1 = px.histogram(df, x='Predicted Strength (MPa)', nbins=25,
-                                                title="Strength Distribution",
-                                                color_discrete_sequence=["#1B4FD8"])
-                            _theme(fig1)
-                            fig1.update_traces(marker_line_color="#fff", marker_line_width=.5)
-                            st.plotly_chart(fig1, use_container_width=True)
-
-                        with tab2:
-                            fig2 = px.scatter(df, x='Age', y='Predicted Strength (MPa)',
-                                              color='Grade', size='Cement',
-                                              title="Strength vs Curing Age",
-                                              hover_data=['Cement','Water','W/C Ratio'],
-                                              color_discrete_sequence=COLOR_SEQUENCE)
-                            _theme(fig2)
-                            st.plotly_chart(fig2, use_container_width=True)
-
-                        with tab3:
-                            gc = df['Grade'].value_counts().reset_index()
-                            gc.columns = ['Grade','Count']
-                            fig3 = px.bar(gc, x='Grade', y='Count', title="Grade Distribution",
-                                          color='Grade', color_discrete_sequence=COLOR_SEQUENCE,
-                                          text='Count')
-                            _theme(fig3)
-                            fig3.update_traces(textposition='outside', marker_line_width=0)
-                            st.plotly_chart(fig3, use_container_width=True)
+    st.markdown("""
+    <div class="callout-info">
+      <strong>ℹ️ Instructions:</strong>
+      Choose the grade to reach, the test age and the W/C limit. The optimizer searches every
+      material within its bounds and returns the cheapest mix plus the full strength–cost trade-off.
+    </div>
+    """, unsafe_allow_html=True)
 
-        except Exception as e:
-            st.markdown(f'<div class="callout-error">❌ File read error: {e}</div>', unsafe_allow_html=True)
+    targets = scheme.codes[1:]
+    o1, o2, o3 = st.columns(3)
+    target_code = o1.selectbox("Target grade", targets, key='_opt_grade',
+                               index=targets.index('K-300') if 'K-300' in targets else len(targets) // 2,
+                               format_func=lambda c: f"{c} (≥ {scheme.minimum(c):g} MPa)")
+    opt_age = o2.number_input("At age (days)", min_value=1, max_value=365, value=28, step=1, key='_opt_age')
+    wc_max = o3.slider("Max W/C ratio", 0.25, 0.70, WC_MAX, 0.01, key='_opt_wc')
+
+    with st.expander("💰 Material prices & bounds"):
+        limits = st.data_editor(pd.DataFrame({
+            'Material':      MATERIALS,
+            'Price (Rp/kg)': [float(MATERIAL_COSTS[m]) for m in MATERIALS],
+            'Min (kg/m³)':   [float(TYPICAL_RANGES[m][0]) for m in MATERIALS],
+            'Max (kg/m³)':   [float(TYPICAL_RANGES[m][1]) for m in MATERIALS],
+        }), disabled=['Material'], hide_index=True, use_container_width=True, key='_opt_limits')
+
+    target = scheme.minimum(target_code)
+    costs = dict(zip(limits['Material'], limits['Price (Rp/kg)']))
+    bounds = {m: (lo, hi) for m, lo, hi in zip(limits['Material'], limits['Min (kg/m³)'], limits['Max (kg/m³)'])}
+    try:
+        design = mix_design(engine.fingerprint, engine, target, opt_age, costs, bounds, wc_max)
+    except ValueError as e:
+        st.markdown(f'<div class="callout-error">⚠️ {e}</div>', unsafe_allow_html=True)
+        design = None
+
+    if design is not None and not len(design):
+        st.markdown('<div class="callout-error">⚠️ No mix satisfies the bounds, W/C limit and '
+                    'density range together.</div>', unsafe_allow_html=True)
+    elif design is not None:
+        best = design.best
+        if best is None:
+            st.markdown(f'<div class="callout-warning">⚠️ No mix within the bounds reaches {target:g} MPa '
+                        f'at {opt_age} days; the strongest reaches {design.strength.max():.1f} MPa.</div>',
+                        unsafe_allow_html=True)
+        else:
+            grade, grade_label, usage, grade_cls, grade_dot = scheme.grade(design.strength[best])
+            st.markdown(f"""
+            <div class="result-hero">
+              <div class="result-label">Cheapest Mix Reaching {html.escape(target_code)}</div>
+              <div>
+                <span class="result-value">{design.cost[best]:,.0f}</span>
+                <span class="result-unit">Rp/m³</span>
+              </div>
+              <div class="result-category">{grade_dot} {design.strength[best]:.1f} MPa · Grade {grade}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+            k1, k2, k3, k4 = st.columns(4)
+            k1.metric("Predicted Strength", f"{design.strength[best]:.1f} MPa")
+            k2.metric("W/C Ratio",          f"{design.wc[best]:.3f}")
+            k3.metric("Total Material",     f"{design.mixes[best, :-1].sum():.0f} kg/m³")
+            k4.metric("Curing Age",         f"{opt_age} days")
+            st.dataframe(pd.DataFrame({'Material': MATERIALS,
+                                       'Amount (kg/m³)': design.mixes[best, :len(MATERIALS)].round(1),
+                                       'Cost (Rp/m³)': (design.mixes[best, :len(MATERIALS)]
+                                                        * [costs[m] for m in MATERIALS]).round(0)}),
+                         hide_index=True, use_container_width=True)
+
+        st.markdown("""
+        <div class="section-heading" style="margin-top:1.5rem;">
+          <div class="sh-icon">📉</div><h3>Strength vs Cost (Pareto Set)</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        fig = go.Figure(go.Scatter(
+            x=design.cost, y=design.strength, mode='lines+markers', name='Pareto set',
+            line=dict(color="#1B4FD8", width=2), marker=dict(size=5),
+            customdata=design.wc,
+            hovertemplate='%{x:,.0f} Rp/m³<br>%{y:.1f} MPa<br>W/C %{customdata:.3f}<extra></extra>'))
+        fig.add_hline(y=target, line_dash='dot', line_color='#9CA3AF', annotation_text=target_code,
+                      annotation_position='top left', annotation_font_size=10)
+        if best is not None:
+            fig.add_trace(go.Scatter(x=[design.cost[best]], y=[design.strength[best]], mode='markers',
+                                     name='cheapest', marker=dict(color="#DC2626", size=12, symbol='star')))
+        _theme(fig, showlegend=False)
+        fig.update_xaxes(title_text="Material cost (Rp/m³)")
+        fig.update_yaxes(title_text=PRED_COL)
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"{len(design):,} Pareto-optimal mixes from {design.evaluated:,} candidates "
+                   f"in {design.seconds * 1000:.0f} ms")
+
+        frame = design.to_frame()
+        st.dataframe(frame, hide_index=True, use_container_width=True, height=280)
+        st.download_button("💾 Download Pareto Set", frame.to_csv(index=False), "mix_designs.csv", "text/csv")
 
 
 # ============================================================
-#  MENU 3 — MODEL PERFORMANCE
+#  MENU 4 — MODEL PERFORMANCE
 # ============================================================
 elif menu == "📊  Model Performance":
+    import pandas as pd
+    import plotly.express as px
 
-    # Metrics
-    metrics = model_data.get('metrics', {}) if isinstance(model_data, dict) else {}
-    r2   = metrics.get('r2_score', metrics.get('r2', 0.85))
-    rmse = metrics.get('rmse', 10.24)
-    mae  = metrics.get('mae', 7.82)
+    # Everything down to the history depends only on the model: built once per fingerprint
+    perf = model_performance_artifacts(engine.fingerprint, model_data)
 
     st.markdown("""
     <div class="section-heading"><div class="sh-icon">🎯</div><h3>Performance Metrics</h3></div>
     """, unsafe_allow_html=True)
 
-    pm1, pm2, pm3 = st.columns(3)
-    with pm1:
-        st.markdown(f"""
-        <div class="perf-card" style="background:linear-gradient(135deg,#1B4FD8,#1338A8);">
-          <div class="metric-label">R² Score</div>
-          <div class="metric-value">{r2:.3f}</div>
-          <div class="metric-sub">Coefficient of Determination</div>
-          <div style="background:rgba(255,255,255,.2);height:6px;border-radius:3px;margin-top:14px;">
-            <div style="background:white;height:6px;border-radius:3px;width:{int(r2*100)}%;"></div>
-          </div>
-        </div>
-        """, unsafe_allow_html=True)
-    with pm2:
-        st.markdown(f"""
-        <div class="perf-card" style="background:linear-gradient(135deg,#059669,#047857);">
-          <div class="metric-label">RMSE</div>
-          <div class="metric-value">{rmse:.2f}</div>
-          <div class="metric-sub">Root Mean Squared Error (MPa)</div>
-        </div>
-        """, unsafe_allow_html=True)
-    with pm3:
-        st.markdown(f"""
-        <div class="perf-card" style="background:linear-gradient(135deg,#0EA5A0,#0D7A76);">
-          <div class="metric-label">MAE</div>
-          <div class="metric-value">{mae:.2f}</div>
-          <div class="metric-sub">Mean Absolute Error (MPa)</div>
-        </div>
-        """, unsafe_allow_html=True)
+    for col, card in zip(st.columns(3), perf['cards']):
+        col.markdown(card, unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -1159,86 +1279,18 @@ elif menu == "📊  Model Performance":
         st.markdown("""
         <div class="section-heading"><div class="sh-icon">🤖</div><h3>Model Configuration</h3></div>
         """, unsafe_allow_html=True)
-
-        mobj  = model_data.get('model') if isinstance(model_data, dict) else model_data
-        fnames= model_data.get('feature_names', []) if isinstance(model_data, dict) else []
-        mtype = mobj.__class__.__name__ if mobj else "Unknown"
-
-        st.markdown(f"""
-        <div class="section-card">
-          <div style="display:grid;grid-template-columns:1fr 1fr;gap:.75rem;">
-            <div><div class="section-title">Algorithm</div><div style="font-weight:700;color:var(--n950);">{mtype}</div></div>
-            <div><div class="section-title">Method</div><div style="font-weight:700;color:var(--n950);">OLS Regression</div></div>
-            <div><div class="section-title">Input Features</div><div style="font-weight:700;color:var(--n950);">8 parameters</div></div>
-            <div><div class="section-title">Output</div><div style="font-weight:700;color:var(--n950);">MPa (comp. strength)</div></div>
-          </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(perf['config'], unsafe_allow_html=True)
 
         st.markdown("""
         <div class="section-heading"><div class="sh-icon">📋</div><h3>Input Parameters</h3></div>
         """, unsafe_allow_html=True)
-
-        params = [
-            ("Cement",             "kg/m³","Primary binder"),
-            ("Blast Furnace Slag", "kg/m³","SCM replacement"),
-            ("Fly Ash",            "kg/m³","Pozzolanic additive"),
-            ("Water",              "kg/m³","W/C ratio driver"),
-            ("Superplasticizer",   "kg/m³","Workability enhancer"),
-            ("Coarse Aggregate",   "kg/m³","Skeletal structure"),
-            ("Fine Aggregate",     "kg/m³","Void filler"),
-            ("Age",                "days", "Curing maturity"),
-        ]
-        for i,(name,unit,desc) in enumerate(params,1):
-            st.markdown(f"""
-            <div style="display:flex;align-items:center;gap:.75rem;padding:.5rem 0;border-bottom:1px solid var(--n200);">
-              <span style="background:var(--primary-light);color:var(--primary);width:22px;height:22px;
-                           border-radius:50%;display:inline-flex;align-items:center;justify-content:center;
-                           font-size:.7rem;font-weight:700;flex-shrink:0;">{i}</span>
-              <div>
-                <div style="font-weight:600;font-size:.88rem;color:var(--n950);">{name}
-                  <span class="chip chip-primary" style="margin-left:.35rem;">{unit}</span>
-                </div>
-                <div style="font-size:.75rem;color:var(--n600);">{desc}</div>
-              </div>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(perf['params'], unsafe_allow_html=True)
 
     with right:
         st.markdown("""
         <div class="section-heading"><div class="sh-icon">📊</div><h3>Feature Impact (Coefficients)</h3></div>
         """, unsafe_allow_html=True)
-
-        mobj2 = model_data.get('model') if isinstance(model_data, dict) else model_data
-        fn2   = model_data.get('feature_names', []) if isinstance(model_data, dict) else []
-
-        if hasattr(mobj2,'coef_') and len(fn2) > 0:
-            coefs = mobj2.coef_[:8]
-            feat_display = fn2[:8]
-        else:
-            coefs = np.array([0.117,0.104,0.087,-0.148,0.277,0.010,0.010,0.114])
-            feat_display = ['Cement','Slag','Fly Ash','Water','Superplasticizer','Coarse Agg','Fine Agg','Age']
-
-        fi = pd.DataFrame({'Feature':feat_display,'Coef':coefs,'Abs':np.abs(coefs)})
-        fi = fi.sort_values('Abs', ascending=True)
-
-        fig_fi = go.Figure(go.Bar(
-            x=fi['Coef'], y=fi['Feature'], orientation='h',
-            marker=dict(
-                color=fi['Coef'],
-                colorscale=[[0,"#DC2626"],[0.5,"#F3F4F6"],[1,"#1B4FD8"]],
-                cmin=-fi['Abs'].max(), cmax=fi['Abs'].max(),
-                line=dict(width=0)
-            ),
-            text=[f"{c:+.3f}" for c in fi['Coef']],
-            textposition='outside',
-            textfont=dict(size=10, family="DM Mono", color="#1E2633"),
-        ))
-        _theme(fig_fi, height=340)
-        fig_fi.update_xaxes(title_text="Coefficient", gridcolor="#F3F4F6",
-                            zeroline=True, zerolinecolor="#E5E7EB", zerolinewidth=1.5)
-        fig_fi.update_yaxes(title_text="", gridcolor="#F3F4F6")
-        st.plotly_chart(fig_fi, use_container_width=True)
+        st.plotly_chart(perf['fig_fi'], use_container_width=True)
 
         st.markdown("""
         <div class="callout-info" style="font-size:.82rem;">
@@ -1255,19 +1307,24 @@ elif menu == "📊  Model Performance":
     <div class="section-heading"><div class="sh-icon">📜</div><h3>Prediction History</h3></div>
     """, unsafe_allow_html=True)
 
-    if st.session_state.history:
-        hist_df = pd.DataFrame([{
-            'Timestamp':  h['timestamp'].strftime('%Y-%m-%d %H:%M'),
-            'Strength (MPa)': round(h['prediction'],2),
-            'Grade':      get_concrete_grade(h['prediction'])[0],
-            'Cement':     h['features'][0],
-            'Water':      h['features'][3],
-            'Age (d)':    h['features'][7],
-        } for h in st.session_state.history[-10:]])
+    history = st.session_state.history
+    if history:
+        # Views into the ring buffer; batch records show their mean mix and strength
+        recent = history.tail(10)
+        local_tz = datetime.now().astimezone().tzinfo
+        hist_df = pd.DataFrame({
+            'Timestamp':  pd.to_datetime(recent.timestamp, utc=True).tz_convert(local_tz).strftime('%Y-%m-%d %H:%M'),
+            'Strength (MPa)': recent.prediction.round(2),
+            'Cement':     recent.feature('Cement').round(1),
+            'Water':      recent.feature('Water').round(1),
+            'Age (d)':    recent.feature('Age').round(1),
+            'Rows':       recent.rows,
+        })
+        hist_df.insert(2, 'Grade', scheme.classify(recent.prediction).code)
 
         st.dataframe(hist_df, use_container_width=True)
 
-        if len(st.session_state.history) > 1:
+        if len(recent) > 1:
             fig_h = px.line(hist_df, y='Strength (MPa)', markers=True,
                             title="Recent Predictions Trend",
                             color_discrete_sequence=["#1B4FD8"])
@@ -1276,7 +1333,7 @@ elif menu == "📊  Model Performance":
             st.plotly_chart(fig_h, use_container_width=True)
 
         if st.button("🗑️ Clear History"):
-            st.session_state.history = []
+            history.clear()
             st.rerun()
     else:
         st.markdown("""
@@ -1287,6 +1344,35 @@ elif menu == "📊  Model Performance":
 
     st.markdown("<hr>", unsafe_allow_html=True)
 
+    # Micro-batching metrics
+    st.markdown("""
+    <div class="section-heading"><div class="sh-icon">⏱️</div><h3>Request Batching</h3></div>
+    """, unsafe_allow_html=True)
+
+    bm = batcher.metrics.snapshot()
+    b1,b2,b3,b4 = st.columns(4)
+    b1.metric("Queue Depth",      f"{bm['queue_depth']}", f"max {bm['max_queue_depth']}", delta_color="off")
+    b2.metric("Batches Scored",   f"{bm['batches']:,}")
+    b3.metric("Mean Batch Size",  f"{bm['mean_batch_size']:.1f}")
+    b4.metric("Mean Added Wait",  f"{bm['mean_wait_us']:,.0f} µs", f"max {bm['max_wait_us']:,.0f} µs", delta_color="off")
+
+    if bm['batches']:
+        bc1, bc2 = st.columns(2)
+        with bc1:
+            fig_bs = px.bar(x=list(bm['batch_size_hist']), y=list(bm['batch_size_hist'].values()),
+                            labels={'x': 'Batch size (rows)', 'y': 'Batches'},
+                            title="Batch Size Histogram", color_discrete_sequence=["#1B4FD8"])
+            _theme(fig_bs)
+            st.plotly_chart(fig_bs, use_container_width=True)
+        with bc2:
+            fig_bw = px.bar(x=list(bm['wait_us_hist']), y=list(bm['wait_us_hist'].values()),
+                            labels={'x': 'Added wait (µs)', 'y': 'Requests'},
+                            title="Added Wait Histogram", color_discrete_sequence=["#1B4FD8"])
+            _theme(fig_bw)
+            st.plotly_chart(fig_bw, use_container_width=True)
+
+    st.markdown("<hr>", unsafe_allow_html=True)
+
     # Insights
     st.markdown("""
     <div class="section-heading"><div class="sh-icon">💡</div><h3>Key Insights & Limitations</h3></div>
@@ -1315,6 +1401,16 @@ elif menu == "📊  Model Performance":
         """, unsafe_allow_html=True)
 
 
+# ============================================================
+#  CACHE COUNTERS (sidebar)
+# ============================================================
+if prediction_cache is not None:
+    cache_pills.markdown(f"""
+    <div class="stat-pill"><span class="label">Cache Hits</span><span class="value">{prediction_cache.hits:,}</span></div>
+    <div class="stat-pill"><span class="label">Cache Misses</span><span class="value">{prediction_cache.misses:,}</span></div>
+    """, unsafe_allow_html=True)
+
+
 # ============================================================
 #  FOOTER
 # ============================================================
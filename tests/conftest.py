@@ -0,0 +1,17 @@
+import os
+
+import pytest
+
+from concreteiq import load_engine
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), os.pardir, 'concrete_strength_model.pkl')
+
+
+@pytest.fixture(scope='session')
+def model_path():
+    return MODEL_PATH
+
+
+@pytest.fixture(scope='session')
+def engine():
+    return load_engine(MODEL_PATH)
@@ -0,0 +1,89 @@
+import csv
+import http.client
+import io
+import json
+
+import pytest
+
+from concreteiq.api import serve_in_thread
+from concreteiq.batch import FLAGS_COL, OOD_COL
+from concreteiq.validation import ERROR_MASK
+
+GOOD = [540, 0, 0, 162, 2.5, 1040, 676, 28]
+NO_CEMENT = [0, 0, 0, 162, 2.5, 1040, 676, 28]
+HEADER = 'Cement,Blast Furnace Slag,Fly Ash,Water,Superplasticizer,Coarse Aggregate,Fine Aggregate,Age'
+
+
+@pytest.fixture(scope='module')
+def server(engine):
+    return serve_in_thread(engine, port=0)
+
+
+def post(server, path, body, content_type='application/json'):
+    conn = http.client.HTTPConnection('127.0.0.1', server.port, timeout=10)
+    try:
+        conn.request('POST', path, body, {'Content-Type': content_type})
+        response = conn.getresponse()
+        return response.status, response.read().decode('utf-8')
+    finally:
+        conn.close()
+
+
+def test_predict_flags_missing_cement(server):
+    status, body = post(server, '/predict', json.dumps({'features': NO_CEMENT}))
+    assert status == 200
+    result = json.loads(body)
+    assert result['flags'] & int(ERROR_MASK)
+    assert "Cement is required." in result['errors']
+    assert result['strength'] >= 0
+
+
+def test_predict_clean_mix_has_no_flags(server):
+    status, body = post(server, '/predict', json.dumps({'features': GOOD}))
+    assert status == 200
+    result = json.loads(body)
+    assert result['flags'] == 0
+    assert result['errors'] == [] and result['warnings'] == []
+    assert result['out_of_range'] is False
+
+
+def test_batch_json_returns_flags_per_row(server):
+    status, body = post(server, '/predict/batch', json.dumps({'features': [GOOD, NO_CEMENT]}))
+    assert status == 200
+    result = json.loads(body)
+    assert len(result['flags']) == len(result['out_of_range']) == 2
+    assert result['flags'][0] == 0
+    assert result['flags'][1] & int(ERROR_MASK)
+
+
+def test_batch_csv_has_validation_columns(server):
+    rows = '\n'.join(','.join(map(str, mix)) for mix in (GOOD, NO_CEMENT))
+    status, body = post(server, '/predict/batch', f"{HEADER}\n{rows}\n", 'text/csv')
+    assert status == 200
+    out = list(csv.DictReader(io.StringIO(body)))
+    assert FLAGS_COL in out[0] and OOD_COL in out[0]
+    assert int(out[0][FLAGS_COL]) == 0
+    assert int(out[1][FLAGS_COL]) & int(ERROR_MASK)
+
+
+def strict_json(body):
+    def reject(constant):
+        raise ValueError(f"{constant} is not valid JSON")
+    return json.loads(body, parse_constant=reject)
+
+
+def test_predict_rejects_non_finite_values(server):
+    status, body = post(server, '/predict', json.dumps({'features': GOOD[:3] + [float('nan')] + GOOD[4:]}))
+    assert status == 400
+    result = strict_json(body)
+    assert "Missing or non-numeric value." in result['errors']
+    assert result['flags'] & int(ERROR_MASK)
+
+
+def test_batch_json_gives_null_for_unscorable_rows(server):
+    status, body = post(server, '/predict/batch', json.dumps({'features': [GOOD, GOOD[:3] + [None] + GOOD[4:]]}))
+    assert status == 200
+    result = strict_json(body)
+    assert result['strength'][0] > 0 and result['grade'][0] is not None
+    assert result['strength'][1] is None and result['grade'][1] is None
+    assert result['flags'][1] & int(ERROR_MASK)
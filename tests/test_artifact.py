@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from concreteiq.artifact import artifact_fingerprint, convert_pickle, is_artifact
+from concreteiq.engine import engineer_features, load_engine
+
+MIXES = np.random.default_rng(0).uniform([100, 0, 0, 120, 0, 800, 600, 1],
+                                         [540, 360, 200, 250, 32, 1150, 1000, 365], size=(500, 8))
+
+
+@pytest.fixture
+def artifact(tmp_path, model_path):
+    dst = str(tmp_path / 'model.ciq')
+    return dst, convert_pickle(model_path, dst)
+
+
+def test_artifact_predicts_like_the_pickle(engine, artifact):
+    path, content_hash = artifact
+    assert is_artifact(path)
+    converted = load_engine(path)
+    assert converted.fingerprint == artifact_fingerprint(path) == content_hash
+    np.testing.assert_allclose(converted.weights, engine.weights, rtol=1e-15)
+    np.testing.assert_allclose(converted.predict(MIXES), engine.predict(MIXES), rtol=0, atol=1e-10)
+    F = engineer_features(MIXES)
+    np.testing.assert_allclose(converted._sklearn_predict(F), engine._sklearn_predict(F),
+                               rtol=0, atol=1e-10)
+
+
+def test_corrupted_artifact_is_rejected(artifact):
+    path, _ = artifact
+    with open(path, 'r+b') as fh:
+        fh.seek(-1, 2)
+        last = fh.read(1)
+        fh.seek(-1, 2)
+        fh.write(bytes([last[0] ^ 0xFF]))
+    with pytest.raises(ValueError, match='hash mismatch'):
+        load_engine(path)
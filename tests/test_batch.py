@@ -0,0 +1,12 @@
+import numpy as np
+import pandas as pd
+
+from concreteiq.batch import WC_COL, add_result_columns
+from concreteiq.engine import INPUT_COLUMNS
+
+
+def test_wc_ratio_is_zero_without_cement():
+    df = pd.DataFrame([[540, 0, 0, 162, 2.5, 1040, 676, 28],
+                       [0, 0, 0, 162, 2.5, 1040, 676, 28]], columns=INPUT_COLUMNS, dtype=float)
+    add_result_columns(df, np.array([40.0, 5.0]))
+    assert df[WC_COL].tolist() == [0.3, 0.0]
@@ -0,0 +1,54 @@
+import numpy as np
+
+from concreteiq.cache import PredictionCache
+
+MIXES = np.array([[540, 0, 0, 162, 2.5, 1040, 676, age] for age in (1, 3, 7, 14, 28)],
+                 dtype=np.float64)
+
+
+def test_disk_tier_evicts_least_recently_used(engine, tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = PredictionCache(path, fingerprint='m', capacity=1, disk_capacity=3)
+    for mix in MIXES[:3]:
+        cache.predict(mix, engine.predict)
+    # Read the oldest row back from disk so it becomes the most recent one
+    cache._memory.clear()
+    cache.predict(MIXES[:1], engine.predict)
+    cache.predict(MIXES[3:4], engine.predict)
+    assert len(cache) == 3
+    cache.close()
+
+    reopened = PredictionCache(path, fingerprint='m', capacity=1, disk_capacity=3)
+    reopened.predict(MIXES[[0, 2, 3]], engine.predict)
+    assert reopened.hits_disk == 3 and reopened.misses == 0
+    reopened.predict(MIXES[1:2], engine.predict)
+    assert reopened.misses == 1
+    reopened.close()
+
+
+def test_cache_matches_direct_scoring(engine, tmp_path):
+    X = np.random.default_rng(0).uniform([100, 0, 0, 120, 0, 800, 600, 1],
+                                         [540, 360, 200, 250, 32, 1150, 1000, 365], size=(200, 8))
+    X = np.round(np.vstack([X, X[:50]]), 3)
+    cache = PredictionCache(str(tmp_path / 'cache.sqlite'), fingerprint='m')
+    np.testing.assert_allclose(cache.predict(X, engine.predict), engine.predict(X), rtol=0, atol=1e-10)
+    assert cache.misses == 250 and cache.hits == 0
+    assert len(cache) == 200
+    np.testing.assert_allclose(cache.predict(X, engine.predict), engine.predict(X), rtol=0, atol=1e-10)
+    assert cache.hits_memory == 250
+    assert abs(cache.predict_one(X[0], engine.predict) - engine.predict_one(X[0])) < 1e-10
+
+
+def test_rebind_drops_entries_of_the_old_model(engine, tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = PredictionCache(path, fingerprint='old')
+    cache.predict(MIXES, lambda Q: np.zeros(len(Q)))
+    # Another model's predictions bypass the cache instead of reading its entries
+    np.testing.assert_allclose(cache.predict(MIXES, engine.predict, fingerprint='new'),
+                               engine.predict(MIXES), rtol=0, atol=1e-10)
+    cache.rebind('new')
+    assert len(cache) == 0
+    np.testing.assert_allclose(cache.predict(MIXES, engine.predict), engine.predict(MIXES),
+                               rtol=0, atol=1e-10)
+    cache.close()
+    assert len(PredictionCache(path, fingerprint='newer')) == 0
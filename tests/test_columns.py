@@ -0,0 +1,43 @@
+import pytest
+
+from concreteiq.columns import _resolve, normalise_header, resolve_columns, select_columns
+from concreteiq.engine import INPUT_COLUMNS
+from concreteiq.formats import input_columns
+
+INDONESIAN = ['Semen', 'Slag_Tanur_Tinggi', 'Abu_Terbang', 'Air', 'Superplasticizer',
+              'Agregat_Kasar', 'Agregat_Halus', 'Umur_Hari']
+EXPORT = ['ID', 'Cement (kg/m3)', 'GGBS', 'fly-ash', 'Water_kg', 'SP [kg/m³]', 'coarseagg',
+          'Sand', 'Age (days)', 'Strength (MPa)']
+
+
+@pytest.mark.parametrize('header, key', [
+    ('Cement (kg/m3)', 'cement'), ('Water_kg', 'water'), ('Age_days', 'age'),
+    ('  Fine Aggregate ', 'fineaggregate'), ('SP [kg/m³]', 'sp'),
+])
+def test_normalise_header(header, key):
+    assert normalise_header(header) == key
+
+
+@pytest.mark.parametrize('headers', [INPUT_COLUMNS, INDONESIAN, EXPORT])
+def test_every_spelling_resolves_to_the_inputs(headers):
+    selected = select_columns(headers)
+    assert sorted(selected.values()) == sorted(INPUT_COLUMNS)
+    assert set(selected) <= set(headers)
+
+
+def test_rename_mapping_skips_canonical_headers_and_keeps_the_first_match():
+    headers = ['Cement', 'Semen', 'Air', 'Water', 'Age']
+    assert resolve_columns(headers) == {'Air': 'Water'}
+
+
+def test_resolution_is_cached_per_header_signature():
+    headers = EXPORT + ['Only Here']
+    select_columns(headers)
+    hits = _resolve.cache_info().hits
+    select_columns(list(headers))
+    assert _resolve.cache_info().hits == hits + 1
+
+
+def test_missing_inputs_raise_value_error():
+    with pytest.raises(ValueError, match=r'Missing columns: Cement, Age$'):
+        input_columns(['Slag', 'Fly Ash', 'Water', 'SP', 'Coarse', 'Fine', 'Notes'])
@@ -0,0 +1,63 @@
+import copy
+
+import numpy as np
+
+from concreteiq.engine import CURVE_AGES, engineer_features, feature_buffer, features_from_columns
+
+# Random mixes spanning the README's typical input ranges
+LOW = np.array([100, 0, 0, 120, 0, 800, 600, 1], dtype=np.float64)
+HIGH = np.array([540, 360, 200, 250, 32, 1150, 1000, 365], dtype=np.float64)
+
+
+def random_mixes(n, seed=0):
+    return np.random.default_rng(seed).uniform(LOW, HIGH, size=(n, len(LOW)))
+
+
+def test_folded_weights_match_sklearn(engine):
+    assert engine.is_linear
+    F = engineer_features(random_mixes(1000))
+    expected = np.maximum(engine._sklearn_predict(F), 0)
+    np.testing.assert_allclose(engine.predict_features(F), expected, rtol=0, atol=1e-10)
+    for x, y in zip(random_mixes(20, seed=1), engine.predict(random_mixes(20, seed=1))):
+        assert abs(engine.predict_one(x) - y) < 1e-10
+
+
+def test_engineered_features():
+    F = engineer_features([[540, 100, 50, 162, 2.5, 1040, 676, 28],
+                           [0, 0, 0, 162, 2.5, 1040, 676, 28]])
+    np.testing.assert_allclose(F[:, 8:], [[0.3, 690, np.log1p(28)],
+                                          [0.0, 0, np.log1p(28)]])
+
+
+def test_single_batch_and_column_paths_agree():
+    X = random_mixes(50)
+    X[::7, 0] = 0.0
+    F = engineer_features(X)
+    assert np.isfinite(F).all()
+    np.testing.assert_array_equal(engineer_features(X[3]), F[3:4])
+    np.testing.assert_array_equal(features_from_columns(list(X.T), len(X)), F)
+    out = feature_buffer(len(X))
+    assert engineer_features(X, out=out) is out
+
+
+def test_curves_match_scoring_at_each_age(engine):
+    X = random_mixes(30)
+    curve = engine.predict_curve(X, CURVE_AGES)
+    assert curve.shape == (len(X), len(CURVE_AGES))
+    for j, age in enumerate(CURVE_AGES):
+        at_age = X.copy()
+        at_age[:, 7] = age
+        np.testing.assert_allclose(curve[:, j], engine.predict(at_age), rtol=0, atol=1e-10)
+
+    # Models that cannot be folded score one copy of the mixes per age
+    generic = copy.copy(engine)
+    generic.weights = generic.bias = None
+    np.testing.assert_allclose(generic.predict_curve(X, CURVE_AGES), curve, rtol=0, atol=1e-10)
+    np.testing.assert_allclose(generic.predict_curve(X[0], CURVE_AGES), curve[0], rtol=0, atol=1e-10)
+
+
+def test_curves_gain_strength_over_the_curve_ages(engine):
+    # The linear age term turns the curve down after ~220 days; up to 90 it only rises
+    curve = engine.predict_curve(random_mixes(100), CURVE_AGES)
+    positive = curve[:, 0] > 0
+    assert (np.diff(curve[positive], axis=1) > 0).all()
@@ -0,0 +1,43 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from concreteiq.engine import INPUT_COLUMNS
+from concreteiq.formats import (FILE_SUFFIX, FORMATS, detect_format, frame_bytes, iter_frames,
+                                read_frame, read_schema, write_frame)
+
+# Export-style headers plus a text column the readers must skip
+HEADERS = ['Semen', 'Slag', 'fly_ash', 'Water (kg/m3)', 'SP', 'Coarse Aggregate',
+           'Fine Aggregate', 'Age (days)']
+
+
+@pytest.fixture
+def mixes():
+    X = np.random.default_rng(0).uniform(0, 1000, size=(10, len(INPUT_COLUMNS)))
+    df = pd.DataFrame(X, columns=HEADERS)
+    df.insert(3, 'Notes', [f"batch {i}" for i in range(len(df))])
+    return df
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_round_trip(tmp_path, mixes, fmt):
+    path = str(tmp_path / f'mixes{FILE_SUFFIX[fmt]}')
+    write_frame(mixes, path, fmt, chunk_rows=4)
+    assert detect_format(path) == fmt
+    assert read_schema(path, fmt) == list(mixes.columns)
+
+    expected = pd.DataFrame(mixes[HEADERS].to_numpy(), columns=INPUT_COLUMNS)
+    pd.testing.assert_frame_equal(read_frame(path, fmt), expected)
+    pd.testing.assert_frame_equal(read_frame(io.BytesIO(frame_bytes(mixes, fmt)), fmt), expected)
+    pd.testing.assert_frame_equal(read_frame(path, fmt, nrows=3), expected.head(3))
+    streamed = pd.concat(iter_frames(path, fmt, batch_rows=3), ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, expected)
+
+
+def test_missing_inputs_are_reported(tmp_path, mixes):
+    path = str(tmp_path / 'mixes.parquet')
+    write_frame(mixes.drop(columns=['Semen', 'Age (days)']), path, 'parquet')
+    with pytest.raises(ValueError, match='Cement'):
+        read_frame(path, 'parquet')
@@ -0,0 +1,32 @@
+import os
+
+import numpy as np
+import pytest
+
+from concreteiq.grades import DEFAULT_SCHEME, GradeScheme, load_schemes
+
+SCHEMES_PATH = os.path.join(os.path.dirname(__file__), os.pardir, 'grade_schemes.json')
+SCHEMES, _ = load_schemes(SCHEMES_PATH)
+
+
+def test_k_scheme_boundaries_belong_to_the_higher_grade():
+    scheme = load_schemes(None)[0][DEFAULT_SCHEME]
+    strengths = [0.0, 19.999, 20.0, 29.999, 30.0, 39.999, 40.0, 95.0]
+    assert scheme.classify(strengths).code.tolist() == [
+        'K-175', 'K-175', 'K-250', 'K-250', 'K-300', 'K-300', 'K-400+', 'K-400+']
+
+
+@pytest.mark.parametrize('key', sorted(SCHEMES))
+def test_vectorized_grades_match_single_lookup(key):
+    scheme = SCHEMES[key]
+    t = np.asarray(scheme.thresholds)
+    strengths = np.concatenate([t - 1e-9, t, t + 1e-9, [0.0, 150.0]])
+    grades = scheme.classify(strengths)
+    assert grades.code.tolist() == [scheme.grade(s)[0] for s in strengths]
+    assert grades.css.tolist() == [scheme.grade(s)[3] for s in strengths]
+    assert sum(grades.counts().values()) == len(strengths)
+
+
+def test_only_the_lowest_grade_may_omit_its_minimum():
+    with pytest.raises(ValueError):
+        GradeScheme('bad', 'Bad', [{'code': 'A', 'min': None}, {'code': 'B', 'min': None}])
@@ -0,0 +1,44 @@
+import numpy as np
+
+from concreteiq.history import PredictionHistory
+
+MIX = [540, 0, 0, 162, 2.5, 1040, 676, 28]
+
+
+def fill(history, n):
+    for i in range(n):
+        history.append(MIX, float(i), timestamp=np.datetime64(i, 's'))
+
+
+def test_ring_keeps_the_newest_records_in_order():
+    history = PredictionHistory(capacity=4)
+    fill(history, 3)
+    assert len(history) == 3
+    assert history.tail().prediction.tolist() == [0, 1, 2]
+    fill(history, 7)
+    assert len(history) == 4
+    view = history.tail()
+    assert view.prediction.tolist() == [3, 4, 5, 6]
+    assert (np.diff(view.timestamp) > np.timedelta64(0)).all()
+    assert history.tail(2).prediction.tolist() == [5, 6]
+    # The window is a view into the ring, not a copy
+    assert np.shares_memory(view.prediction, history._prediction)
+
+
+def test_batch_records_count_their_rows():
+    history = PredictionHistory(capacity=2)
+    history.append(MIX, 40.0)
+    history.append_batch(np.array([10.0, 20.0, 30.0]), np.tile(MIX, (3, 1)))
+    assert history.tail().rows.tolist() == [1, 3]
+    assert history.tail(1).prediction.tolist() == [20.0]
+    assert history.predictions == 4
+
+
+def test_persisted_history_reloads_the_newest_window(tmp_path):
+    path = str(tmp_path / 'history.arrow')
+    fill(PredictionHistory(capacity=3, path=path), 8)
+    reloaded = PredictionHistory(capacity=3, path=path)
+    assert reloaded.tail().prediction.tolist() == [5, 6, 7]
+    np.testing.assert_array_equal(reloaded.tail().feature('Cement'), [540.0] * 3)
+    # Reloading more than twice the capacity compacted the file
+    assert len(PredictionHistory(capacity=8, path=path)) == 3
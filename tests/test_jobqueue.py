@@ -0,0 +1,59 @@
+import os
+import time
+
+import pytest
+
+from concreteiq.jobqueue import DONE, FAILED, JobQueue
+
+CSV = (b"Cement,Blast Furnace Slag,Fly Ash,Water,Superplasticizer,Coarse Aggregate,Fine Aggregate,Age\n"
+       b"540,0,0,162,2.5,1040,676,28\n"
+       b"332.5,142.5,0,228,0,932,594,270\n")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(workers=1, results_dir=str(tmp_path))
+    yield q
+    q.close()
+
+
+def wait(job, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, f"job still {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+def test_failed_write_out_fails_job_and_keeps_worker(queue, engine, tmp_path, monkeypatch):
+    replace = os.replace
+    calls = []
+
+    def full_disk(src, dst):
+        calls.append(dst)
+        if len(calls) == 1:
+            raise OSError(28, "No space left on device")
+        return replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', full_disk)
+    failed = wait(queue.submit('alice', CSV, engine))
+    assert failed.status == FAILED
+    assert 'No space left on device' in failed.error
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(failed.id)]
+
+    # The single worker survived and picks up the next job
+    done = wait(queue.submit('bob', CSV, engine))
+    assert done.status == DONE
+    assert done.rows == 2
+    assert os.path.exists(done.path)
+
+
+def test_owners_only_see_their_own_jobs(queue, engine):
+    key = ('same-upload',)
+    alice = wait(queue.submit('session-alice', CSV, engine, key=key))
+    bob = wait(queue.submit('session-bob', CSV, engine, key=key))
+    assert [job.id for job in queue.jobs('session-alice')] == [alice.id]
+    assert [job.id for job in queue.jobs('session-bob')] == [bob.id]
+    assert queue.find(key, 'session-alice') is alice
+    assert queue.find(key, 'session-bob') is bob
+    assert queue.find(key, 'session-carol') is None
@@ -0,0 +1,25 @@
+import numpy as np
+
+from concreteiq.optimize import DENSITY_RANGE, MATERIALS, WC_MAX, _repair, optimize_mix
+from concreteiq.validation import TYPICAL_RANGES
+
+NO_AGGREGATE_MINIMUM = {'Coarse Aggregate': (0, 1150), 'Fine Aggregate': (0, 1000)}
+
+
+def test_repair_splits_shift_when_aggregates_are_zero():
+    bounds = {**TYPICAL_RANGES, **NO_AGGREGATE_MINIMUM}
+    lo = np.array([bounds[m][0] for m in MATERIALS], dtype=np.float64)
+    hi = np.array([bounds[m][1] for m in MATERIALS], dtype=np.float64)
+    X = np.array([[400, 0, 0, 180, 5, 0, 0]], dtype=np.float64)
+    _repair(X, lo, hi, WC_MAX, DENSITY_RANGE)
+    assert np.isfinite(X).all()
+    assert X[0, 5] > 0 and X[0, 6] > 0
+    assert DENSITY_RANGE[0] <= X.sum() <= DENSITY_RANGE[1]
+
+
+def test_zero_aggregate_minimums_give_finite_pareto_set(engine):
+    design = optimize_mix(engine, 30, bounds=NO_AGGREGATE_MINIMUM, generations=20)
+    assert len(design)
+    assert np.isfinite(design.mixes).all()
+    assert np.isfinite(design.strength).all() and np.isfinite(design.cost).all()
+    assert design.best is not None
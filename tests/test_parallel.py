@@ -0,0 +1,20 @@
+import pytest
+
+from concreteiq.batch import FLAGS_COL, GRADE_COL, OOD_COL, PRED_COL, WC_COL, curve_column
+from concreteiq.engine import INPUT_COLUMNS
+from concreteiq.formats import FORMATS, read_frame, read_schema
+from concreteiq.parallel import score_file
+
+OUTPUT_COLUMNS = INPUT_COLUMNS + [PRED_COL, GRADE_COL, WC_COL, FLAGS_COL, OOD_COL,
+                                  curve_column(7), curve_column(28)]
+
+
+@pytest.mark.parametrize('out_fmt', FORMATS)
+def test_header_only_input_writes_empty_output(tmp_path, model_path, out_fmt):
+    src = tmp_path / 'empty.csv'
+    src.write_text(','.join(INPUT_COLUMNS) + '\n')
+    dst = str(tmp_path / f'scored.{out_fmt}')
+    summary = score_file(str(src), dst, model_path, workers=1, curve_ages=(7, 28))
+    assert summary.rows == 0
+    assert read_schema(dst, out_fmt) == OUTPUT_COLUMNS
+    assert len(read_frame(dst, out_fmt)) == 0